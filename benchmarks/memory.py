@@ -0,0 +1,49 @@
+"""
+Measures how many bytes each board takes to hold in memory: boards with a piece object of their own on every square,
+as they are set up by default, boards set up with shared_pieces, and the compact mailbox and serialized forms.
+
+Run with ``poetry run python -m benchmarks.memory``.
+"""
+
+import random
+import tracemalloc
+
+from chessington.engine.board import Board
+
+BOARDS = 2000
+
+
+def random_positions(rng):
+    positions = []
+    for _ in range(BOARDS):
+        board = Board.at_starting_position()
+        for _ in range(rng.randrange(40)):
+            moves = board.generate_legal_moves(board.current_player)
+            if not moves:
+                break
+            board.make_move(rng.choice(moves))
+        positions.append(board.to_bytes())
+    return positions
+
+
+def bytes_per_board(build, positions):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    boards = [build(data) for data in positions]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del boards
+    return (after - before) / len(positions)
+
+
+def main():
+    positions = random_positions(random.Random(0))
+    for name, build in [('own pieces', Board.from_bytes),
+                        ('shared pieces', lambda data: Board.from_bytes(data, shared_pieces=True)),
+                        ('mailbox', lambda data: Board.from_bytes(data).to_mailbox()),
+                        ('serialized', lambda data: Board.from_bytes(data).to_bytes())]:
+        print('{:>15}: {:8.0f} bytes per board'.format(name, bytes_per_board(build, positions)))
+
+
+if __name__ == '__main__':
+    main()
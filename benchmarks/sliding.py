@@ -0,0 +1,59 @@
+"""
+Compares sliding piece move generation using the precomputed line attack tables against stepping along each
+direction one square at a time with Piece.get_moves_in_direction.
+
+Run with ``poetry run python -m benchmarks.sliding``.
+"""
+
+import random
+import timeit
+
+from chessington.engine.attacks import ORTHOGONAL_DIRECTIONS, DIAGONAL_DIRECTIONS
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen
+
+DIRECTIONS = {Bishop: DIAGONAL_DIRECTIONS, Rook: ORTHOGONAL_DIRECTIONS,
+              Queen: ORTHOGONAL_DIRECTIONS + DIAGONAL_DIRECTIONS}
+POSITIONS = 200
+REPEATS = 20
+
+
+def random_position(rng):
+    board = Board.empty()
+    for piece_type in [Pawn] * 6 + [Knight, Bishop, Rook, Queen]:
+        for player in Player:
+            square = Square.at(rng.randrange(8), rng.randrange(8))
+            if board.is_square_empty(square):
+                board.set_piece(square, piece_type(player))
+    return board
+
+
+def stepping_moves(board, pieces):
+    for piece in pieces:
+        for direction in DIRECTIONS[type(piece)]:
+            piece.get_moves_in_direction(board, direction)
+
+
+def table_moves(board, pieces):
+    for piece in pieces:
+        piece.get_available_moves(board)
+
+
+def main():
+    rng = random.Random(0)
+    positions = []
+    for _ in range(POSITIONS):
+        board = random_position(rng)
+        sliders = [piece for player in Player for piece_type in DIRECTIONS
+                   for piece in board.get_pieces(player, piece_type)]
+        positions.append((board, sliders))
+    pieces = sum(len(sliders) for _, sliders in positions) * REPEATS
+
+    for name, generate in [('stepping', stepping_moves), ('table lookup', table_moves)]:
+        seconds = timeit.timeit(lambda: [generate(board, sliders) for board, sliders in positions], number=REPEATS)
+        print('{:>14}: {:8.2f} us per piece'.format(name, seconds / pieces * 1e6))
+
+
+if __name__ == '__main__':
+    main()
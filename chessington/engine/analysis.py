@@ -0,0 +1,170 @@
+"""
+Analysing many positions at once, spread across a pool of worker processes. Positions are read from any iterable, such
+as the lines of a file of FENs, and only a bounded number are in flight at a time, so inputs far larger than memory
+can be analysed. Results stream back either in the order the positions were given or as soon as they are ready.
+
+Run as a script, it analyses a file of FENs and writes the results as JSON lines.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import namedtuple, deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from chessington.engine.board import Board
+from chessington.engine.evaluation import evaluate
+from chessington.engine.pgn import move_to_san
+from chessington.engine.search import Searcher, MAX_DEPTH
+
+DEFAULT_DEPTH = 4
+# How many positions each worker may have queued up, by default
+PENDING_PER_WORKER = 4
+
+AnalysisResult = namedtuple('AnalysisResult', 'index fen best_move score depth principal_variation nodes seconds error')
+
+# The searcher used for every position analysed in this worker process
+_worker_searcher = None
+
+
+def _variation_to_san(board, variation):
+    san_moves = []
+    for move in variation:
+        san_moves.append(move_to_san(board, move))
+        board.make_move(move)
+    for _ in variation:
+        board.unmake_move()
+    return san_moves
+
+
+def _analyse_position(task):
+    """
+    Analyses one position in a worker process, given as a FEN string or in the board's serialized form. A position
+    which can't be read gets a result with the error rather than raising, so one bad line doesn't stop the batch. The
+    searcher's table and move ordering statistics are cleared first, so that the result doesn't depend on which
+    positions the worker happened to analyse before.
+    """
+    global _worker_searcher
+    index, position, depth, node_limit, time_limit = task
+    start = time.perf_counter()
+    try:
+        if isinstance(position, str):
+            board = Board.from_fen(position, shared_pieces=True)
+        else:
+            board = Board.from_bytes(position, shared_pieces=True)
+    except ValueError as error:
+        return AnalysisResult(index, position, None, None, 0, [], 0, 0.0, str(error))
+    fen = board.to_fen()
+
+    if depth == 0:
+        return AnalysisResult(index, fen, None, evaluate(board), 0, [], 0, time.perf_counter() - start, None)
+
+    if _worker_searcher is None:
+        _worker_searcher = Searcher()
+    _worker_searcher.table.clear()
+    _worker_searcher.orderer.clear()
+    result = _worker_searcher.search(board, max_depth=depth, node_limit=node_limit, time_limit=time_limit)
+    variation = _variation_to_san(board, result.principal_variation)
+    return AnalysisResult(index, fen, variation[0] if variation else None, result.score, result.depth, variation,
+                          result.nodes, time.perf_counter() - start, None)
+
+
+def _tasks(positions, depth, node_limit, time_limit):
+    for index, position in enumerate(positions):
+        if not isinstance(position, str):
+            position = position.to_bytes()
+        yield index, position, depth, node_limit, time_limit
+
+
+def analyze_many(positions, depth=None, time_limit=None, node_limit=None, workers=None, ordered=True,
+                 max_pending=None):
+    """
+    Analyses an iterable of positions, given as FEN strings or boards, yielding an AnalysisResult for each. Moves are
+    given in SAN and scores in centipawns for the side to move.
+
+    Each position is searched to the given depth, or until the time limit (in seconds) or node limit for each
+    position runs out. Without a depth, the search goes as deep as the limits allow, or to depth 4 if there are no
+    limits. A depth of 0 scores the position by static evaluation without searching.
+
+    Results are yielded in the order the positions were given, or as each is ready if ordered is false. At most
+    max_pending positions (by default four per worker) are read ahead of the results, so the positions can be a
+    stream of any length. A position which can't be read gives a result with its error rather than stopping the rest.
+    """
+    if depth is None:
+        depth = MAX_DEPTH if time_limit is not None or node_limit is not None else DEFAULT_DEPTH
+    workers = workers if workers is not None else os.cpu_count() or 1
+    max_pending = max_pending if max_pending is not None else workers * PENDING_PER_WORKER
+    tasks = _tasks(positions, depth, node_limit, time_limit)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if ordered:
+            pending = deque()
+            for task in tasks:
+                pending.append(executor.submit(_analyse_position, task))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        else:
+            pending = set()
+            for task in tasks:
+                pending.add(executor.submit(_analyse_position, task))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from sorted((future.result() for future in done), key=lambda result: result.index)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from sorted((future.result() for future in done), key=lambda result: result.index)
+
+
+def read_fen_lines(lines):
+    """
+    Yields the FEN strings in an iterable of lines, skipping blank lines and lines starting with #.
+    """
+    for line in lines:
+        fen = line.strip()
+        if fen and not fen.startswith('#'):
+            yield fen
+
+
+def write_jsonl(results, file):
+    """
+    Writes each result to a file as one line of JSON, returning how many were written.
+    """
+    count = 0
+    for result in results:
+        file.write(json.dumps(result._asdict()) + '\n')
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analyse a file of positions across several processes.')
+    parser.add_argument('input', help='a file of FEN strings, one per line, or - for standard input')
+    parser.add_argument('--output', help='the file to write JSON lines to (default standard output)')
+    parser.add_argument('--depth', type=int,
+                        help='how deep to search each position, or 0 to only evaluate it (default {}, or as deep '
+                             'as the limits allow)'.format(DEFAULT_DEPTH))
+    parser.add_argument('--time', type=float, help='how many seconds to search each position for')
+    parser.add_argument('--nodes', type=int, help='how many nodes to search in each position')
+    parser.add_argument('--workers', type=int, help='how many worker processes to use (default one per core)')
+    parser.add_argument('--unordered', action='store_true',
+                        help='write results as they are ready rather than in input order')
+    args = parser.parse_args(argv)
+
+    input_file = sys.stdin if args.input == '-' else open(args.input)
+    output_file = sys.stdout if args.output is None else open(args.output, 'w')
+    start = time.perf_counter()
+    try:
+        results = analyze_many(read_fen_lines(input_file), args.depth, args.time, args.nodes, args.workers,
+                               not args.unordered)
+        count = write_jsonl(results, output_file)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    print('Analysed {} positions in {:.1f}s'.format(count, time.perf_counter() - start), file=sys.stderr)
+    return 0
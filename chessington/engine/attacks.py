@@ -0,0 +1,237 @@
+"""
+Bitboard helpers and precomputed attack tables. Squares are numbered 8 * row + col, and a bitboard is an integer
+with the bit of each square it contains set. The per-square tables below are built once, at import time, so that
+pieces can look up their targets rather than recomputing them for every move. Sliding pieces look up their attacks
+along each line through their square, indexed by the occupancy of that line.
+"""
+
+from chessington.engine.data import Player, Square
+
+BOARD_SQUARES = 64
+
+FULL = 0xFFFFFFFFFFFFFFFF
+FILE_A = 0x0101010101010101
+FILE_H = FILE_A << 7
+NOT_FILE_A = FULL ^ FILE_A
+NOT_FILE_H = FULL ^ FILE_H
+NOT_FILE_AB = NOT_FILE_A & (NOT_FILE_A << 1)
+NOT_FILE_GH = NOT_FILE_H & (NOT_FILE_H >> 1)
+RANK_3 = 0xFF << 16
+RANK_6 = 0xFF << 40
+
+SQUARES = [Square.at(index >> 3, index & 7) for index in range(BOARD_SQUARES)]
+
+
+def square_index(square):
+    """
+    Converts a square into its bit index, 8 * row + col.
+    """
+    return square.row * 8 + square.col
+
+
+def square_bit(square):
+    """
+    Converts a square into a bitboard with only that square set.
+    """
+    return 1 << (square.row * 8 + square.col)
+
+
+def iter_bits(bitboard):
+    """
+    Yields the index of each set bit in the bitboard, from least to most significant.
+    """
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        yield lowest_bit.bit_length() - 1
+        bitboard ^= lowest_bit
+
+
+def bitboard_squares(bitboard):
+    """
+    Converts a bitboard into a list of the squares it contains.
+    """
+    return [SQUARES[index] for index in iter_bits(bitboard)]
+
+
+def shift_north(bitboard):
+    return (bitboard << 8) & FULL
+
+
+def shift_south(bitboard):
+    return bitboard >> 8
+
+
+def shift_east(bitboard):
+    return (bitboard << 1) & NOT_FILE_A
+
+
+def shift_west(bitboard):
+    return (bitboard >> 1) & NOT_FILE_H
+
+
+def shift_north_east(bitboard):
+    return (bitboard << 9) & NOT_FILE_A & FULL
+
+
+def shift_north_west(bitboard):
+    return (bitboard << 7) & NOT_FILE_H & FULL
+
+
+def shift_south_east(bitboard):
+    return (bitboard >> 7) & NOT_FILE_A
+
+
+def shift_south_west(bitboard):
+    return (bitboard >> 9) & NOT_FILE_H
+
+
+ORTHOGONAL_SHIFTS = [shift_north, shift_south, shift_east, shift_west]
+DIAGONAL_SHIFTS = [shift_north_east, shift_north_west, shift_south_east, shift_south_west]
+
+
+def knight_attacks(bitboard):
+    """
+    Finds every square attacked by the knights in the bitboard.
+    """
+    return ((bitboard << 17) & NOT_FILE_A | (bitboard << 15) & NOT_FILE_H |
+            (bitboard << 10) & NOT_FILE_AB | (bitboard << 6) & NOT_FILE_GH |
+            (bitboard >> 17) & NOT_FILE_H | (bitboard >> 15) & NOT_FILE_A |
+            (bitboard >> 10) & NOT_FILE_GH | (bitboard >> 6) & NOT_FILE_AB) & FULL
+
+
+def king_attacks(bitboard):
+    """
+    Finds every square attacked by the kings in the bitboard.
+    """
+    sideways = shift_east(bitboard) | shift_west(bitboard)
+    row = bitboard | sideways
+    return sideways | shift_north(row) | shift_south(row)
+
+
+def pawn_attacks(bitboard, player):
+    """
+    Finds every square attacked diagonally by the given player's pawns in the bitboard.
+    """
+    if player == Player.WHITE:
+        return shift_north_east(bitboard) | shift_north_west(bitboard)
+    return shift_south_east(bitboard) | shift_south_west(bitboard)
+
+
+def sliding_attacks(bitboard, occupied, shifts):
+    """
+    Finds every square attacked by sliding pieces in the bitboard along the given directions. Each ray stops at (and
+    includes) the first occupied square.
+    """
+    empty = ~occupied & FULL
+    attacks = 0
+    for shift in shifts:
+        ray = shift(bitboard)
+        while ray:
+            attacks |= ray
+            ray = shift(ray & empty)
+    return attacks
+
+
+# Attack bitboards for a single piece on each square
+KNIGHT_ATTACKS = [knight_attacks(1 << index) for index in range(BOARD_SQUARES)]
+KING_ATTACKS = [king_attacks(1 << index) for index in range(BOARD_SQUARES)]
+PAWN_ATTACKS = {player: [pawn_attacks(1 << index, player) for index in range(BOARD_SQUARES)] for player in Player}
+
+# The same tables as tuples of squares, for looking up targets on the mailbox board
+KNIGHT_TARGETS = [tuple(bitboard_squares(attacks)) for attacks in KNIGHT_ATTACKS]
+KING_TARGETS = [tuple(bitboard_squares(attacks)) for attacks in KING_ATTACKS]
+PAWN_CAPTURE_TARGETS = {player: [tuple(bitboard_squares(attacks)) for attacks in PAWN_ATTACKS[player]]
+                        for player in Player}
+
+DIRECTION_SHIFTS = {
+    (1, 0): shift_north, (-1, 0): shift_south, (0, 1): shift_east, (0, -1): shift_west,
+    (1, 1): shift_north_east, (1, -1): shift_north_west, (-1, 1): shift_south_east, (-1, -1): shift_south_west,
+}
+ORTHOGONAL_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+DIAGONAL_DIRECTIONS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def _ray_squares(index, shift):
+    squares = []
+    ray = shift(1 << index)
+    while ray:
+        squares.append(ray.bit_length() - 1)
+        ray = shift(ray)
+    return squares
+
+
+# The squares along each direction from each square, nearest first
+RAY_TARGETS = {direction: [tuple(SQUARES[target] for target in _ray_squares(index, shift))
+                           for index in range(BOARD_SQUARES)]
+               for direction, shift in DIRECTION_SHIFTS.items()}
+
+
+def _build_line_table(shifts):
+    """
+    Builds, for every square, the mask of squares on a line whose occupancy can block a slider on that line, and
+    a dictionary from each possible occupancy of that mask to the resulting attacks.
+    """
+    masks = []
+    tables = []
+    for index in range(BOARD_SQUARES):
+        mask = 0
+        for shift in shifts:
+            # The last square of a ray is attacked whether or not it is occupied, so it never needs to be looked at
+            for target in _ray_squares(index, shift)[:-1]:
+                mask |= 1 << target
+        table = {}
+        occupancy = 0
+        while True:
+            table[occupancy] = sliding_attacks(1 << index, occupancy, shifts)
+            occupancy = (occupancy - mask) & mask
+            if occupancy == 0:
+                break
+        masks.append(mask)
+        tables.append(table)
+    return masks, tables
+
+
+RANK_MASKS, RANK_ATTACKS = _build_line_table([shift_east, shift_west])
+FILE_MASKS, FILE_ATTACKS = _build_line_table([shift_north, shift_south])
+DIAGONAL_MASKS, DIAGONAL_ATTACKS = _build_line_table([shift_north_east, shift_south_west])
+ANTI_DIAGONAL_MASKS, ANTI_DIAGONAL_ATTACKS = _build_line_table([shift_north_west, shift_south_east])
+
+
+def rook_attacks(index, occupied):
+    """
+    Looks up the squares attacked by a rook on the given square index, given the occupied squares.
+    """
+    return (RANK_ATTACKS[index][occupied & RANK_MASKS[index]] |
+            FILE_ATTACKS[index][occupied & FILE_MASKS[index]])
+
+
+def bishop_attacks(index, occupied):
+    """
+    Looks up the squares attacked by a bishop on the given square index, given the occupied squares.
+    """
+    return (DIAGONAL_ATTACKS[index][occupied & DIAGONAL_MASKS[index]] |
+            ANTI_DIAGONAL_ATTACKS[index][occupied & ANTI_DIAGONAL_MASKS[index]])
+
+
+def queen_attacks(index, occupied):
+    """
+    Looks up the squares attacked by a queen on the given square index, given the occupied squares.
+    """
+    return rook_attacks(index, occupied) | bishop_attacks(index, occupied)
+
+
+def _build_between_table():
+    """
+    Builds, for every pair of squares on a common line, the bitboard of the squares strictly between them.
+    """
+    between = [[0] * BOARD_SQUARES for _ in range(BOARD_SQUARES)]
+    for index in range(BOARD_SQUARES):
+        for shift in DIRECTION_SHIFTS.values():
+            squares_between = 0
+            for target in _ray_squares(index, shift):
+                between[index][target] = squares_between
+                squares_between |= 1 << target
+    return between
+
+
+BETWEEN = _build_between_table()
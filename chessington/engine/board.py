@@ -1,59 +1,335 @@
 """
-A module providing a representation of a chess board. The rules of chess are not implemented - 
-this is just a "dumb" board that will let you move pieces around as you like.
+A module providing a representation of a chess board. Besides holding the pieces, a board generates the legal moves
+for either player, finding the pieces giving check and the pinned pieces once per position, and can make moves and
+take them back. There is no castling, and pawns only promote to queens. move_piece doesn't check that a move is legal,
+only that the piece belongs to the player whose turn it is.
 """
 
+from chessington.engine.attacks import FULL, RANK_3, RANK_6, SQUARES, BETWEEN, KNIGHT_ATTACKS, KING_ATTACKS, \
+    PAWN_ATTACKS, rook_attacks, bishop_attacks, queen_attacks, iter_bits, bitboard_squares, shift_north, shift_south, \
+    shift_north_east, shift_north_west, shift_south_east, shift_south_west
 from chessington.engine.data import Player, Square
+from chessington.engine.evaluation import PIECE_SCORES
+from chessington.engine.moves import QUIET, CAPTURE, DOUBLE_PAWN_PUSH, EN_PASSANT, PROMOTION, unpack_move
 from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from chessington.engine.zobrist import PIECE_KEYS, BLACK_TO_MOVE_KEY, EN_PASSANT_KEYS
 from tkinter import *
 
 BOARD_SIZE = 8
+PIECE_TYPES = [Pawn, Knight, Bishop, Rook, Queen, King]
+# Each piece's attacks come either from a fixed table or, for sliding pieces, a lookup by occupancy
+PIECE_ATTACKS = [
+    (Knight, KNIGHT_ATTACKS, None),
+    (Bishop, None, bishop_attacks),
+    (Rook, None, rook_attacks),
+    (Queen, None, queen_attacks),
+    (King, KING_ATTACKS, None),
+]
+PIECE_ATTACKS_BY_TYPE = {piece_type: (attack_table, attack_lookup)
+                         for piece_type, attack_table, attack_lookup in PIECE_ATTACKS}
+LAST_ROW = {Player.WHITE: 7, Player.BLACK: 0}
+LAST_RANKS = {Player.WHITE: 0xFF << 56, Player.BLACK: 0xFF}
+DOUBLE_STEP_RANKS = {Player.WHITE: RANK_3, Player.BLACK: RANK_6}
+PAWN_PUSH_OFFSETS = {Player.WHITE: 8, Player.BLACK: -8}
+PAWN_CAPTURE_SHIFTS = {Player.WHITE: [(shift_north_west, 7), (shift_north_east, 9)],
+                       Player.BLACK: [(shift_south_west, -9), (shift_south_east, -7)]}
+
+# Codes for the compact serialized form: 1-6 for White's pieces and 7-12 for Black's, with 0 for an empty square
+SERIALIZED_SIZE = 66
+PIECE_CODES = {player: {piece_type: 1 + offset + code for code, piece_type in enumerate(PIECE_TYPES)}
+               for offset, player in zip([0, len(PIECE_TYPES)], [Player.WHITE, Player.BLACK])}
+PIECES_BY_CODE = {code: (player, piece_type)
+                  for player, codes in PIECE_CODES.items() for piece_type, code in codes.items()}
+PLAYER_CODES = {Player.WHITE: 0, Player.BLACK: 1}
+PLAYERS_BY_CODE = {code: player for player, code in PLAYER_CODES.items()}
+
+FEN_LETTERS = {Pawn: 'p', Knight: 'n', Bishop: 'b', Rook: 'r', Queen: 'q', King: 'k'}
+FEN_PIECES = {letter.upper() if player == Player.WHITE else letter: (piece_type, player)
+              for piece_type, letter in FEN_LETTERS.items() for player in Player}
+FEN_PLAYERS = {'w': Player.WHITE, 'b': Player.BLACK}
+FEN_FILES = 'abcdefgh'
+# The rank of the square a pawn passes over when it steps two squares, for the player who made the step
+EN_PASSANT_TARGET_ROWS = {Player.WHITE: 2, Player.BLACK: 5}
+
+
+def _new_piece(piece_type, player):
+    return piece_type(player)
+
+
+def _shared_piece(piece_type, player):
+    return piece_type.shared(player)
 
 
 class Board:
     """
-    A representation of the chess board, and the pieces on it.
+    A representation of the chess board, and the pieces on it. Alongside the mailbox of pieces, a board keeps a
+    bitboard for each player and piece type, with bit (8 * row + col) set for each square holding such a piece, which
+    move generation works from. Boards compare equal, and hash, by the Zobrist key of their position.
     """
 
     def __init__(self, player, board_state):
-        self.current_player = Player.WHITE
+        self.zobrist_key = 0
+        self.middlegame_score = 0
+        self.endgame_score = 0
+        self.phase = 0
+        self._current_player = Player.WHITE
+        self._en_passant_state = None
         self.board = board_state
-        self.en_passant_state = None
+        self._piece_locations = {player: {piece_type: {} for piece_type in PIECE_TYPES} for player in Player}
+        self.bitboards = {player: {piece_type: 0 for piece_type in PIECE_TYPES} for player in Player}
+        self.occupancy = {player: 0 for player in Player}
+        self._undo_stack = []
+        self._index_pieces()
 
-    @staticmethod
-    def empty():
-        return Board(Player.WHITE, Board._create_empty_board())
+    @classmethod
+    def empty(cls):
+        return cls(Player.WHITE, Board._create_empty_board())
 
-    @staticmethod
-    def at_starting_position():
-        return Board(Player.WHITE, Board._create_starting_board())
+    @classmethod
+    def at_starting_position(cls, shared_pieces=False):
+        return cls(Player.WHITE, Board._create_starting_board(shared_pieces))
 
     @staticmethod
     def _create_empty_board():
         return [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
 
     @staticmethod
-    def _create_starting_board():
+    def _create_starting_board(shared_pieces=False):
+        create = _shared_piece if shared_pieces else _new_piece
 
         # Create an empty board
         board = [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
 
         # Setup the rows of pawns
-        board[1] = [Pawn(Player.WHITE) for _ in range(BOARD_SIZE)]
-        board[6] = [Pawn(Player.BLACK) for _ in range(BOARD_SIZE)]
+        board[1] = [create(Pawn, Player.WHITE) for _ in range(BOARD_SIZE)]
+        board[6] = [create(Pawn, Player.BLACK) for _ in range(BOARD_SIZE)]
 
         # Setup the rows of pieces
         piece_row = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
-        board[0] = list(map(lambda piece: piece(Player.WHITE), piece_row))
-        board[7] = list(map(lambda piece: piece(Player.BLACK), piece_row))
+        board[0] = list(map(lambda piece: create(piece, Player.WHITE), piece_row))
+        board[7] = list(map(lambda piece: create(piece, Player.BLACK), piece_row))
 
         return board
 
+    def to_mailbox(self):
+        """
+        Gets the pieces as a compact mailbox: a 64-entry bytearray, indexed by 8 * row + col, holding 0 for an empty
+        square or the piece's code.
+        """
+        mailbox = bytearray(BOARD_SIZE * BOARD_SIZE)
+        for player in Player:
+            for piece_type, bitboard in self.bitboards[player].items():
+                code = PIECE_CODES[player][piece_type]
+                for index in iter_bits(bitboard):
+                    mailbox[index] = code
+        return mailbox
+
+    def to_bytes(self):
+        """
+        Serializes the position into 66 bytes: the mailbox from to_mailbox, then the player to move and the square of
+        the pawn which can be taken en passant (64 for none). The move history is not included.
+        """
+        data = self.to_mailbox()
+        en_passant_pawn = self.en_passant_state
+        data.append(PLAYER_CODES[self.current_player])
+        data.append(64 if en_passant_pawn is None else en_passant_pawn.row * BOARD_SIZE + en_passant_pawn.col)
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data, shared_pieces=False):
+        """
+        Sets up a board from the serialized form created by to_bytes. With shared_pieces, the board holds the pieces
+        shared between boards (see Piece.shared) rather than a piece of its own on each square.
+        """
+        if len(data) != SERIALIZED_SIZE:
+            raise ValueError('Expected {} bytes but got {}'.format(SERIALIZED_SIZE, len(data)))
+        create = _shared_piece if shared_pieces else _new_piece
+        board_state = cls._create_empty_board()
+        for index in range(64):
+            if data[index]:
+                player, piece_type = PIECES_BY_CODE[data[index]]
+                board_state[index // BOARD_SIZE][index % BOARD_SIZE] = create(piece_type, player)
+        board = cls(Player.WHITE, board_state)
+        board.current_player = PLAYERS_BY_CODE[data[64]]
+        board.en_passant_state = SQUARES[data[65]] if data[65] < 64 else None
+        return board
+
+    @classmethod
+    def from_fen(cls, fen, shared_pieces=False):
+        """
+        Sets up a board from a FEN string. The castling field must be present but is ignored, since the game has no
+        castling, and so are the move counters, which may be left off. Pieces are shared as for from_bytes.
+        """
+        create = _shared_piece if shared_pieces else _new_piece
+        fields = fen.split()
+        if len(fields) not in (4, 6):
+            raise ValueError('Expected 4 or 6 fields in FEN: {!r}'.format(fen))
+        ranks = fields[0].split('/')
+        if len(ranks) != BOARD_SIZE:
+            raise ValueError('Expected {} ranks in FEN: {!r}'.format(BOARD_SIZE, fen))
+
+        board_state = []
+        for rank in reversed(ranks):
+            row = []
+            for character in rank:
+                if character in FEN_PIECES:
+                    piece_type, player = FEN_PIECES[character]
+                    row.append(create(piece_type, player))
+                elif '1' <= character <= '8':
+                    row.extend([None] * int(character))
+                else:
+                    raise ValueError('Unexpected {!r} in FEN: {!r}'.format(character, fen))
+            if len(row) != BOARD_SIZE:
+                raise ValueError('Rank {!r} is not {} squares long in FEN: {!r}'.format(rank, BOARD_SIZE, fen))
+            board_state.append(row)
+
+        if fields[1] not in FEN_PLAYERS:
+            raise ValueError('Unexpected side to move {!r} in FEN: {!r}'.format(fields[1], fen))
+        board = cls(FEN_PLAYERS[fields[1]], board_state)
+        board.current_player = FEN_PLAYERS[fields[1]]
+
+        # FEN gives the square the pawn passed over, where we keep the square it landed on
+        en_passant = fields[3]
+        if en_passant != '-':
+            mover = board.current_player.opponent()
+            if (len(en_passant) != 2 or en_passant[0] not in FEN_FILES
+                    or en_passant[1] != str(EN_PASSANT_TARGET_ROWS[mover] + 1)):
+                raise ValueError('Unexpected en passant square {!r} in FEN: {!r}'.format(en_passant, fen))
+            row = EN_PASSANT_TARGET_ROWS[mover] + (1 if mover == Player.WHITE else -1)
+            en_passant_pawn = Square.at(row, FEN_FILES.index(en_passant[0]))
+            piece = board.get_piece(en_passant_pawn)
+            if not isinstance(piece, Pawn) or piece.player != mover:
+                raise ValueError('No pawn to take en passant on {!r} in FEN: {!r}'.format(en_passant, fen))
+            board.en_passant_state = en_passant_pawn
+        return board
+
+    def to_fen(self):
+        """
+        Writes the position as a FEN string. There is never any castling, and the move counters aren't kept, so they
+        are always written as 0 and 1.
+        """
+        ranks = []
+        for row in reversed(self.board):
+            rank = ''
+            empty = 0
+            for piece in row:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                letter = FEN_LETTERS[type(piece)]
+                rank += letter.upper() if piece.player == Player.WHITE else letter
+            ranks.append(rank + str(empty) if empty else rank)
+
+        en_passant = '-'
+        en_passant_pawn = self.en_passant_state
+        if en_passant_pawn is not None:
+            mover = self.current_player.opponent()
+            en_passant = FEN_FILES[en_passant_pawn.col] + str(EN_PASSANT_TARGET_ROWS[mover] + 1)
+        side_to_move = 'w' if self.current_player == Player.WHITE else 'b'
+        return '{} {} - {} 0 1'.format('/'.join(ranks), side_to_move, en_passant)
+
+    def _index_pieces(self):
+        """
+        Builds the piece to square index, and the bitboards, from the current board state.
+        """
+        locations = self._piece_locations
+        for row in range(BOARD_SIZE):
+            for col, piece in enumerate(self.board[row]):
+                if piece is not None:
+                    index = row * BOARD_SIZE + col
+                    player = piece.player
+                    piece_type = type(piece)
+                    locations[player].setdefault(piece_type, {})[piece] = SQUARES[index]
+                    self.bitboards[player][piece_type] |= 1 << index
+                    self.occupancy[player] |= 1 << index
+                    self.zobrist_key ^= PIECE_KEYS[player][piece_type][index]
+                    self._add_piece_scores(PIECE_SCORES[player][piece_type][index])
+
+    def _locations_for(self, piece):
+        return self._piece_locations[piece.player].setdefault(type(piece), {})
+
+    def _add_to_index(self, piece, square):
+        self._locations_for(piece)[piece] = square
+
+    def _remove_from_index(self, piece, square):
+        locations = self._locations_for(piece)
+        # The piece may already have been indexed at its new square, e.g. part way through a move
+        if locations.get(piece) == square:
+            del locations[piece]
+
+    def _add_piece_scores(self, scores):
+        self.middlegame_score += scores[0]
+        self.endgame_score += scores[1]
+        self.phase += scores[2]
+
+    def _remove_piece_scores(self, scores):
+        self.middlegame_score -= scores[0]
+        self.endgame_score -= scores[1]
+        self.phase -= scores[2]
+
     def set_piece(self, square, piece):
         """
         Places the piece at the given position on the board.
         """
-        self.board[square.row][square.col] = piece
+        row = self.board[square.row]
+        displaced_piece = row[square.col]
+        index = square.row * BOARD_SIZE + square.col
+        if displaced_piece is not None:
+            self._remove_from_index(displaced_piece, square)
+            self.bitboards[displaced_piece.player][type(displaced_piece)] ^= 1 << index
+            self.occupancy[displaced_piece.player] ^= 1 << index
+            self.zobrist_key ^= PIECE_KEYS[displaced_piece.player][type(displaced_piece)][index]
+            self._remove_piece_scores(PIECE_SCORES[displaced_piece.player][type(displaced_piece)][index])
+        row[square.col] = piece
+        if piece is not None:
+            self._add_to_index(piece, square)
+            self.bitboards[piece.player][type(piece)] |= 1 << index
+            self.occupancy[piece.player] |= 1 << index
+            self.zobrist_key ^= PIECE_KEYS[piece.player][type(piece)][index]
+            self._add_piece_scores(PIECE_SCORES[piece.player][type(piece)][index])
+
+    @property
+    def current_player(self):
+        return self._current_player
+
+    @current_player.setter
+    def current_player(self, player):
+        if player != self._current_player:
+            self.zobrist_key ^= BLACK_TO_MOVE_KEY
+        self._current_player = player
+
+    @property
+    def en_passant_state(self):
+        """
+        The square of a pawn which has just moved two squares forward, and so may be captured en passant.
+        """
+        return self._en_passant_state
+
+    @en_passant_state.setter
+    def en_passant_state(self, square):
+        if self._en_passant_state is not None:
+            self.zobrist_key ^= EN_PASSANT_KEYS[self._en_passant_state.row * BOARD_SIZE + self._en_passant_state.col]
+        if square is not None:
+            self.zobrist_key ^= EN_PASSANT_KEYS[square.row * BOARD_SIZE + square.col]
+        self._en_passant_state = square
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self.zobrist_key == other.zobrist_key
+
+    def __hash__(self):
+        return self.zobrist_key
+
+    @property
+    def occupied(self):
+        """
+        A bitboard of every occupied square, with bit (8 * row + col) set for each.
+        """
+        return self.occupancy[Player.WHITE] | self.occupancy[Player.BLACK]
 
     def get_piece(self, square):
         """
@@ -69,13 +345,38 @@ class Board:
 
     def find_piece(self, piece_to_find):
         """
-        Searches for the given piece on the board and returns its square.
+        Looks up the square of the given piece on the board. A shared piece (see Piece.shared) is found from its
+        bitboard instead, and only if it stands on a single square; otherwise it has to be told its square.
         """
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                if self.board[row][col] is piece_to_find:
-                    return Square.at(row, col)
-        raise Exception('The supplied piece is not on the board')
+        if piece_to_find.is_shared():
+            board = self.board
+            squares = [SQUARES[index] for index in iter_bits(self.bitboards[piece_to_find.player][type(piece_to_find)])
+                       if board[index // BOARD_SIZE][index % BOARD_SIZE] is piece_to_find]
+            if len(squares) > 1:
+                raise Exception('The supplied piece is on {} squares, so its square must be given'.format(len(squares)))
+            square = squares[0] if squares else None
+        else:
+            square = self._piece_locations[piece_to_find.player].get(type(piece_to_find), {}).get(piece_to_find)
+        if square is None:
+            raise Exception('The supplied piece is not on the board')
+        return square
+
+    def get_pieces(self, player, piece_type=None):
+        """
+        Retrieves the pieces belonging to a player, optionally only those of the given type. A shared piece is given
+        once for each square it stands on.
+        """
+        return [piece for _, piece in self.get_piece_squares(player, piece_type)]
+
+    def get_piece_squares(self, player, piece_type=None):
+        """
+        Retrieves (square, piece) pairs for a player's pieces, optionally only those of the given type.
+        """
+        board = self.board
+        bitboards = self.bitboards[player]
+        piece_types = PIECE_TYPES if piece_type is None else [piece_type]
+        return [(SQUARES[index], board[index // BOARD_SIZE][index % BOARD_SIZE])
+                for piece_type in piece_types for index in iter_bits(bitboards.get(piece_type, 0))]
 
     def move_piece(self, from_square, to_square):
         """
@@ -83,28 +384,164 @@ class Board:
         """
         moving_piece = self.get_piece(from_square)
         if moving_piece is not None and moving_piece.player == self.current_player:
-            if isinstance(moving_piece, Pawn) and (to_square.row == 0 or to_square.row == 7):
-                moving_piece = Queen(self.current_player)  # Pawn promotion mechanic. Automatically promotes to Queen.
+            self.make_move(self._move_for(moving_piece, from_square, to_square))
+
+    def _move_for(self, moving_piece, from_square, to_square):
+        """
+        Works out the flags for moving the given piece between two squares.
+        """
+        flags = QUIET if self.is_square_empty(to_square) else CAPTURE
+        if isinstance(moving_piece, Pawn):
+            if to_square.row == LAST_ROW[moving_piece.player]:
+                flags |= PROMOTION  # Pawn promotion mechanic. Automatically promotes to Queen.
+            if abs(to_square.row - from_square.row) == 2:
+                flags |= DOUBLE_PAWN_PUSH
+            elif flags == QUIET and moving_piece.enpassant_truefalse(self, to_square):
+                flags |= EN_PASSANT
+        return from_square.row * BOARD_SIZE + from_square.col, to_square.row * BOARD_SIZE + to_square.col, flags
+
+    def make_move(self, move):
+        """
+        Makes a move given as a (from_index, to_index, flags) tuple, or packed into an integer by pack_move,
+        remembering everything needed to take it back. A packed move is unpacked first, so move generation and the
+        search pass tuples.
+        """
+        if isinstance(move, int):
+            move = unpack_move(move)
+        from_index, to_index, flags = move
+        from_square = SQUARES[from_index]
+        to_square = SQUARES[to_index]
+        moving_piece = self.board[from_square.row][from_square.col]
+        captured_square = self.en_passant_state if flags & EN_PASSANT else to_square
+        captured_piece = self.get_piece(captured_square)
+        self._undo_stack.append((move, moving_piece, captured_square, captured_piece, self.en_passant_state,
+                                 self.current_player))
+
+        if flags & EN_PASSANT:
+            self.set_piece(captured_square, None)
+        if flags & PROMOTION:
+            # A pawn shared between boards promotes to the shared queen, and a pawn of the board's own to a new one
+            promoted = Queen.shared(moving_piece.player) if moving_piece.is_shared() else Queen(moving_piece.player)
+            self.set_piece(to_square, promoted)
+        else:
             self.set_piece(to_square, moving_piece)
-            self.set_piece(from_square, None)
-            self.en_passant_deletion(moving_piece, to_square)
-            self.set_en_passant_state(to_square, from_square, moving_piece)
-            self.current_player = self.current_player.opponent()
+        self.set_piece(from_square, None)
+        self.en_passant_state = to_square if flags & DOUBLE_PAWN_PUSH else None
+        self.current_player = moving_piece.player.opponent()
 
-    def en_passant_deletion(self, moving_piece, to_square):
-        if not isinstance(moving_piece, Pawn):
-            return
-        if moving_piece.enpassant_truefalse(self, to_square):
-            self.set_piece(self.en_passant_state, None)
+    def unmake_move(self):
+        """
+        Takes back the last move made, restoring the board to exactly its previous state. Returns the move as a tuple,
+        however it was given.
+        """
+        move, moving_piece, captured_square, captured_piece, en_passant_state, current_player = self._undo_stack.pop()
+        from_square = SQUARES[move[0]]
+        to_square = SQUARES[move[1]]
+        self.set_piece(from_square, moving_piece)
+        self.set_piece(to_square, None)
+        if captured_piece is not None:
+            self.set_piece(captured_square, captured_piece)
+        self.en_passant_state = en_passant_state
+        self.current_player = current_player
+        return move
 
-    def set_en_passant_state(self, to_square, from_square, moving_piece):
-        if not isinstance(moving_piece, Pawn):
-            self.en_passant_state = None
-            return
-        if abs(to_square.row - from_square.row) == 2:
-            self.en_passant_state = to_square
-            return
-        self.en_passant_state = None
+    def can_unmake_move(self):
+        """
+        Checks whether there are any moves to take back.
+        """
+        return bool(self._undo_stack)
+
+    def get_piece_bitboard(self, player, piece_type):
+        """
+        Retrieves the bitboard of squares holding the given player's pieces of the given type. The bitboards are kept
+        up to date as pieces are set, so this doesn't rebuild anything.
+        """
+        return self.bitboards[player][piece_type]
+
+    def get_attacks_bitboard(self, square):
+        """
+        Finds the squares attacked by the piece on the given square, regardless of what stands on them.
+        """
+        piece = self.get_piece(square)
+        index = square.row * BOARD_SIZE + square.col
+        piece_type = type(piece)
+        if piece_type is Pawn:
+            return PAWN_ATTACKS[piece.player][index]
+        if piece_type is Knight:
+            return KNIGHT_ATTACKS[index]
+        if piece_type is King:
+            return KING_ATTACKS[index]
+        if piece_type is Bishop:
+            return bishop_attacks(index, self.occupied)
+        if piece_type is Rook:
+            return rook_attacks(index, self.occupied)
+        return queen_attacks(index, self.occupied)
+
+    def get_moves_bitboard(self, square):
+        """
+        Finds the squares the piece on the given square may move to, matching Piece.get_available_moves.
+        """
+        piece = self.get_piece(square)
+        if piece is None:
+            return 0
+        friendly = self.occupancy[piece.player]
+        enemy = self.occupancy[piece.player.opponent()]
+        if not isinstance(piece, Pawn):
+            return self.get_attacks_bitboard(square) & ~friendly & FULL
+
+        index = square.row * BOARD_SIZE + square.col
+        empty = ~(friendly | enemy) & FULL
+        targets = PAWN_ATTACKS[piece.player][index]
+        moves = targets & enemy
+        en_passant_pawn = self.en_passant_state
+        if en_passant_pawn is not None:
+            to_index = en_passant_pawn.row * BOARD_SIZE + en_passant_pawn.col + PAWN_PUSH_OFFSETS[piece.player]
+            if 0 <= to_index < 64:
+                moves |= targets & (1 << to_index) & empty
+        shift = shift_north if piece.player == Player.WHITE else shift_south
+        single_step = shift(1 << index) & empty
+        double_step = shift(single_step & DOUBLE_STEP_RANKS[piece.player]) & empty
+        return moves | single_step | double_step
+
+    def get_moves_from(self, square):
+        """
+        Finds the squares the piece on the given square may move to, as a list of squares.
+        """
+        return bitboard_squares(self.get_moves_bitboard(square))
+
+    @staticmethod
+    def _attackers(index, by_player, bitboards, occupied):
+        """
+        Finds the pieces, given as the attacking player's bitboards, which attack a square given the occupancy.
+        """
+        queens = bitboards[Queen]
+        return ((PAWN_ATTACKS[by_player.opponent()][index] & bitboards[Pawn]) |
+                (KNIGHT_ATTACKS[index] & bitboards[Knight]) |
+                (KING_ATTACKS[index] & bitboards[King]) |
+                (bishop_attacks(index, occupied) & (bitboards[Bishop] | queens)) |
+                (rook_attacks(index, occupied) & (bitboards[Rook] | queens)))
+
+    def is_square_attacked(self, square, by_player):
+        """
+        Checks whether any of the given player's pieces attack the given square.
+        """
+        index = square.row * BOARD_SIZE + square.col
+        return bool(self._attackers(index, by_player, self.bitboards[by_player], self.occupied))
+
+    def is_in_check(self, player):
+        """
+        Checks whether the given player's king is under attack.
+        """
+        opponent = player.opponent()
+        kings = self.bitboards[player][King]
+        enemy_bitboards = self.bitboards[opponent]
+        occupied = self.occupied
+        while kings:
+            king = kings & -kings
+            if self._attackers(king.bit_length() - 1, opponent, enemy_bitboards, occupied):
+                return True
+            kings ^= king
+        return False
 
     def capture_possible(self, current_position, candidate_position):
         """
@@ -113,3 +550,234 @@ class Board:
         if self.get_piece(current_position).player != self.get_piece(candidate_position).player:
             return True
         return False
+
+    def generate_moves(self, player):
+        """
+        Generates every pseudo-legal move for the given player in one pass, as (from_index, to_index, flags) tuples.
+        """
+        moves = []
+        self._add_pawn_captures(moves, player)
+        self._add_pawn_pushes(moves, player)
+        self._add_piece_moves(moves, player, ~self.occupancy[player] & FULL)
+        return moves
+
+    def generate_moves_to(self, player, piece_type, to_index):
+        """
+        Generates the pseudo-legal moves for the given player's pieces of one type which land on the given square, as
+        generate_moves would, without generating the rest. Every piece but a pawn attacks the squares it could come
+        from, so those pieces are found by looking from the target square.
+        """
+        target = 1 << to_index
+        if self.occupancy[player] & target:
+            return []
+        if piece_type is Pawn:
+            moves = []
+            self._add_pawn_captures(moves, player)
+            self._add_pawn_pushes(moves, player)
+            return [move for move in moves if move[1] == to_index]
+
+        attack_table, attack_lookup = PIECE_ATTACKS_BY_TYPE[piece_type]
+        if attack_table is not None:
+            origins = attack_table[to_index]
+        else:
+            origins = attack_lookup(to_index, self.occupied)
+        flags = CAPTURE if self.occupancy[player.opponent()] & target else QUIET
+        return [(from_index, to_index, flags) for from_index in iter_bits(origins & self.bitboards[player][piece_type])]
+
+    def iter_moves(self, player, include_quiet=True):
+        """
+        Yields the pseudo-legal moves for the given player in stages, captures first and then quiet moves, so that a
+        caller which stops early doesn't pay for the stages it never reaches. The board must be back in the same
+        position whenever the generator is resumed.
+        """
+        captures = []
+        self._add_pawn_captures(captures, player)
+        self._add_piece_moves(captures, player, self.occupancy[player.opponent()])
+        yield from captures
+        if include_quiet:
+            quiet_moves = []
+            self._add_pawn_pushes(quiet_moves, player)
+            self._add_piece_moves(quiet_moves, player, ~self.occupied & FULL)
+            yield from quiet_moves
+
+    def _add_piece_moves(self, moves, player, targetable):
+        """
+        Adds the moves of every piece but the pawns which land on one of the targetable squares.
+        """
+        occupied = self.occupied
+        enemy = self.occupancy[player.opponent()]
+        bitboards = self.bitboards[player]
+        for piece_type, attack_table, attack_lookup in PIECE_ATTACKS:
+            pieces = bitboards[piece_type]
+            while pieces:
+                piece = pieces & -pieces
+                from_index = piece.bit_length() - 1
+                if attack_table is not None:
+                    targets = attack_table[from_index] & targetable
+                else:
+                    targets = attack_lookup(from_index, occupied) & targetable
+                while targets:
+                    bit = targets & -targets
+                    moves.append((from_index, bit.bit_length() - 1, CAPTURE if bit & enemy else QUIET))
+                    targets ^= bit
+                pieces ^= piece
+
+    def generate_legal_moves(self, player):
+        """
+        Generates every legal move for the given player, as (from_index, to_index, flags) tuples.
+        """
+        is_legal = self._get_legality_check(player)
+        return [move for move in self.generate_moves(player) if is_legal(move)]
+
+    def iter_legal_moves(self, player, include_quiet=True):
+        """
+        Yields the legal moves for the given player in stages, captures first and then quiet moves. As with iter_moves,
+        the board must be back in the same position whenever the generator is resumed.
+        """
+        is_legal = self._get_legality_check(player)
+        for move in self.iter_moves(player, include_quiet):
+            if is_legal(move):
+                yield move
+
+    def has_legal_move(self, player):
+        """
+        Checks whether the given player has any legal move, stopping at the first one found.
+        """
+        return next(self.iter_legal_moves(player), None) is not None
+
+    def _get_legality_check(self, player):
+        """
+        Builds a function telling whether a pseudo-legal move for the given player is legal. The pieces giving check
+        and the pieces pinned to the king are found once, up front; only king moves and en passant captures need
+        looking at individually.
+        """
+        kings = self.bitboards[player][King]
+        if not kings or kings & (kings - 1):
+            return lambda move: self._is_legal_by_making(move, player)
+
+        king_index = kings.bit_length() - 1
+        opponent = player.opponent()
+        enemy_bitboards = self.bitboards[opponent]
+        occupied = self.occupied
+        checkers = self._attackers(king_index, opponent, enemy_bitboards, occupied)
+        double_check = checkers & (checkers - 1)
+        if checkers:
+            check_mask = BETWEEN[king_index][checkers.bit_length() - 1] | checkers
+        else:
+            check_mask = FULL
+        pin_masks = self._get_pin_masks(king_index, self.occupancy[player], occupied, enemy_bitboards)
+        occupied_without_king = occupied ^ (1 << king_index)
+        attackers = self._attackers
+
+        def is_legal(move):
+            from_index, to_index, flags = move
+            if from_index == king_index:
+                # Sliders attack straight through where the king is now, so it can't step back along their line
+                return not attackers(to_index, opponent, enemy_bitboards, occupied_without_king)
+            if double_check:
+                return False
+            if flags & EN_PASSANT:
+                # Two pieces leave the king's rank at once, which the pin masks can't describe
+                return self._is_legal_by_making(move, player)
+            return check_mask >> to_index & 1 and pin_masks.get(from_index, FULL) >> to_index & 1
+
+        return is_legal
+
+    @staticmethod
+    def _get_pin_masks(king_index, friendly, occupied, enemy_bitboards):
+        """
+        Finds the pieces pinned to the king, mapping each one's square to the squares it can still move to.
+        """
+        pin_masks = {}
+        queens = enemy_bitboards[Queen]
+        for attack_lookup, sliders in [(rook_attacks, enemy_bitboards[Rook] | queens),
+                                       (bishop_attacks, enemy_bitboards[Bishop] | queens)]:
+            blockers = attack_lookup(king_index, occupied) & friendly
+            pinners = attack_lookup(king_index, occupied ^ blockers) & sliders
+            while pinners:
+                pinner = pinners & -pinners
+                between = BETWEEN[king_index][pinner.bit_length() - 1]
+                pinned = between & friendly
+                if pinned:
+                    pin_masks[pinned.bit_length() - 1] = between | pinner
+                pinners ^= pinner
+        return pin_masks
+
+    def _is_legal_by_making(self, move, player):
+        self.make_move(move)
+        legal = not self.is_in_check(player)
+        self.unmake_move()
+        return legal
+
+    def legal_move_count(self, player):
+        """
+        Counts the legal moves available to the given player.
+        """
+        return len(self.generate_legal_moves(player))
+
+    def is_checkmate(self, player):
+        """
+        Checks whether the given player is in check with no legal moves.
+        """
+        return self.is_in_check(player) and not self.has_legal_move(player)
+
+    def is_stalemate(self, player):
+        """
+        Checks whether the given player is not in check but has no legal moves.
+        """
+        return not self.is_in_check(player) and not self.has_legal_move(player)
+
+    def _add_pawn_captures(self, moves, player):
+        """
+        Adds the captures of all the player's pawns at once, shifting the whole pawn bitboard diagonally forward.
+        """
+        pawns = self.bitboards[player][Pawn]
+        if not pawns:
+            return
+        enemy = self.occupancy[player.opponent()]
+        last_rank = LAST_RANKS[player]
+        for shift, offset in PAWN_CAPTURE_SHIFTS[player]:
+            targets = shift(pawns) & enemy
+            while targets:
+                bit = targets & -targets
+                to_index = bit.bit_length() - 1
+                moves.append((to_index - offset, to_index, CAPTURE | PROMOTION if bit & last_rank else CAPTURE))
+                targets ^= bit
+
+        # Only the opponent's pawn which has just moved two squares can be taken en passant
+        en_passant_pawn = self.en_passant_state
+        if en_passant_pawn is not None:
+            piece = self.get_piece(en_passant_pawn)
+            if piece is not None and piece.player != player:
+                to_index = en_passant_pawn.row * BOARD_SIZE + en_passant_pawn.col + PAWN_PUSH_OFFSETS[player]
+                if 0 <= to_index < 64 and not self.occupied >> to_index & 1:
+                    # The pawns which could capture onto a square are those a pawn there would attack backwards
+                    capturers = PAWN_ATTACKS[player.opponent()][to_index] & pawns
+                    while capturers:
+                        bit = capturers & -capturers
+                        moves.append((bit.bit_length() - 1, to_index, EN_PASSANT))
+                        capturers ^= bit
+
+    def _add_pawn_pushes(self, moves, player):
+        """
+        Adds the single and double steps forward of all the player's pawns at once.
+        """
+        pawns = self.bitboards[player][Pawn]
+        if not pawns:
+            return
+        empty = ~self.occupied & FULL
+        last_rank = LAST_RANKS[player]
+        offset = PAWN_PUSH_OFFSETS[player]
+        shift = shift_north if player == Player.WHITE else shift_south
+        single_steps = shift(pawns) & empty
+        double_steps = shift(single_steps & DOUBLE_STEP_RANKS[player]) & empty
+        while single_steps:
+            bit = single_steps & -single_steps
+            to_index = bit.bit_length() - 1
+            moves.append((to_index - offset, to_index, PROMOTION if bit & last_rank else QUIET))
+            single_steps ^= bit
+        while double_steps:
+            bit = double_steps & -double_steps
+            to_index = bit.bit_length() - 1
+            moves.append((to_index - 2 * offset, to_index, DOUBLE_PAWN_PUSH))
+            double_steps ^= bit
@@ -0,0 +1,132 @@
+"""
+Opening books: files of well known moves for positions near the start of the game, so that the engine doesn't need
+to search them. The file format follows Polyglot's. Each entry is 16 big-endian bytes: the position's key (8), the
+move (2), its weight (2) and a learning value (4) that is stored but not used. Entries are sorted by key, so the
+entries for a position are found by binary search.
+
+The keys are this engine's own Zobrist keys rather than Polyglot's, so books must be built for it (see
+chessington.engine.book_builder) rather than downloaded.
+
+A book is read through an mmap, so opening one costs nothing however large it is, and each lookup only touches the
+few pages that the binary search visits.
+"""
+
+import mmap
+import random
+import struct
+from collections import namedtuple
+
+from chessington.engine.moves import PROMOTION
+
+ENTRY = struct.Struct('>QHHI')
+KEY = struct.Struct('>Q')
+
+BookEntry = namedtuple('BookEntry', 'key move weight learn')
+BookMove = namedtuple('BookMove', 'move weight')
+
+# Polyglot's promotion piece codes, of which only the queen is ever needed here
+POLYGLOT_QUEEN_PROMOTION = 4
+
+
+def encode_move(move):
+    """
+    Encodes a move in Polyglot's format: to square in bits 0-5, from square in bits 6-11 and promotion piece in bits
+    12-14. The squares are numbered 8 * row + col, as ours are.
+    """
+    from_index, to_index, flags = move
+    promotion = POLYGLOT_QUEEN_PROMOTION if flags & PROMOTION else 0
+    return to_index | from_index << 6 | promotion << 12
+
+
+def write_book(path, entries):
+    """
+    Writes BookEntry (or equivalent tuple) entries to a book file, sorting them first.
+    """
+    with open(path, 'wb') as file:
+        for entry in sorted(entries):
+            file.write(ENTRY.pack(*entry))
+
+
+class OpeningBook:
+    """
+    An opening book file, opened for lookups. Use it as a context manager, or call close when done.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            file.seek(0, 2)
+            size = file.tell()
+            # An empty file can't be mapped, but is a valid book with no entries
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.entry_count = size // ENTRY.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.entry_count
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _first_entry_at_or_after(self, key):
+        low, high = 0, self.entry_count
+        while low < high:
+            middle = (low + high) >> 1
+            if KEY.unpack_from(self._mmap, middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def entries_for_key(self, key):
+        """
+        Finds every entry stored for the given key, in file order.
+        """
+        entries = []
+        index = self._first_entry_at_or_after(key)
+        while index < self.entry_count:
+            entry = BookEntry(*ENTRY.unpack_from(self._mmap, index * ENTRY.size))
+            if entry.key != key:
+                break
+            entries.append(entry)
+            index += 1
+        return entries
+
+    def lookup(self, board):
+        """
+        Finds the book moves for the board's current player, as BookMove tuples with the highest weights first. Only
+        moves which are legal on the board are returned, so a book entry for another position with the same key is
+        never played.
+        """
+        entries = self.entries_for_key(board.zobrist_key)
+        if not entries:
+            return []
+        legal_moves = {encode_move(move): move for move in board.generate_legal_moves(board.current_player)}
+        book_moves = [BookMove(legal_moves[entry.move], entry.weight) for entry in entries
+                      if entry.move in legal_moves and entry.weight > 0]
+        return sorted(book_moves, key=lambda book_move: -book_move.weight)
+
+    def best_move(self, board):
+        """
+        Finds the book move with the highest weight for the board's current player, or None if there isn't one.
+        """
+        book_moves = self.lookup(board)
+        return book_moves[0].move if book_moves else None
+
+    def choose_move(self, board, rng=random):
+        """
+        Picks a book move for the board's current player at random, in proportion to the moves' weights, or returns
+        None if there isn't one.
+        """
+        book_moves = self.lookup(board)
+        if not book_moves:
+            return None
+        return rng.choices([book_move.move for book_move in book_moves],
+                           weights=[book_move.weight for book_move in book_moves])[0]
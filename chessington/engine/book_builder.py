@@ -0,0 +1,208 @@
+"""
+Building opening books from collections of games. Every position up to a given ply is hashed, and for each position
+and move the builder counts how many games played it and how many points they scored. The counts are kept in memory
+up to a fixed number of positions and moves; beyond that they are sorted and spilled to a run file on disk, and the
+runs are merged when the book is written. This way a book can be built from any number of games in bounded memory.
+
+A move's weight in the book is the points scored by the side playing it: two for a win and one for a draw.
+
+Run as a script, it builds a book from PGN files.
+"""
+
+import argparse
+import heapq
+import os
+import struct
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from itertools import groupby
+
+from chessington.engine.board import Board
+from chessington.engine.book import ENTRY, encode_move
+from chessington.engine.data import Player
+from chessington.engine.pgn import read_pgn
+
+# key (8) + move (2) + games (4) + points (4)
+RUN_RECORD = struct.Struct('>QHII')
+RECORDS_PER_READ = 4096
+MAX_WEIGHT = 0xFFFF
+MAX_COUNT = 0xFFFFFFFF
+
+WHITE_WIN = '1-0'
+BLACK_WIN = '0-1'
+DRAW = '1/2-1/2'
+
+# Points for each result, for the side to move, as (White's, Black's)
+RESULT_POINTS = {WHITE_WIN: (2, 0), BLACK_WIN: (0, 2), DRAW: (1, 1)}
+
+BuildStats = namedtuple('BuildStats', 'games positions runs seconds')
+
+
+def print_progress(stats):
+    """
+    Reports progress of a build on standard error.
+    """
+    rate = stats.games / stats.seconds if stats.seconds else 0
+    print('{} games, {} positions, {} runs spilled, {:.0f} games/s'.format(
+        stats.games, stats.positions, stats.runs, rate), file=sys.stderr)
+
+
+class BookBuilder:
+    """
+    Aggregates the moves played in games into an opening book.
+
+    Games are added as the sequence of moves played from the starting position, as (from_index, to_index, flags)
+    tuples, and the result ('1-0', '0-1' or '1/2-1/2'; anything else counts the moves but scores no points). Only
+    the first max_ply moves of each game are used. At most max_entries position and move counts are held in memory
+    before being spilled to disk, in temp_dir if given. If progress is given it is called with a BuildStats every
+    progress_interval games.
+    """
+
+    def __init__(self, max_ply=20, max_entries=1000000, temp_dir=None, progress=None, progress_interval=10000):
+        self.max_ply = max_ply
+        self.max_entries = max_entries
+        self.temp_dir = temp_dir
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.games = 0
+        self.positions = 0
+        self._counts = {}
+        self._runs = []
+        self._board = Board.at_starting_position()
+        self._start = time.perf_counter()
+
+    def add_game(self, moves, result):
+        """
+        Counts the moves of one game, played from the starting position.
+        """
+        points = RESULT_POINTS.get(result, (0, 0))
+        board = self._board
+        counts = self._counts
+        made = 0
+        try:
+            for move in moves:
+                if made >= self.max_ply:
+                    break
+                key = (board.zobrist_key, encode_move(move))
+                move_points = points[0] if board.current_player == Player.WHITE else points[1]
+                count = counts.get(key)
+                if count is None:
+                    counts[key] = [1, move_points]
+                else:
+                    count[0] += 1
+                    count[1] += move_points
+                board.make_move(move)
+                made += 1
+        finally:
+            for _ in range(made):
+                board.unmake_move()
+
+        self.games += 1
+        self.positions += made
+        if len(counts) >= self.max_entries:
+            self._spill()
+        if self.progress is not None and self.games % self.progress_interval == 0:
+            self.progress(self.stats())
+
+    def add_games(self, games):
+        """
+        Counts the moves of every (moves, result) pair in an iterable of games.
+        """
+        for moves, result in games:
+            self.add_game(moves, result)
+
+    def stats(self):
+        return BuildStats(self.games, self.positions, len(self._runs), time.perf_counter() - self._start)
+
+    def _spill(self):
+        """
+        Writes the counts held in memory to a new run file, sorted, and forgets them.
+        """
+        descriptor, path = tempfile.mkstemp(prefix='book-run-', suffix='.bin', dir=self.temp_dir)
+        with os.fdopen(descriptor, 'wb') as file:
+            for (key, move), (games, points) in sorted(self._counts.items()):
+                file.write(RUN_RECORD.pack(key, move, min(games, MAX_COUNT), min(points, MAX_COUNT)))
+        self._runs.append(path)
+        self._counts = {}
+
+    @staticmethod
+    def _read_run(path):
+        with open(path, 'rb') as file:
+            while True:
+                data = file.read(RUN_RECORD.size * RECORDS_PER_READ)
+                if not data:
+                    return
+                yield from RUN_RECORD.iter_unpack(data)
+
+    def _merged_counts(self):
+        """
+        Yields (key, move, games, points) for every position and move, in order, adding up the counts from each run.
+        """
+        in_memory = ((key, move, games, points) for (key, move), (games, points) in sorted(self._counts.items()))
+        current = None
+        for key, move, games, points in heapq.merge(in_memory, *[self._read_run(path) for path in self._runs]):
+            if current is not None and current[0] == key and current[1] == move:
+                current[2] += games
+                current[3] += points
+                continue
+            if current is not None:
+                yield current
+            current = [key, move, games, points]
+        if current is not None:
+            yield current
+
+    def write(self, path, min_games=1):
+        """
+        Writes the book, leaving out moves played in fewer than min_games games and moves which never scored. Where
+        a position's weights don't fit in 16 bits they are scaled down together. Everything counted so far is then
+        discarded, run files included. Returns the number of entries written.
+        """
+        written = 0
+        try:
+            with open(path, 'wb') as file:
+                for key, counts in groupby(self._merged_counts(), key=lambda count: count[0]):
+                    position_moves = [(move, points) for _, move, games, points in counts if games >= min_games]
+                    highest = max((points for _, points in position_moves), default=0)
+                    scale = MAX_WEIGHT / highest if highest > MAX_WEIGHT else 1
+                    for move, points in position_moves:
+                        weight = int(points * scale)
+                        if weight > 0:
+                            file.write(ENTRY.pack(key, move, weight, 0))
+                            written += 1
+        finally:
+            self._counts = {}
+            self._remove_runs()
+        return written
+
+    def _remove_runs(self):
+        for path in self._runs:
+            os.remove(path)
+        self._runs = []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build an opening book from PGN files.')
+    parser.add_argument('pgn', nargs='+', help='the PGN files to read, which may be gzipped')
+    parser.add_argument('--output', default='book.bin', help='the book file to write (default book.bin)')
+    parser.add_argument('--max-ply', type=int, default=20, help='how many moves of each game to use (default 20)')
+    parser.add_argument('--min-games', type=int, default=1,
+                        help='leave out moves played in fewer games than this (default 1)')
+    parser.add_argument('--max-entries', type=int, default=1000000,
+                        help='how many counts to hold in memory before spilling to disk (default 1000000)')
+    parser.add_argument('--temp-dir', help='where to spill counts to (default the system temporary directory)')
+    parser.add_argument('--quiet', action='store_true', help="don't report progress")
+    args = parser.parse_args(argv)
+
+    builder = BookBuilder(args.max_ply, args.max_entries, args.temp_dir, None if args.quiet else print_progress)
+    # Games which can't be replayed to the end, such as those with castling, still count up to that point
+    games_cut_short = 0
+    for path in args.pgn:
+        for game in read_pgn(path, strict=False, max_plies=args.max_ply):
+            games_cut_short += game.error is not None
+            builder.add_game(game.moves, game.result)
+    games = builder.games
+    written = builder.write(args.output, args.min_games)
+    print('{} games ({} cut short), {} entries written to {}'.format(games, games_cut_short, written, args.output))
+    return 0
@@ -13,6 +13,10 @@ class Player(Enum):
     WHITE = auto()
     BLACK = auto()
 
+    # Players are dictionary keys all through the engine, and hashing by identity is much cheaper than Enum's default
+    # of hashing the member's name
+    __hash__ = object.__hash__
+
     def opponent(self):
         if self == Player.WHITE:
             return Player.BLACK
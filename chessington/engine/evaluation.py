@@ -0,0 +1,155 @@
+"""
+Static evaluation of positions: material plus piece-square tables, tapered between middlegame and endgame values by
+how much material is left on the board. The board keeps running middlegame and endgame totals up to date as pieces
+are placed and removed, so evaluating a position never needs to look at the squares.
+"""
+
+from chessington.engine.data import Player
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+
+MIDDLEGAME_VALUES = {Pawn: 82, Knight: 337, Bishop: 365, Rook: 477, Queen: 1025, King: 0}
+ENDGAME_VALUES = {Pawn: 94, Knight: 281, Bishop: 297, Rook: 512, Queen: 936, King: 0}
+
+# How much each piece counts towards the game still being in the middlegame
+PHASE_WEIGHTS = {Pawn: 0, Knight: 1, Bishop: 1, Rook: 2, Queen: 4, King: 0}
+TOTAL_PHASE = 24
+
+# Piece-square tables from White's point of view, laid out as the board is seen from White's side: the first row of
+# numbers is the eighth rank.
+PAWN_TABLE = [
+    0, 0, 0, 0, 0, 0, 0, 0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+]
+PAWN_ENDGAME_TABLE = [
+    0, 0, 0, 0, 0, 0, 0, 0,
+    80, 80, 80, 80, 80, 80, 80, 80,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    30, 30, 30, 30, 30, 30, 30, 30,
+    20, 20, 20, 20, 20, 20, 20, 20,
+    10, 10, 10, 10, 10, 10, 10, 10,
+    0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0,
+]
+KNIGHT_TABLE = [
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+]
+BISHOP_TABLE = [
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+]
+ROOK_TABLE = [
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    0, 0, 0, 5, 5, 0, 0, 0,
+]
+QUEEN_TABLE = [
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    0, 0, 5, 5, 5, 5, 0, -5,
+    -10, 5, 5, 5, 5, 5, 0, -10,
+    -10, 0, 5, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20,
+]
+KING_TABLE = [
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20,
+]
+KING_ENDGAME_TABLE = [
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+]
+
+MIDDLEGAME_TABLES = {Pawn: PAWN_TABLE, Knight: KNIGHT_TABLE, Bishop: BISHOP_TABLE, Rook: ROOK_TABLE,
+                     Queen: QUEEN_TABLE, King: KING_TABLE}
+ENDGAME_TABLES = {Pawn: PAWN_ENDGAME_TABLE, Knight: KNIGHT_TABLE, Bishop: BISHOP_TABLE, Rook: ROOK_TABLE,
+                  Queen: QUEEN_TABLE, King: KING_ENDGAME_TABLE}
+
+
+def _table_index(player, index):
+    """
+    Finds the entry of a piece-square table for a piece on the square with the given index, 8 * row + col.
+    """
+    row, col = index >> 3, index & 7
+    return (7 - row) * 8 + col if player == Player.WHITE else row * 8 + col
+
+
+def _build_piece_scores():
+    """
+    Combines values and tables into (middlegame, endgame, phase) contributions for every player, piece type and
+    square. Black's contributions are negative, so the totals are always from White's point of view.
+    """
+    piece_scores = {}
+    for player in Player:
+        sign = 1 if player == Player.WHITE else -1
+        piece_scores[player] = {}
+        for piece_type in MIDDLEGAME_TABLES:
+            piece_scores[player][piece_type] = [
+                (sign * (MIDDLEGAME_VALUES[piece_type] + MIDDLEGAME_TABLES[piece_type][_table_index(player, index)]),
+                 sign * (ENDGAME_VALUES[piece_type] + ENDGAME_TABLES[piece_type][_table_index(player, index)]),
+                 PHASE_WEIGHTS[piece_type])
+                for index in range(64)]
+    return piece_scores
+
+
+PIECE_SCORES = _build_piece_scores()
+
+
+def compute_scores(board):
+    """
+    Computes the middlegame total, endgame total and phase of a board from scratch.
+    """
+    middlegame = endgame = phase = 0
+    for player in Player:
+        for square, piece in board.get_piece_squares(player):
+            scores = PIECE_SCORES[player][type(piece)][square.row * 8 + square.col]
+            middlegame += scores[0]
+            endgame += scores[1]
+            phase += scores[2]
+    return middlegame, endgame, phase
+
+
+def evaluate(board):
+    """
+    Scores a position in centipawns from the point of view of the side to move, using the board's running totals.
+    """
+    phase = min(board.phase, TOTAL_PHASE)
+    score = (board.middlegame_score * phase + board.endgame_score * (TOTAL_PHASE - phase)) // TOTAL_PHASE
+    return score if board.current_player == Player.WHITE else -score
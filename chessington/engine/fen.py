@@ -0,0 +1,31 @@
+"""
+Loading positions in bulk from files of FEN strings, one position per line. Blank lines and lines starting with #
+are skipped.
+"""
+
+from chessington.engine.board import Board
+
+
+def read_fens(lines, shared_pieces=False):
+    """
+    Yields a board for each FEN string in an iterable of lines, such as an open file, without holding more than one
+    line at a time. Raises ValueError, giving the line number, for a line which isn't valid FEN. With shared_pieces,
+    the boards share their pieces (see Piece.shared), which saves memory when many are kept.
+    """
+    from_fen = Board.from_fen
+    for line_number, line in enumerate(lines, 1):
+        fen = line.strip()
+        if not fen or fen.startswith('#'):
+            continue
+        try:
+            yield from_fen(fen, shared_pieces)
+        except ValueError as error:
+            raise ValueError('Line {}: {}'.format(line_number, error)) from error
+
+
+def load_fens(path, shared_pieces=False):
+    """
+    Reads every position in a file of FEN strings into a list of boards.
+    """
+    with open(path) as file:
+        return list(read_fens(file, shared_pieces))
@@ -0,0 +1,59 @@
+"""
+A compact representation of moves. A move is a tuple (from_index, to_index, flags) where the indices are square
+numbers 8 * row + col and flags is a combination of the constants below. Where moves are stored rather than played,
+as in the transposition tables, they are packed into a 16-bit integer each (see pack_move).
+"""
+
+from chessington.engine.attacks import SQUARES, square_index
+
+QUIET = 0
+CAPTURE = 1
+DOUBLE_PAWN_PUSH = 2
+EN_PASSANT = 4
+PROMOTION = 8
+
+
+def move_between(from_square, to_square, flags=QUIET):
+    """
+    Creates a move between two squares.
+    """
+    return square_index(from_square), square_index(to_square), flags
+
+
+def packed_move_between(from_square, to_square, flags=QUIET):
+    """
+    Creates a move between two squares, packed as by pack_move.
+    """
+    return square_index(from_square) | square_index(to_square) << 6 | flags << 12
+
+
+def move_squares(move):
+    """
+    Converts a move, either a tuple or packed, into its (from_square, to_square) pair.
+    """
+    if isinstance(move, int):
+        return SQUARES[move & 0x3F], SQUARES[(move >> 6) & 0x3F]
+    return SQUARES[move[0]], SQUARES[move[1]]
+
+
+def is_capture(move):
+    """
+    Checks whether a move, either a tuple or packed, captures a piece, including by en passant.
+    """
+    if isinstance(move, int):
+        return bool(move >> 12 & (CAPTURE | EN_PASSANT))
+    return bool(move[2] & (CAPTURE | EN_PASSANT))
+
+
+def pack_move(move):
+    """
+    Packs a move into a 16-bit integer: from_index in bits 0-5, to_index in bits 6-11 and flags in bits 12-15.
+    """
+    return move[0] | move[1] << 6 | move[2] << 12
+
+
+def unpack_move(packed):
+    """
+    Unpacks a 16-bit integer created by pack_move back into a move.
+    """
+    return packed & 0x3F, (packed >> 6) & 0x3F, packed >> 12
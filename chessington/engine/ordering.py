@@ -0,0 +1,120 @@
+"""
+Move ordering for the search. Alpha-beta prunes the most when the best move is searched first, so moves are sorted
+by how promising they look: the transposition table move, then captures by most valuable victim and least valuable
+attacker (MVV-LVA), then killer moves which caused a cutoff at the same ply elsewhere in the tree, then the remaining
+quiet moves by how often they have caused cutoffs before (the history heuristic).
+"""
+
+from chessington.engine.attacks import SQUARES
+from chessington.engine.data import Player
+from chessington.engine.evaluation import MIDDLEGAME_VALUES
+from chessington.engine.moves import CAPTURE, EN_PASSANT, PROMOTION
+from chessington.engine.pieces import Pawn, Queen
+
+TABLE_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 24
+KILLER_SCORES = [1 << 22, (1 << 22) - 1]
+PROMOTION_SCORE = 1 << 20
+KILLERS_PER_PLY = 2
+HISTORY_LIMIT = 1 << 18
+
+# Victims are worth much more than attackers, so any capture of a bigger piece comes before any capture of a smaller
+VICTIM_WEIGHT = 64
+
+
+class MoveOrderer:
+    """
+    Sorts moves into the order the search should try them, learning from the cutoffs the search reports back.
+    """
+
+    def __init__(self, max_ply):
+        self.max_ply = max_ply
+        self.killers = [[None] * KILLERS_PER_PLY for _ in range(max_ply)]
+        self.history = {player: {} for player in Player}
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        """
+        Forgets the killer moves, which belong to the previous position, and halves the history scores so that
+        recent cutoffs count for more than old ones.
+        """
+        self.killers = [[None] * KILLERS_PER_PLY for _ in range(self.max_ply)]
+        for player_history in self.history.values():
+            for key in player_history:
+                player_history[key] >>= 1
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def clear(self):
+        """
+        Forgets everything learned so far.
+        """
+        self.history = {player: {} for player in Player}
+        self.new_search()
+
+    def order(self, board, moves, table_move=None, ply=0):
+        """
+        Sorts moves for the board's current position, best first.
+        """
+        return sorted(moves, key=lambda move: self.score_move(board, move, table_move, ply), reverse=True)
+
+    def score_move(self, board, move, table_move=None, ply=0):
+        """
+        Gives a move a score for sorting; higher scores are searched first.
+        """
+        if move == table_move:
+            return TABLE_MOVE_SCORE
+        from_index, to_index, flags = move
+        if flags & (CAPTURE | EN_PASSANT):
+            attacker = type(board.get_piece(SQUARES[from_index]))
+            victim = Pawn if flags & EN_PASSANT else type(board.get_piece(SQUARES[to_index]))
+            score = CAPTURE_SCORE + VICTIM_WEIGHT * MIDDLEGAME_VALUES[victim] - MIDDLEGAME_VALUES[attacker] // 10
+            return score + MIDDLEGAME_VALUES[Queen] if flags & PROMOTION else score
+        if flags & PROMOTION:
+            return PROMOTION_SCORE
+        if ply < self.max_ply:
+            killers = self.killers[ply]
+            for slot in range(KILLERS_PER_PLY):
+                if killers[slot] == move:
+                    return KILLER_SCORES[slot]
+        piece = board.get_piece(SQUARES[from_index])
+        return self.history[piece.player].get((type(piece), to_index), 0)
+
+    def record_cutoff(self, board, move, depth, ply, move_number):
+        """
+        Records that a move caused a beta cutoff, move_number being how many moves were searched before it. Quiet
+        moves become killers at this ply and gain history for their piece and destination. Must be called with the
+        board in the position the move was played from.
+        """
+        self.cutoffs += 1
+        if move_number == 0:
+            self.first_move_cutoffs += 1
+        from_index, to_index, flags = move
+        if flags & (CAPTURE | EN_PASSANT | PROMOTION):
+            return
+
+        if ply < self.max_ply:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+
+        piece = board.get_piece(SQUARES[from_index])
+        player_history = self.history[piece.player]
+        key = (type(piece), to_index)
+        player_history[key] = player_history.get(key, 0) + depth * depth
+        if player_history[key] > HISTORY_LIMIT:
+            for other_key in player_history:
+                player_history[other_key] >>= 1
+
+    def stats(self):
+        """
+        Reports how many cutoffs there have been since the search started, and how many came from the first move
+        searched. The closer the first-move rate is to 1, the better the ordering.
+        """
+        return {
+            'cutoffs': self.cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+        }
@@ -0,0 +1,170 @@
+"""
+A parallel search which spreads the moves at the root across a pool of worker processes, so that a search can use
+every core rather than the one the GIL allows. The search deepens one ply at a time as Searcher does. At each depth
+the first move, the best one from the depth before, is searched on its own with a full window; the remaining moves
+are then searched at once with a null window around its score, which is enough to show that nearly all of them are
+no better, and the few that prove better are searched again to find their score. Workers are sent the position in
+the board's compact serialized form together with the move and the window.
+
+Each worker empties its own transposition table and move ordering statistics before each move it searches, so the
+merged result is the same from run to run, however the work happens to be scheduled (unless a time limit cuts the
+search short). The workers can instead share one SharedTranspositionTable, so that they reuse each other's results
+rather than searching the same positions again. What each worker finds in the table then depends on what the others
+have done so far, so the result is no longer guaranteed to be the same from run to run.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chessington.engine.board import Board
+from chessington.engine.ordering import MoveOrderer
+from chessington.engine.search import Searcher, SearchResult, MATE_SCORE, MAX_PLY, is_mate_score
+
+# The table shared by the searches in this worker process, if any, and the searcher which uses it
+_worker_table = None
+_worker_searcher = None
+
+
+def _start_worker(table):
+    global _worker_table, _worker_searcher
+    _worker_table = table
+    _worker_searcher = Searcher(table=table)
+
+
+def _search_root_move(task):
+    """
+    Searches one root move within a window in a worker process, returning the score and principal variation (or None
+    if a limit ran out) together with the number of nodes searched, which count towards the node limit even when the
+    search was cut short.
+    """
+    board_bytes, move, depth, alpha, beta, node_limit, deadline = task
+    board = Board.from_bytes(board_bytes, shared_pieces=True)
+    searcher = _worker_searcher
+    if _worker_table is None:
+        searcher.table.clear()
+    searcher.orderer.clear()
+    # The deadline is a wall clock time, since each process's performance counter may count from a different point
+    time_limit = deadline - time.time() if deadline is not None else None
+    result = searcher.search_move(board, move, depth, alpha, beta, node_limit, time_limit)
+    return result, searcher.nodes
+
+
+class ParallelSearcher:
+    """
+    Searches positions across a pool of worker processes, which share the given SharedTranspositionTable if there
+    is one. Use it as a context manager, or call close when done, so that the worker processes are shut down.
+    """
+
+    def __init__(self, workers=None, table=None):
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.table = table
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_start_worker, initargs=(table,))
+        self._nodes = 0
+        self._node_limit = None
+        self._deadline = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def search(self, board, max_depth=4, node_limit=None, time_limit=None):
+        """
+        Searches for the best move for the board's current player, deepening one ply at a time until max_depth is
+        reached or the node limit or time limit (in seconds) runs out, as Searcher.search does. The limits are for
+        the whole search: the time limit is a deadline shared by every worker, and whatever is left of the node limit
+        is shared out between the moves searched at once. Equal scores are broken in favour of the move searched
+        first, so the result does not depend on which worker finishes first.
+        """
+        start = time.perf_counter()
+        moves = board.generate_legal_moves(board.current_player)
+        if not moves:
+            score = -MATE_SCORE if board.is_in_check(board.current_player) else 0
+            return SearchResult(None, score, 0, [], 0, time.perf_counter() - start)
+
+        self._nodes = 0
+        self._node_limit = node_limit
+        self._deadline = time.time() + time_limit if time_limit is not None else None
+        if self.table is not None:
+            # The workers search within this one search, so only it marks a new search in the shared table
+            self.table.new_search()
+
+        board_bytes = board.to_bytes()
+        root_moves = MoveOrderer(MAX_PLY).order(board, moves)
+        result = SearchResult(root_moves[0], 0, 0, [root_moves[0]], 0, 0.0)
+        for depth in range(1, max_depth + 1):
+            searched = self._search_root(board_bytes, root_moves, depth)
+            if searched is None:
+                break
+            score, principal_variation = searched
+            result = SearchResult(principal_variation[0], score, depth, principal_variation, self._nodes,
+                                  time.perf_counter() - start)
+            # Search the best move first next time round
+            root_moves.remove(principal_variation[0])
+            root_moves.insert(0, principal_variation[0])
+            if is_mate_score(score):
+                break
+        return result._replace(nodes=self._nodes, seconds=time.perf_counter() - start)
+
+    def _search_root(self, board_bytes, moves, depth):
+        """
+        Searches every root move to the given depth, returning the best score and principal variation, or None if a
+        limit ran out before every move was searched.
+        """
+        first = self._search_moves(board_bytes, moves[:1], depth, -MATE_SCORE - 1, MATE_SCORE + 1)
+        if first is None:
+            return None
+        alpha, best_variation = first[0]
+
+        # A null window only tells whether each move beats the first, so those which do are searched again
+        results = self._search_moves(board_bytes, moves[1:], depth, alpha, alpha + 1)
+        if results is None:
+            return None
+        better_moves = [move for move, (score, _) in zip(moves[1:], results) if score > alpha]
+        results = self._search_moves(board_bytes, better_moves, depth, alpha, MATE_SCORE + 1)
+        if results is None:
+            return None
+        for score, variation in results:
+            if score > alpha:
+                alpha = score
+                best_variation = variation
+        return alpha, best_variation
+
+    def _search_moves(self, board_bytes, moves, depth, alpha, beta):
+        """
+        Searches the moves at once in the workers, returning their results in the same order, or None if a limit ran
+        out before every move was searched.
+        """
+        if not moves:
+            return []
+        node_limit = None
+        if self._node_limit is not None:
+            node_limit = (self._node_limit - self._nodes) // len(moves)
+            if node_limit <= 0:
+                return None
+        futures = [self._executor.submit(_search_root_move, (board_bytes, move, depth, alpha, beta, node_limit,
+                                                             self._deadline))
+                   for move in moves]
+        results = []
+        for future in futures:
+            result, nodes = future.result()
+            self._nodes += nodes
+            if result is None:
+                for other_future in futures:
+                    other_future.cancel()
+                return None
+            results.append(result)
+        return results
+
+
+def parallel_search(board, max_depth=4, workers=None, node_limit=None, time_limit=None, table=None):
+    """
+    Searches for the best move for the board's current player with a fresh pool of workers.
+    """
+    with ParallelSearcher(workers, table) as searcher:
+        return searcher.search(board, max_depth=max_depth, node_limit=node_limit, time_limit=time_limit)
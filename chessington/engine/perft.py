@@ -0,0 +1,95 @@
+"""
+Perft: counting the leaf nodes of the move tree to a fixed depth. The counts for well known positions are published,
+so perft both checks that move generation is correct and measures how fast it is.
+
+Run with ``poetry run perft``; see ``poetry run perft --help`` for the options.
+"""
+
+import argparse
+import time
+from collections import namedtuple
+
+from chessington.engine.board import Board
+from chessington.engine.moves import move_squares
+
+PerftPosition = namedtuple('PerftPosition', 'name fen node_counts')
+
+# Published node counts, by depth starting from 1. The game has no castling or under-promotion, so only positions
+# and depths where neither can occur are included.
+STANDARD_POSITIONS = [
+    PerftPosition('start', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1', [20, 400, 8902, 197281, 4865609]),
+    PerftPosition('position3', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', [14, 191, 2812, 43238, 674624]),
+    PerftPosition('position6', 'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+                  [46, 2079, 89890, 3894594]),
+]
+
+
+def perft(board, depth):
+    """
+    Counts the positions reached after exactly depth moves from the given board.
+    """
+    if depth == 0:
+        return 1
+    moves = board.generate_legal_moves(board.current_player)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board, depth):
+    """
+    Counts the positions reached after exactly depth moves from the given board, separately for each first move.
+    """
+    counts = {}
+    for move in board.generate_legal_moves(board.current_player):
+        board.make_move(move)
+        counts[move] = perft(board, depth - 1)
+        board.unmake_move()
+    return counts
+
+
+def _square_name(square):
+    return 'abcdefgh'[square.col] + str(square.row + 1)
+
+
+def _run_position(position, depth, show_divide):
+    board = Board.from_fen(position.fen)
+    start = time.perf_counter()
+    if show_divide:
+        counts = divide(board, depth)
+        for move, count in sorted(counts.items()):
+            from_square, to_square = move_squares(move)
+            print('  {}{}: {}'.format(_square_name(from_square), _square_name(to_square), count))
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(board, depth)
+    seconds = time.perf_counter() - start
+
+    expected = position.node_counts[depth - 1] if depth <= len(position.node_counts) else None
+    status = 'unknown' if expected is None else 'ok' if nodes == expected else 'FAILED (expected {})'.format(expected)
+    print('{} depth {}: {} nodes in {:.2f}s, {:.0f} nodes/s, {}'.format(
+        position.name, depth, nodes, seconds, nodes / seconds if seconds else 0, status))
+    return expected is None or nodes == expected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Count move tree leaf nodes for standard positions.')
+    parser.add_argument('--depth', type=int, default=3, help='the depth to search to (default 3)')
+    parser.add_argument('--position', choices=[position.name for position in STANDARD_POSITIONS],
+                        help='only run the named position')
+    parser.add_argument('--fen', help='run a position given as a FEN string instead of the standard positions')
+    parser.add_argument('--divide', action='store_true', help='show the node count under each first move')
+    args = parser.parse_args(argv)
+
+    if args.fen:
+        positions = [PerftPosition('fen', args.fen, [])]
+    else:
+        positions = [position for position in STANDARD_POSITIONS
+                     if args.position is None or position.name == args.position]
+    results = [_run_position(position, args.depth, args.divide) for position in positions]
+    return 0 if all(results) else 1
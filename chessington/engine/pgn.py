@@ -0,0 +1,272 @@
+"""
+Reading games from PGN files. Games are streamed one at a time from any iterable of lines, such as an open file, so
+archives of any size, gzipped or not, can be read in constant memory.
+
+Each move's SAN is resolved against the board's own move generation, which also checks that it is legal. The game has
+no castling and pawns only promote to queens, so games using either can't be replayed past that point.
+"""
+
+import gzip
+import re
+from collections import namedtuple
+
+from chessington.engine.board import Board, BOARD_SIZE, FEN_FILES
+from chessington.engine.moves import PROMOTION, is_capture
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+
+TAG_PATTERN = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Brace comments (which may run on past the end of the line), rest of line comments, NAGs, variation brackets and
+# everything else, which is move numbers, moves and results
+TOKEN_PATTERN = re.compile(r'\{[^}]*\}|\{.*|;.*|\$\d+|[()]|[^\s{}();$]+')
+MOVE_NUMBER_PATTERN = re.compile(r'\d+\.+')
+SAN_PATTERN = re.compile(r'([NBRQK])?([a-h])?([1-8])?(x)?([a-h][1-8])(?:=?([NBRQ]))?[+#]?[!?]*$')
+CASTLING_PATTERN = re.compile(r'[O0]-[O0](-[O0])?[+#]?[!?]*$')
+
+RESULTS = {'1-0', '0-1', '1/2-1/2', '*'}
+SAN_PIECES = {None: Pawn, 'N': Knight, 'B': Bishop, 'R': Rook, 'Q': Queen, 'K': King}
+SAN_LETTERS = {piece_type: letter for letter, piece_type in SAN_PIECES.items() if letter is not None}
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+class Game(namedtuple('Game', 'headers san moves result error')):
+    """
+    A game read from a PGN file: its tag pairs as a dict, its moves as SAN strings, the same moves as
+    (from_index, to_index, flags) tuples, and its result. moves is None if the moves weren't resolved. If a move
+    couldn't be resolved, moves holds those before it and error says what went wrong; otherwise error is None.
+    """
+
+    def replay(self):
+        """
+        Yields (board, move) for each resolved move, with the board in the position before the move is made. The same
+        board is used throughout and the move is made on it once the caller resumes.
+        """
+        board = starting_board(self.headers)
+        for move in self.moves or []:
+            yield board, move
+            board.make_move(move)
+
+
+def starting_board(headers):
+    """
+    Sets up the board a game starts from: the position in its FEN tag if it has one, or else the starting position.
+    """
+    fen = headers.get('FEN')
+    return Board.from_fen(fen) if fen else Board.at_starting_position()
+
+
+def parse_square(name):
+    return (int(name[1]) - 1) * BOARD_SIZE + FEN_FILES.index(name[0])
+
+
+def square_name(index):
+    return FEN_FILES[index % BOARD_SIZE] + str(index // BOARD_SIZE + 1)
+
+
+def _play_san(board, san):
+    """
+    Finds the legal move for the board's current player which the SAN describes, and makes it. The SAN has to mark
+    captures and promotions exactly when the move is one, so a corrupt move is rejected rather than read as another.
+    """
+    match = SAN_PATTERN.match(san)
+    if match is None:
+        if CASTLING_PATTERN.match(san):
+            raise ValueError('Castling is not supported: {!r}'.format(san))
+        raise ValueError('Invalid SAN move: {!r}'.format(san))
+    piece_letter, from_file, from_rank, capture, to_name, promotion = match.groups()
+    piece_type = SAN_PIECES[piece_letter]
+    # A pawn move names the file it comes from if and only if it is a capture, and never the rank
+    if piece_type is Pawn and (from_rank is not None or (from_file is None) != (capture is None)):
+        raise ValueError('Invalid SAN move: {!r}'.format(san))
+    if promotion is not None and promotion != 'Q':
+        raise ValueError('Only promotion to a queen is supported: {!r}'.format(san))
+
+    to_index = parse_square(to_name)
+    from_col = FEN_FILES.index(from_file) if from_file is not None else None
+    from_row = int(from_rank) - 1 if from_rank is not None else None
+    player = board.current_player
+    moves = [move for move in board.generate_moves_to(player, piece_type, to_index)
+             if (from_col is None or move[0] % BOARD_SIZE == from_col)
+             and (from_row is None or move[0] // BOARD_SIZE == from_row)]
+    candidates = [move for move in moves if is_capture(move) == (capture is not None)]
+    if moves and not candidates:
+        raise ValueError(('Not a capture: {!r}' if capture else 'Capture not marked with x: {!r}').format(san))
+    # Every candidate lands on the same square, so they are all promotions or none are
+    if candidates and bool(candidates[0][2] & PROMOTION) != (promotion is not None):
+        raise ValueError(('Not a promotion: {!r}' if promotion else 'Promotion piece not given: {!r}').format(san))
+
+    # Only the moves which fit the SAN need checking for legality, which making them does anyway
+    legal_move = None
+    for move in candidates:
+        board.make_move(move)
+        legal = not board.is_in_check(player)
+        if legal and len(candidates) == 1:
+            # The usual case, where the move can be kept rather than taken back and made again
+            return move
+        board.unmake_move()
+        if legal:
+            if legal_move is not None:
+                raise ValueError('Ambiguous move: {!r}'.format(san))
+            legal_move = move
+    if legal_move is None:
+        raise ValueError('Illegal move: {!r}'.format(san))
+    board.make_move(legal_move)
+    return legal_move
+
+
+def parse_san(board, san):
+    """
+    Finds the legal move for the board's current player which a move in SAN describes, such as 'Nbd7' or 'exd8=Q+'.
+    Raises ValueError if there is no such move, or more than one.
+    """
+    move = _play_san(board, san)
+    board.unmake_move()
+    return move
+
+
+def move_to_san(board, move):
+    """
+    Writes a legal move for the board's current player in SAN, naming the file or rank it moves from where another
+    piece of the same type could move to the same square, and marking checks and checkmates.
+    """
+    from_index, to_index, flags = move
+    player = board.current_player
+    piece_type = type(board.board[from_index // BOARD_SIZE][from_index % BOARD_SIZE])
+    capture = 'x' if is_capture(move) else ''
+    if piece_type is Pawn:
+        san = (FEN_FILES[from_index % BOARD_SIZE] if capture else '') + capture + square_name(to_index)
+        if flags & PROMOTION:
+            san += '=Q'
+    else:
+        others = [other[0] for other in board.generate_legal_moves(player)
+                  if other[1] == to_index and other[0] != from_index
+                  and type(board.board[other[0] // BOARD_SIZE][other[0] % BOARD_SIZE]) is piece_type]
+        origin = square_name(from_index)
+        if not others:
+            disambiguation = ''
+        elif all(other % BOARD_SIZE != from_index % BOARD_SIZE for other in others):
+            disambiguation = origin[0]
+        elif all(other // BOARD_SIZE != from_index // BOARD_SIZE for other in others):
+            disambiguation = origin[1]
+        else:
+            disambiguation = origin
+        san = SAN_LETTERS[piece_type] + disambiguation + capture + square_name(to_index)
+
+    board.make_move(move)
+    opponent = board.current_player
+    if board.is_in_check(opponent):
+        san += '#' if not board.has_legal_move(opponent) else '+'
+    board.unmake_move()
+    return san
+
+
+def _resolve_moves(headers, san_moves, max_plies):
+    """
+    Resolves a game's SAN moves, returning the moves and None, or the moves up to a bad one and the error it raised.
+    """
+    moves = []
+    try:
+        board = starting_board(headers)
+    except ValueError as error:
+        return moves, str(error)
+    try:
+        for san in san_moves if max_plies is None else san_moves[:max_plies]:
+            moves.append(_play_san(board, san))
+    except ValueError as error:
+        return moves, 'Move {}: {}'.format(len(moves) + 1, error)
+    return moves, None
+
+
+def read_games(lines, validate=True, strict=True, max_plies=None):
+    """
+    Yields each game in an iterable of PGN lines, such as an open file, as a Game. Comments, NAGs and variations are
+    skipped.
+
+    If validate is false the moves aren't resolved, which is much faster when only the tags or the SAN are needed.
+    Otherwise a move which can't be resolved raises ValueError, giving the line the game starts on, unless strict is
+    false, in which case the game is yielded with its error. If max_plies is given, only that many moves of each game
+    are resolved.
+    """
+    headers = {}
+    san_moves = []
+    first_line = None
+    in_movetext = False
+    in_comment = False
+    variation_depth = 0
+
+    def finish_game(result):
+        if result is None:
+            result = headers.get('Result', '*')
+        if not validate:
+            return Game(headers, san_moves, None, result, None)
+        moves, error = _resolve_moves(headers, san_moves, max_plies)
+        if error is not None and strict:
+            raise ValueError('Game starting on line {}: {}'.format(first_line, error))
+        return Game(headers, san_moves, moves, result, error)
+
+    for line_number, line in enumerate(lines, 1):
+        if in_comment:
+            end = line.find('}')
+            if end < 0:
+                continue
+            line = line[end + 1:]
+            in_comment = False
+        elif line.startswith('['):
+            if in_movetext:
+                # The previous game had no result at the end of its moves
+                yield finish_game(None)
+                headers, san_moves, first_line, in_movetext, variation_depth = {}, [], None, False, 0
+            if first_line is None:
+                first_line = line_number
+            for name, value in TAG_PATTERN.findall(line):
+                headers[name] = value.replace('\\"', '"').replace('\\\\', '\\')
+            continue
+        elif line.startswith('%'):
+            continue
+
+        for token in TOKEN_PATTERN.findall(line):
+            first = token[0]
+            if first == '{':
+                in_comment = token[-1] != '}'
+            elif first == ';' or first == '$':
+                continue
+            elif first == '(':
+                variation_depth += 1
+            elif first == ')':
+                variation_depth -= 1
+            elif variation_depth:
+                continue
+            elif token in RESULTS:
+                yield finish_game(token)
+                headers, san_moves, first_line, in_movetext, variation_depth = {}, [], None, False, 0
+            else:
+                number = MOVE_NUMBER_PATTERN.match(token)
+                if number is not None:
+                    token = token[number.end():]
+                    if not token:
+                        continue
+                if first_line is None:
+                    first_line = line_number
+                in_movetext = True
+                san_moves.append(token)
+
+    if in_movetext or headers:
+        yield finish_game(None)
+
+
+def open_pgn(path):
+    """
+    Opens a PGN file for reading as text, decompressing it on the fly if it is gzipped.
+    """
+    with open(path, 'rb') as file:
+        compressed = file.read(2) == GZIP_MAGIC
+    if compressed:
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, encoding='utf-8', errors='replace')
+
+
+def read_pgn(path, validate=True, strict=True, max_plies=None):
+    """
+    Yields each game in a PGN file, which may be gzipped, as read_games does.
+    """
+    with open_pgn(path) as file:
+        yield from read_games(file, validate, strict, max_plies)
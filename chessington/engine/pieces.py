@@ -4,42 +4,70 @@ Definitions of each of the different chess pieces.
 
 from abc import ABC, abstractmethod
 
+from chessington.engine.attacks import FULL, KNIGHT_TARGETS, KING_TARGETS, PAWN_CAPTURE_TARGETS, square_index, \
+    bitboard_squares, rook_attacks, bishop_attacks, queen_attacks
 from chessington.engine.data import Player, Square
 
 
 class Piece(ABC):
     """
-    An abstract base class from which all pieces inherit.
+    An abstract base class from which all pieces inherit. Pieces are immutable and only know their player, so a piece
+    finds its square by looking itself up on the board.
+
+    Boards hold a piece of their own on every square unless they are set up with shared_pieces, when every square
+    holds the one piece of its type and player from shared. That saves memory when holding many boards, but a shared
+    piece standing on several squares can't find its square, and has to be given it.
     """
 
+    __slots__ = ('player',)
+
     def __init__(self, player):
-        self.player = player
-        self.counter = 0
+        object.__setattr__(self, 'player', player)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Pieces are immutable')
+
+    def __reduce__(self):
+        if self.is_shared():
+            return type(self).shared, (self.player,)
+        return type(self), (self.player,)
+
+    @classmethod
+    def shared(cls, player):
+        """
+        Gets the piece of this type for the given player which boards set up with shared_pieces put on every square.
+        """
+        return SHARED_PIECES[cls][player]
+
+    def is_shared(self):
+        """
+        Checks whether this is the piece of its type and player returned by shared.
+        """
+        return SHARED_PIECES[type(self)][self.player] is self
 
     @abstractmethod
-    def get_available_moves(self, board):
+    def get_available_moves(self, board, square=None):
         """
         Get all squares that the piece is allowed to move to.
         """
         pass
 
-    def move_to(self, board, new_square):
+    def move_to(self, board, new_square, square=None):
         """
-        Move this piece to the given square on the board.
+        Move this piece to the given square on the board. A shared piece may have to be given its current square.
         """
-        current_square = board.find_piece(self)
-        board.move_piece(current_square, new_square)
+        board.move_piece(self.position(board, square), new_square)
 
-    def position(self, board):
+    def position(self, board, square=None):
         """
-        Finds the position of the piece on the board. The piece will now know where it is.
+        Finds the position of the piece on the board, unless it is already known.
         """
-        return board.find_piece(self)
+        return square if square is not None else board.find_piece(self)
 
-    def get_moves_in_direction(self, board, direction):
+    def get_moves_in_direction(self, board, direction, square=None):
         valid_moves = []
         distance = 1
-        start_position = self.position(board)
+        start_position = self.position(board, square)
 
         while True:
             move_vector = (direction[0] * distance, direction[1] * distance)
@@ -57,10 +85,10 @@ class Piece(ABC):
                 break
         return valid_moves
 
-    def get_limited_moves_in_direction(self, board, direction):
+    def get_limited_moves_in_direction(self, board, direction, square=None):
         valid_moves = []
         distance = 1
-        start_position = self.position(board)
+        start_position = self.position(board, square)
 
         move_vector = (direction[0] * distance, direction[1] * distance)
         candidate_position = start_position.translate_by(move_vector)
@@ -72,18 +100,38 @@ class Piece(ABC):
 
         return valid_moves
 
+    def get_moves_from_table(self, board, targets):
+        """
+        Filters precomputed target squares down to those which are empty or hold an enemy piece.
+        """
+        valid_moves = []
+        for candidate_position in targets:
+            piece = board.get_piece(candidate_position)
+            if piece is None or piece.player != self.player:
+                valid_moves.append(candidate_position)
+        return valid_moves
+
+    def get_sliding_moves(self, board, attack_lookup, square=None):
+        """
+        Looks up the squares a sliding piece attacks given the board's occupancy, less those holding friendly pieces.
+        """
+        attacks = attack_lookup(square_index(self.position(board, square)), board.occupied)
+        return bitboard_squares(attacks & ~board.occupancy[self.player] & FULL)
+
 
 class Pawn(Piece):
     """
     A class representing a chess pawn.
     """
 
-    def is_at_starting_position(self, board):
+    __slots__ = ()
+
+    def is_at_starting_position(self, board, square=None):
         """
         Checks if the pawn is at its starting position as other moves are available if it is.
         """
         start_positions = {Player.WHITE: 1, Player.BLACK: 6}
-        return start_positions[self.player] == self.position(board).row
+        return start_positions[self.player] == self.position(board, square).row
 
     def capture_enemies(self, current_square, candidate_square, direction, board):
         """
@@ -110,23 +158,20 @@ class Pawn(Piece):
                 return True
         return False
 
-    def get_available_moves(self, board):
+    def get_available_moves(self, board, square=None):
         """
         Finds moves available to the pawn.
         """
         valid_moves = []
-        current_square = self.position(board)
+        current_square = self.position(board, square)
         direction = 1 if self.player == Player.WHITE else -1
         next_square = Square.at(current_square.row + direction, current_square.col)
 
-        candidate_square = Square.at(current_square.row + direction, current_square.col - abs(direction))
-        valid_moves += self.capture_enemies(current_square, candidate_square, direction, board)
-
-        candidate_square = Square.at(current_square.row + direction, current_square.col + abs(direction))
-        valid_moves += self.capture_enemies(current_square, candidate_square, direction, board)
+        for candidate_square in PAWN_CAPTURE_TARGETS[self.player][square_index(current_square)]:
+            valid_moves += self.capture_enemies(current_square, candidate_square, direction, board)
 
         if current_square.is_on_board() and next_square.is_on_board():
-            if self.is_at_starting_position(board) and board.is_square_empty(next_square):
+            if self.is_at_starting_position(board, current_square) and board.is_square_empty(next_square):
                 double_step_square = Square.at(current_square.row + 2 * direction, current_square.col)
                 if board.is_square_empty(double_step_square):
                     valid_moves.append(double_step_square)
@@ -142,40 +187,10 @@ class Knight(Piece):
     A class representing a chess knight.
     """
 
-    def get_available_moves(self, board):
-        valid_moves = self.get_forward_horizontal_moves(board)
-        valid_moves += self.get_backward_horizontal_moves(board)
-        valid_moves += self.get_forward_vertical_moves(board)
-        valid_moves += self.get_backward_vertical_moves(board)
-        return valid_moves
+    __slots__ = ()
 
-    def get_forward_horizontal_moves(self, board):
-        left = (1, -2)
-        left_moves = self.get_limited_moves_in_direction(board, left)
-        right = (1, 2)
-        right_moves = self.get_limited_moves_in_direction(board, right)
-        return left_moves + right_moves
-
-    def get_backward_horizontal_moves(self, board):
-        left = (-1, -2)
-        left_moves = self.get_limited_moves_in_direction(board, left)
-        right = (-1, 2)
-        right_moves = self.get_limited_moves_in_direction(board, right)
-        return left_moves + right_moves
-
-    def get_forward_vertical_moves(self, board):
-        left = (2, -1)
-        left_moves = self.get_limited_moves_in_direction(board, left)
-        right = (2, 1)
-        right_moves = self.get_limited_moves_in_direction(board, right)
-        return left_moves + right_moves
-
-    def get_backward_vertical_moves(self, board):
-        left = (-2, -1)
-        left_moves = self.get_limited_moves_in_direction(board, left)
-        right = (-2, 1)
-        right_moves = self.get_limited_moves_in_direction(board, right)
-        return left_moves + right_moves
+    def get_available_moves(self, board, square=None):
+        return self.get_moves_from_table(board, KNIGHT_TARGETS[square_index(self.position(board, square))])
 
 
 class Bishop(Piece):
@@ -183,24 +198,10 @@ class Bishop(Piece):
     A class representing a chess bishop.
     """
 
-    def get_available_moves(self, board):
-        valid_moves = self.get_forward_moves(board)
-        valid_moves += self.get_backward_moves(board)
-        return valid_moves
+    __slots__ = ()
 
-    def get_forward_moves(self, board):
-        left = (1, -1)
-        left_moves = self.get_moves_in_direction(board, left)
-        right = (1, 1)
-        right_moves = self.get_moves_in_direction(board, right)
-        return left_moves + right_moves
-
-    def get_backward_moves(self, board):
-        left = (-1, -1)
-        left_moves = self.get_moves_in_direction(board, left)
-        right = (-1, 1)
-        right_moves = self.get_moves_in_direction(board, right)
-        return left_moves + right_moves
+    def get_available_moves(self, board, square=None):
+        return self.get_sliding_moves(board, bishop_attacks, square)
 
 
 class Rook(Piece):
@@ -208,24 +209,10 @@ class Rook(Piece):
     A class representing a chess rook.
     """
 
-    def get_available_moves(self, board):
-        valid_moves = self.get_vertical_moves(board)
-        valid_moves += self.get_horizontal_moves(board)
-        return valid_moves
-
-    def get_vertical_moves(self, board):
-        up = (1, 0)
-        up_moves = self.get_moves_in_direction(board, up)
-        down = (-1, 0)
-        down_moves = self.get_moves_in_direction(board, down)
-        return up_moves + down_moves
+    __slots__ = ()
 
-    def get_horizontal_moves(self, board):
-        right = (0, 1)
-        up_moves = self.get_moves_in_direction(board, right)
-        left = (0, -1)
-        down_moves = self.get_moves_in_direction(board, left)
-        return up_moves + down_moves
+    def get_available_moves(self, board, square=None):
+        return self.get_sliding_moves(board, rook_attacks, square)
 
 
 class Queen(Piece):
@@ -233,40 +220,10 @@ class Queen(Piece):
     A class representing a chess queen.
     """
 
-    def get_available_moves(self, board):
-        valid_moves = self.get_vertical_moves(board)
-        valid_moves += self.get_horizontal_moves(board)
-        valid_moves += self.get_forward_moves(board)
-        valid_moves += self.get_backward_moves(board)
-        return valid_moves
+    __slots__ = ()
 
-    def get_forward_moves(self, board):
-        left = (1, -1)
-        left_moves = self.get_moves_in_direction(board, left)
-        right = (1, 1)
-        right_moves = self.get_moves_in_direction(board, right)
-        return left_moves + right_moves
-
-    def get_backward_moves(self, board):
-        left = (-1, -1)
-        left_moves = self.get_moves_in_direction(board, left)
-        right = (-1, 1)
-        right_moves = self.get_moves_in_direction(board, right)
-        return left_moves + right_moves
-
-    def get_vertical_moves(self, board):
-        up = (1, 0)
-        up_moves = self.get_moves_in_direction(board, up)
-        down = (-1, 0)
-        down_moves = self.get_moves_in_direction(board, down)
-        return up_moves + down_moves
-
-    def get_horizontal_moves(self, board):
-        right = (0, 1)
-        up_moves = self.get_moves_in_direction(board, right)
-        left = (0, -1)
-        down_moves = self.get_moves_in_direction(board, left)
-        return up_moves + down_moves
+    def get_available_moves(self, board, square=None):
+        return self.get_sliding_moves(board, queen_attacks, square)
 
 
 class King(Piece):
@@ -274,37 +231,11 @@ class King(Piece):
     A class representing a chess king.
     """
 
-    def get_available_moves(self, board):
-        valid_moves = self.get_vertical_moves(board)
-        valid_moves += self.get_horizontal_moves(board)
-        valid_moves += self.get_forward_moves(board)
-        valid_moves += self.get_backward_moves(board)
-        return valid_moves
+    __slots__ = ()
+
+    def get_available_moves(self, board, square=None):
+        return self.get_moves_from_table(board, KING_TARGETS[square_index(self.position(board, square))])
+
 
-    def get_forward_moves(self, board):
-        left = (1, -1)
-        left_moves = self.get_limited_moves_in_direction(board, left)
-        right = (1, 1)
-        right_moves = self.get_limited_moves_in_direction(board, right)
-        return left_moves + right_moves
-
-    def get_backward_moves(self, board):
-        left = (-1, -1)
-        left_moves = self.get_limited_moves_in_direction(board, left)
-        right = (-1, 1)
-        right_moves = self.get_limited_moves_in_direction(board, right)
-        return left_moves + right_moves
-
-    def get_vertical_moves(self, board):
-        up = (1, 0)
-        up_moves = self.get_limited_moves_in_direction(board, up)
-        down = (-1, 0)
-        down_moves = self.get_limited_moves_in_direction(board, down)
-        return up_moves + down_moves
-
-    def get_horizontal_moves(self, board):
-        right = (0, 1)
-        up_moves = self.get_limited_moves_in_direction(board, right)
-        left = (0, -1)
-        down_moves = self.get_limited_moves_in_direction(board, left)
-        return up_moves + down_moves
+SHARED_PIECES = {piece_type: {player: piece_type(player) for player in Player}
+                 for piece_type in [Pawn, Knight, Bishop, Rook, Queen, King]}
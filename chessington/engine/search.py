@@ -0,0 +1,263 @@
+"""
+A game tree search for finding the best move for the side to move. It is a negamax alpha-beta search with iterative
+deepening, so it can be stopped by a node or time limit and still return the best move from the deepest search it
+completed. It has no GUI dependencies and can be run as a plain library call.
+"""
+
+import time
+from collections import namedtuple
+
+from chessington.engine.evaluation import evaluate
+from chessington.engine.ordering import MoveOrderer
+from chessington.engine.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+MATE_SCORE = 100000
+MAX_PLY = 128
+MAX_DEPTH = 64
+NODES_BETWEEN_CLOCK_CHECKS = 1024
+
+SearchResult = namedtuple('SearchResult', 'best_move score depth principal_variation nodes seconds')
+
+
+def is_mate_score(score):
+    return abs(score) >= MATE_SCORE - MAX_PLY
+
+
+class SearchAborted(Exception):
+    """
+    Raised inside the search when a node or time limit is reached.
+    """
+
+
+class Searcher:
+    """
+    Searches positions for their best move. A searcher keeps its transposition table between searches, so
+    searching related positions one after the other reuses earlier work. Given an opening book, it plays the book's
+    best move without searching whenever there is one. Given an endgame tablebase, it scores the positions the
+    tablebase covers without searching them any further.
+    """
+
+    def __init__(self, table=None, evaluate=evaluate, orderer=None, book=None, tablebase=None):
+        self.table = table if table is not None else TranspositionTable()
+        self.evaluate = evaluate
+        self.book = book
+        self.tablebase = tablebase
+        self.orderer = orderer if orderer is not None else MoveOrderer(MAX_PLY)
+        self.nodes = 0
+        self._node_limit = None
+        self._deadline = None
+
+    def search(self, board, max_depth=MAX_DEPTH, node_limit=None, time_limit=None):
+        """
+        Searches for the best move for the board's current player, deepening one ply at a time until max_depth is
+        reached or the node limit or time limit (in seconds) runs out. The board is left as it was found.
+        """
+        start = time.perf_counter()
+        if self.book is not None:
+            book_move = self.book.best_move(board)
+            if book_move is not None:
+                return SearchResult(book_move, 0, 0, [book_move], 0, time.perf_counter() - start)
+
+        self.nodes = 0
+        self._node_limit = node_limit
+        self._deadline = start + time_limit if time_limit is not None else None
+        self.table.new_search()
+        self.orderer.new_search()
+
+        root_moves = self.order_moves(board, board.generate_legal_moves(board.current_player), None, 0)
+        if not root_moves:
+            score = -MATE_SCORE if board.is_in_check(board.current_player) else 0
+            return SearchResult(None, score, 0, [], 0, time.perf_counter() - start)
+
+        result = SearchResult(root_moves[0], 0, 0, [root_moves[0]], 0, 0.0)
+        for depth in range(1, max_depth + 1):
+            try:
+                score, principal_variation = self._search_root(board, root_moves, depth)
+            except SearchAborted:
+                break
+            result = SearchResult(principal_variation[0], score, depth, principal_variation, self.nodes,
+                                  time.perf_counter() - start)
+            # Search the best move first next time round
+            root_moves.remove(principal_variation[0])
+            root_moves.insert(0, principal_variation[0])
+            if is_mate_score(score):
+                break
+        return result._replace(nodes=self.nodes, seconds=time.perf_counter() - start)
+
+    def search_move(self, board, move, depth, alpha=-MATE_SCORE - 1, beta=MATE_SCORE + 1, node_limit=None,
+                    time_limit=None):
+        """
+        Searches one move at the root to exactly the given depth within the window (alpha, beta), for callers which
+        deepen the search themselves, such as a parallel search handing root moves to other processes. Returns the
+        score for the player making the move, which is only a bound if it falls outside the window, with the line of
+        best play starting with the move; or None if the node or time limit runs out first. Unlike search, it doesn't
+        mark a new search in the transposition table.
+        """
+        self.nodes = 0
+        self._node_limit = node_limit
+        self._deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        board.make_move(move)
+        try:
+            score, variation = self._negamax(board, depth - 1, -beta, -alpha, 1)
+        except SearchAborted:
+            return None
+        finally:
+            board.unmake_move()
+        return -score, [move] + variation
+
+    def _search_root(self, board, moves, depth):
+        alpha = -MATE_SCORE - 1
+        beta = MATE_SCORE + 1
+        best_variation = None
+        for move in moves:
+            board.make_move(move)
+            try:
+                score, variation = self._negamax(board, depth - 1, -beta, -alpha, 1)
+            finally:
+                board.unmake_move()
+            score = -score
+            if best_variation is None or score > alpha:
+                alpha = score
+                best_variation = [move] + variation
+        self.table.store(board.zobrist_key, depth, alpha, EXACT, best_variation[0])
+        return alpha, best_variation
+
+    def _count_node(self):
+        self.nodes += 1
+        if self._node_limit is not None and self.nodes > self._node_limit:
+            raise SearchAborted()
+        if self._deadline is not None and self.nodes % NODES_BETWEEN_CLOCK_CHECKS == 0:
+            if time.perf_counter() > self._deadline:
+                raise SearchAborted()
+
+    def _negamax(self, board, depth, alpha, beta, ply):
+        """
+        Scores the position for the side to move, returning the score and the line of best play.
+        """
+        if depth <= 0:
+            return self._quiesce(board, alpha, beta, ply), []
+        self._count_node()
+
+        if self.tablebase is not None:
+            result = self.tablebase.probe(board)
+            if result is not None:
+                return score_from_tablebase(result, ply), []
+
+        original_alpha = alpha
+        key = board.zobrist_key
+        entry = self.table.probe(key)
+        table_move = None
+        if entry is not None:
+            table_move = entry.move
+            if entry.depth >= depth:
+                score = score_from_table(entry.score, ply)
+                if entry.bound == EXACT:
+                    return score, [table_move] if table_move is not None else []
+                if entry.bound == LOWER_BOUND:
+                    alpha = max(alpha, score)
+                elif entry.bound == UPPER_BOUND:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score, [table_move] if table_move is not None else []
+
+        player = board.current_player
+        moves = board.generate_legal_moves(player)
+        if not moves:
+            return (-MATE_SCORE + ply if board.is_in_check(player) else 0), []
+
+        best_score = -MATE_SCORE - 1
+        best_variation = []
+        for move_number, move in enumerate(self.order_moves(board, moves, table_move, ply)):
+            board.make_move(move)
+            try:
+                score, variation = self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.unmake_move()
+            score = -score
+            if score > best_score:
+                best_score = score
+                best_variation = [move] + variation
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.orderer.record_cutoff(board, move, depth, ply, move_number)
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.table.store(key, depth, score_to_table(best_score, ply), bound, best_variation[0])
+        return best_score, best_variation
+
+    def _quiesce(self, board, alpha, beta, ply):
+        """
+        Searches captures only, so that positions are not scored in the middle of an exchange.
+        """
+        self._count_node()
+        stand_pat = self.evaluate(board)
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        captures = list(board.iter_legal_moves(board.current_player, include_quiet=False))
+        for move in self.order_moves(board, captures, None, ply):
+            board.make_move(move)
+            try:
+                score = -self._quiesce(board, -beta, -alpha, ply + 1)
+            finally:
+                board.unmake_move()
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return alpha
+
+    def order_moves(self, board, moves, table_move, ply):
+        """
+        Puts the moves in the order they should be searched; see chessington.engine.ordering.
+        """
+        return self.orderer.order(board, moves, table_move, ply)
+
+
+def score_to_table(score, ply):
+    """
+    Converts a mate score measured from the root into one measured from the current position, for storing.
+    """
+    if score >= MATE_SCORE - MAX_PLY:
+        return score + ply
+    if score <= -MATE_SCORE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """
+    Converts a stored mate score measured from its position back into one measured from the root.
+    """
+    if score >= MATE_SCORE - MAX_PLY:
+        return score - ply
+    if score <= -MATE_SCORE + MAX_PLY:
+        return score + ply
+    return score
+
+
+def score_from_tablebase(result, ply):
+    """
+    Converts a tablebase result for the side to move into a score, counting a mate from the root like the search
+    does.
+    """
+    if result.wdl > 0:
+        return MATE_SCORE - ply - result.plies
+    if result.wdl < 0:
+        return -MATE_SCORE + ply + result.plies
+    return 0
+
+
+def search(board, max_depth=4, node_limit=None, time_limit=None):
+    """
+    Searches for the best move for the board's current player with a fresh searcher.
+    """
+    return Searcher().search(board, max_depth=max_depth, node_limit=node_limit, time_limit=time_limit)
@@ -0,0 +1,188 @@
+"""
+A transposition table that several processes can use at once. The entries live in a shared memory block, or in a
+memory-mapped file so that the table outlives the processes using it and a long analysis can be stopped and resumed.
+
+Processes read and write entries without any locking. Each entry is two 64-bit words: everything but the key packed
+into one word, and the key XORed with that word in the other. If two processes write the same entry at once, a
+reader may see one word from each write, but then the key it recovers will not match and the entry is treated as
+missing rather than returning another position's result. The entries follow a header holding the age of the current
+search, so that every process stores entries with the same age.
+"""
+
+import mmap
+import os
+from array import array
+from multiprocessing import shared_memory
+
+from chessington.engine.moves import pack_move, unpack_move
+from chessington.engine.transposition import BaseTranspositionTable, TableEntry, DEPTH_PREFERRED, ENTRY_SIZE, \
+    MAX_SCORE
+
+# Layout of the data word: score (32 bits, offset to be unsigned), move (16), depth (8), bound (2) and age (6)
+SCORE_OFFSET = 1 << 31
+MOVE_SHIFT = 32
+DEPTH_SHIFT = 48
+BOUND_SHIFT = 56
+AGE_SHIFT = 58
+AGE_MASK = 0x3F
+# The header before the entries: the age of the current search, padded to the size of an entry
+HEADER_SIZE = ENTRY_SIZE
+
+
+def _pack_data(depth, score, bound, packed_move, age):
+    return ((max(-MAX_SCORE, min(MAX_SCORE, score)) + SCORE_OFFSET) | packed_move << MOVE_SHIFT |
+            (max(-128, min(127, depth)) & 0xFF) << DEPTH_SHIFT | bound << BOUND_SHIFT | age << AGE_SHIFT)
+
+
+def _unpack_depth(data):
+    depth = (data >> DEPTH_SHIFT) & 0xFF
+    return depth - 256 if depth >= 128 else depth
+
+
+class SharedTranspositionTable(BaseTranspositionTable):
+    """
+    A transposition table with the same interface and replacement schemes as TranspositionTable, whose entries can
+    be shared between processes.
+
+    With no name or path, a new shared memory block is created. Passing the name of an existing block attaches to
+    it, and pickling the table (for example to send it to a worker process) attaches the copy to the same block.
+    Passing a path backs the table with that file instead, creating it if need be; an existing file keeps its size
+    and its entries. The search age is shared with every process using the table, so only the process running the
+    search should call new_search; the statistics are kept separately by each process.
+    """
+
+    def __init__(self, memory_bytes=16 * 1024 * 1024, replacement=DEPTH_PREFERRED, name=None, path=None):
+        self.path = path
+        self._owner = False
+        self._shared_memory = None
+        self._mmap = None
+
+        if path is not None:
+            self._open_file(path, memory_bytes)
+        elif name is not None:
+            self._shared_memory = shared_memory.SharedMemory(name=name)
+        else:
+            self._shared_memory = shared_memory.SharedMemory(create=True, size=self._block_size(memory_bytes))
+            self._owner = True
+
+        if self._shared_memory is not None:
+            self.name = self._shared_memory.name
+            self._buffer = self._shared_memory.buf
+        else:
+            self.name = None
+            self._buffer = memoryview(self._mmap)
+        super().__init__(self._entries_for(len(self._buffer) - HEADER_SIZE), replacement)
+        self._header = self._buffer[:HEADER_SIZE].cast('Q')
+        self._words = self._buffer[HEADER_SIZE:HEADER_SIZE + self.size * ENTRY_SIZE].cast('Q')
+
+    @classmethod
+    def _block_size(cls, memory_bytes):
+        return HEADER_SIZE + cls._entries_for(memory_bytes) * ENTRY_SIZE
+
+    def _open_file(self, path, memory_bytes):
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        size = os.path.getsize(path) if exists else self._block_size(memory_bytes)
+        with open(path, 'r+b' if exists else 'w+b') as file:
+            if not exists:
+                file.truncate(size)
+            self._mmap = mmap.mmap(file.fileno(), size)
+
+    def __reduce__(self):
+        if self.path is not None:
+            return SharedTranspositionTable, (0, self.replacement, None, self.path)
+        return SharedTranspositionTable, (0, self.replacement, self.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        if getattr(self, '_words', None) is not None:
+            self.close()
+
+    def close(self):
+        """
+        Detaches from the table, writing a file-backed table out to disk. The process which created a shared memory
+        block also removes it, so it should close the table last.
+        """
+        if self._words is None:
+            return
+        self._words.release()
+        self._words = None
+        self._header.release()
+        self._header = None
+        if self._shared_memory is not None:
+            self._buffer = None
+            self._shared_memory.close()
+            if self._owner:
+                self._shared_memory.unlink()
+        else:
+            self._buffer.release()
+            self._buffer = None
+            self._mmap.flush()
+            self._mmap.close()
+
+    def flush(self):
+        """
+        Writes a file-backed table's entries out to disk, so that it can be resumed if the process is stopped.
+        """
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def probe(self, key):
+        """
+        Looks up the entry stored for a position, returning None if there isn't one.
+        """
+        self.probes += 1
+        words = self._words
+        occupied = False
+        for slot in self._slots(key):
+            data = words[2 * slot + 1]
+            if not data:
+                continue
+            if words[2 * slot] ^ data == key:
+                self.hits += 1
+                packed_move = (data >> MOVE_SHIFT) & 0xFFFF
+                return TableEntry(_unpack_depth(data), (data & 0xFFFFFFFF) - SCORE_OFFSET, (data >> BOUND_SHIFT) & 3,
+                                  unpack_move(packed_move) if packed_move else None)
+            occupied = True
+        if occupied:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, bound, move=None):
+        """
+        Stores the result of searching a position, if the replacement scheme allows it.
+        """
+        slot = self._choose_slot(key, depth)
+        if slot is None:
+            return
+        words = self._words
+        old_data = words[2 * slot + 1]
+        if old_data and words[2 * slot] ^ old_data != key:
+            self.overwrites += 1
+        self.stores += 1
+        data = _pack_data(depth, score, bound, pack_move(move) if move is not None else 0, self._header[0])
+        words[2 * slot] = key ^ data
+        words[2 * slot + 1] = data
+
+    def _slot_contents(self, slot):
+        data = self._words[2 * slot + 1]
+        if not data:
+            return None
+        return self._words[2 * slot] ^ data, _unpack_depth(data), data >> AGE_SHIFT
+
+    def _current_age(self):
+        return self._header[0]
+
+    def _set_age(self, age):
+        self._header[0] = age
+
+    def clear(self):
+        """
+        Empties the table, for every process using it, and resets this process's statistics.
+        """
+        self._words[:] = array('Q', bytes(len(self._words) * 8))
+        self.probes = self.hits = self.collisions = self.stores = self.overwrites = 0
@@ -0,0 +1,371 @@
+"""
+Endgame tablebases: the exact result of every position in a few small endings, worked out backwards from the
+checkmates by retrograde analysis. The endings covered are a king and queen, a king and rook, a king and pawn, or a
+king, bishop and knight against a lone king.
+
+Each ending's table is a NumPy array of bytes indexed by [side to move, strong king, lone king, strong pieces...],
+from the point of view of the strong side playing White; positions where Black is the strong side are looked up with
+the board flipped. A value of 0 is a draw, 255 an impossible position, and anything else is one more than the number
+of plies until the lone king is mated with best play. Tables are saved as .npy files and memory-mapped when probed,
+so only the pages that are looked at are read from disk.
+
+Generating or probing tables needs NumPy, which is an optional dependency. Generate them with ``poetry run tablebase``.
+"""
+
+import argparse
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from chessington.engine.attacks import KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, BETWEEN, RAY_TARGETS, \
+    ORTHOGONAL_DIRECTIONS, DIAGONAL_DIRECTIONS, bishop_attacks, rook_attacks, queen_attacks, iter_bits, square_index
+from chessington.engine.data import Player
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+
+DRAW_VALUE = 0
+ILLEGAL_VALUE = 255
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+# The strong side's pieces besides its king, in the order of the table's axes
+ENDINGS = {
+    'KQK': [Queen],
+    'KRK': [Rook],
+    'KPK': [Pawn],
+    'KBNK': [Bishop, Knight],
+}
+# A pawn ending becomes a queen ending when the pawn promotes, so its table is built from the queen ending's
+PROMOTION_ENDINGS = {'KPK': 'KQK'}
+PIECE_LETTERS = {Queen: 'Q', Rook: 'R', Bishop: 'B', Knight: 'N', Pawn: 'P'}
+MAX_PIECES = max(2 + len(pieces) for pieces in ENDINGS.values())
+
+ProbeResult = namedtuple('ProbeResult', 'wdl plies')
+
+
+def _square_table(bitboards):
+    return np.array([[bool(bitboard >> target & 1) for target in range(64)] for bitboard in bitboards])
+
+
+def _step_table(bitboards):
+    steps = np.full((64, 8), -1, dtype=np.int64)
+    for index, bitboard in enumerate(bitboards):
+        targets = list(iter_bits(bitboard))
+        steps[index, :len(targets)] = targets
+    return steps
+
+
+def _ray_table(direction):
+    rays = np.full((64, 7), -1, dtype=np.int64)
+    for index, squares in enumerate(RAY_TARGETS[direction]):
+        rays[index, :len(squares)] = [square_index(square) for square in squares]
+    return rays
+
+
+# Whether a piece on one square attacks another on an empty board. A pawn is always White's.
+ATTACK_TABLES = {
+    King: _square_table(KING_ATTACKS),
+    Knight: _square_table(KNIGHT_ATTACKS),
+    Pawn: _square_table(PAWN_ATTACKS[Player.WHITE]),
+    Bishop: _square_table([bishop_attacks(index, 0) for index in range(64)]),
+    Rook: _square_table([rook_attacks(index, 0) for index in range(64)]),
+    Queen: _square_table([queen_attacks(index, 0) for index in range(64)]),
+}
+# BETWEEN_MASKS[a, b, c] is whether square c is strictly between squares a and b
+BETWEEN_MASKS = np.array([_square_table(row) for row in BETWEEN])
+KING_STEPS = _step_table(KING_ATTACKS)
+KNIGHT_STEPS = _step_table(KNIGHT_ATTACKS)
+SLIDING_DIRECTIONS = {
+    Bishop: DIAGONAL_DIRECTIONS,
+    Rook: ORTHOGONAL_DIRECTIONS,
+    Queen: ORTHOGONAL_DIRECTIONS + DIAGONAL_DIRECTIONS,
+}
+RAYS = {direction: _ray_table(direction) for direction in ORTHOGONAL_DIRECTIONS + DIAGONAL_DIRECTIONS}
+
+
+def _attacks(piece_type, from_squares, to_squares, blockers):
+    """
+    Works out, for arrays of squares, whether a piece of the given type attacks the target square when the
+    blockers' squares are occupied.
+    """
+    attacked = ATTACK_TABLES[piece_type][from_squares, to_squares]
+    for blocker in blockers:
+        attacked = attacked & ~BETWEEN_MASKS[from_squares, to_squares, blocker]
+    return attacked
+
+
+def _previous_squares(piece_type, squares, others):
+    """
+    Yields arrays of the squares a piece of the given type could have moved to each of the given squares from,
+    with -1 where there is no such square. Others are the squares of the other pieces, which a sliding piece can't
+    have passed through.
+    """
+    if piece_type in (King, Knight):
+        steps = KING_STEPS if piece_type is King else KNIGHT_STEPS
+        for column in range(8):
+            yield steps[squares, column]
+    elif piece_type is Pawn:
+        yield np.where(squares >= 16, squares - 8, -1)
+        double_step = (squares >> 3 == 3)
+        for other in others:
+            double_step &= other != squares - 8
+        yield np.where(double_step, squares - 16, -1)
+    else:
+        for direction in SLIDING_DIRECTIONS[piece_type]:
+            for distance in range(7):
+                previous = RAYS[direction][squares, distance]
+                on_board = previous >= 0
+                clear = on_board.copy()
+                for other in others:
+                    clear &= ~BETWEEN_MASKS[np.where(on_board, previous, 0), squares, other]
+                yield np.where(clear, previous, -1)
+
+
+def _axis_coordinates(count):
+    coordinates = []
+    for axis in range(count):
+        shape = [1] * count
+        shape[axis] = 64
+        coordinates.append(np.arange(64).reshape(shape))
+    return coordinates
+
+
+class _Generator:
+    """
+    Works out the table for one ending. Axis 0 is the strong king, axis 1 the lone king and the rest are the strong
+    side's other pieces.
+    """
+
+    def __init__(self, name, promotion_table=None):
+        self.name = name
+        self.types = [King, King] + ENDINGS[name]
+        self.count = len(self.types)
+        self.shape = (64,) * self.count
+        self.white_axes = [0] + list(range(2, self.count))
+        self.promotion_table = promotion_table
+
+    def _classify(self):
+        """
+        Finds, for every placement, whether it is legal with either side to move, whether the lone king is in check,
+        whether it can escape by capturing an undefended piece and how many other moves it has.
+        """
+        coordinates = _axis_coordinates(self.count)
+        white_king, black_king = coordinates[0], coordinates[1]
+
+        valid = np.ones(self.shape, dtype=bool)
+        for axis in range(self.count):
+            for other in range(axis + 1, self.count):
+                valid &= coordinates[axis] != coordinates[other]
+        valid &= ~ATTACK_TABLES[King][white_king, black_king]
+        for axis in range(2, self.count):
+            if self.types[axis] is Pawn:
+                valid &= (coordinates[axis] >= 8) & (coordinates[axis] < 56)
+
+        in_check = np.zeros(self.shape, dtype=bool)
+        can_capture = np.zeros(self.shape, dtype=bool)
+        for axis in range(2, self.count):
+            blockers = [coordinates[other] for other in self.white_axes if other != axis]
+            in_check |= _attacks(self.types[axis], coordinates[axis], black_king, blockers)
+
+            defended = ATTACK_TABLES[King][white_king, coordinates[axis]]
+            for other in range(2, self.count):
+                if other != axis:
+                    blockers = [coordinates[blocker] for blocker in self.white_axes if blocker not in (axis, other)]
+                    defended = defended | _attacks(self.types[other], coordinates[other], coordinates[axis], blockers)
+            can_capture |= ATTACK_TABLES[King][black_king, coordinates[axis]] & ~defended
+
+        legal_white = valid & ~in_check
+        # Count the lone king's moves which don't capture, each of which must lead to a legal position
+        padding = np.zeros(self.shape[:1] + (1,) + self.shape[2:], dtype=bool)
+        padded = np.concatenate([legal_white, padding], axis=1)
+        moves_left = np.zeros(self.shape, dtype=np.uint8)
+        for column in range(8):
+            targets = KING_STEPS[:, column]
+            moves_left += np.take(padded, np.where(targets < 0, 64, targets), axis=1)
+
+        return (legal_white.ravel(), valid.ravel(), in_check.ravel(), (can_capture & valid).ravel(),
+                moves_left.ravel())
+
+    def _white_predecessors(self, positions):
+        coordinates = np.unravel_index(positions, self.shape)
+        predecessors = []
+        for axis in self.white_axes:
+            squares = coordinates[axis]
+            others = [coordinates[other] for other in range(self.count) if other != axis]
+            for previous in _previous_squares(self.types[axis], squares, others):
+                found = previous >= 0
+                moved = [previous[found] if other == axis else coordinates[other][found]
+                         for other in range(self.count)]
+                predecessors.append(np.ravel_multi_index(moved, self.shape))
+        return np.concatenate(predecessors)
+
+    def _black_predecessors(self, positions):
+        coordinates = np.unravel_index(positions, self.shape)
+        predecessors = []
+        for column in range(8):
+            previous = KING_STEPS[coordinates[1], column]
+            found = previous >= 0
+            moved = [previous[found] if axis == 1 else coordinates[axis][found] for axis in range(self.count)]
+            predecessors.append(np.ravel_multi_index(moved, self.shape))
+        return np.concatenate(predecessors)
+
+    def _promotions(self, legal_white):
+        """
+        Finds the positions where promoting the pawn wins, and in how many plies, from the queen ending's table.
+        """
+        if self.promotion_table is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        white_king, black_king, pawn = np.unravel_index(np.arange(legal_white.size), self.shape)
+        queen = pawn + 8
+        promoting = legal_white & (pawn >= 48) & (queen != white_king) & (queen != black_king)
+        positions = np.flatnonzero(promoting)
+        # After promoting it is the lone king's move, in the queen ending
+        values = np.asarray(self.promotion_table[1][white_king[positions], black_king[positions], queen[positions]])
+        lost = (values != DRAW_VALUE) & (values != ILLEGAL_VALUE)
+        return positions[lost], values[lost].astype(np.int64)
+
+    def generate(self):
+        """
+        Works out the table, one ply further from mate at a time: a lone king position is lost once all its moves
+        lead to won positions, and a position with the strong side to move is won once any move leads to a lost one.
+        """
+        legal_white, legal_black, in_check, can_capture, moves_left = self._classify()
+        white_values = np.zeros(legal_white.size, dtype=np.uint8)
+        black_values = np.zeros(legal_white.size, dtype=np.uint8)
+        promotions, promotion_plies = self._promotions(legal_white)
+
+        frontier = np.flatnonzero(legal_black & in_check & (moves_left == 0) & ~can_capture)
+        black_values[frontier] = 1
+        ply = 0
+        while len(frontier) or (promotion_plies > ply).any():
+            ply += 1
+            if ply >= ILLEGAL_VALUE - 1:
+                raise ValueError('Mates in {} are too long to store'.format(self.name))
+            if ply % 2:
+                candidates = np.concatenate([self._white_predecessors(frontier), promotions[promotion_plies == ply]])
+                candidates = np.unique(candidates[legal_white[candidates]])
+                frontier = candidates[white_values[candidates] == DRAW_VALUE]
+                white_values[frontier] = ply + 1
+            else:
+                candidates = self._black_predecessors(frontier)
+                candidates, counts = np.unique(candidates[legal_black[candidates]], return_counts=True)
+                moves_left[candidates] -= counts.astype(np.uint8)
+                lost = (moves_left[candidates] == 0) & ~can_capture[candidates]
+                frontier = candidates[lost & (black_values[candidates] == DRAW_VALUE)]
+                black_values[frontier] = ply + 1
+
+        white_values[~legal_white] = ILLEGAL_VALUE
+        black_values[~legal_black] = ILLEGAL_VALUE
+        return np.stack([white_values.reshape(self.shape), black_values.reshape(self.shape)])
+
+
+def generate_table(name, promotion_table=None):
+    """
+    Generates the table for the named ending. A pawn ending needs the table of the ending its pawn promotes into.
+    """
+    if name not in ENDINGS:
+        raise ValueError('Unknown ending: {}'.format(name))
+    if name in PROMOTION_ENDINGS and promotion_table is None:
+        raise ValueError('The {} table is needed to generate {}'.format(PROMOTION_ENDINGS[name], name))
+    return _Generator(name, promotion_table).generate()
+
+
+def table_path(directory, name):
+    return os.path.join(directory, name + '.npy')
+
+
+class Tablebase:
+    """
+    The tables in a directory, loaded as they are first needed.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._tables = {}
+
+    def _table(self, name):
+        if name not in self._tables:
+            path = table_path(self.directory, name)
+            self._tables[name] = np.load(path, mmap_mode='r') if os.path.exists(path) else None
+        return self._tables[name]
+
+    def probe(self, board):
+        """
+        Looks up the board's position, returning a ProbeResult with the result for the side to move (WIN, DRAW or
+        LOSS) and, unless it is a draw, the number of plies to mate. Returns None if the position isn't covered.
+        """
+        occupied = board.occupied
+        if bin(occupied).count('1') > MAX_PIECES:
+            return None
+        for strong_player in Player:
+            weak_player = strong_player.opponent()
+            weak_squares = board.get_piece_squares(weak_player)
+            if len(weak_squares) != 1 or not isinstance(weak_squares[0][1], King):
+                continue
+            return self._probe_for(board, strong_player, weak_squares[0][0])
+        return None
+
+    def _probe_for(self, board, strong_player, weak_king_square):
+        pieces = [(type(piece), square) for square, piece in board.get_piece_squares(strong_player)]
+        # Every table has the strong side's king on the board, so a side without exactly one isn't covered
+        if [piece_type for piece_type, _ in pieces].count(King) != 1:
+            return None
+        others = sorted((piece_type for piece_type, _ in pieces if piece_type is not King),
+                        key=lambda piece_type: 'QRBNP'.index(PIECE_LETTERS[piece_type]))
+        name = 'K' + ''.join(PIECE_LETTERS[piece_type] for piece_type in others) + 'K'
+        if name not in ENDINGS:
+            return None
+        table = self._table(name)
+        if table is None:
+            return None
+
+        # The tables have the strong side playing White, so flip the board top to bottom if it is playing Black
+        flip = 56 if strong_player == Player.BLACK else 0
+        squares = {}
+        for piece_type, square in pieces:
+            squares[piece_type] = square_index(square) ^ flip
+        side_to_move = 0 if board.current_player == strong_player else 1
+        index = [side_to_move, squares[King], square_index(weak_king_square) ^ flip]
+        index += [squares[piece_type] for piece_type in ENDINGS[name]]
+        value = int(table[tuple(index)])
+        if value == ILLEGAL_VALUE:
+            return None
+        if value == DRAW_VALUE:
+            return ProbeResult(DRAW, None)
+        return ProbeResult(WIN if board.current_player == strong_player else LOSS, value - 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate endgame tablebases.')
+    parser.add_argument('endings', nargs='*', help='the endings to generate, from {} (default all)'.format(
+        ', '.join(ENDINGS)))
+    parser.add_argument('--output', default='tablebases', help='the directory to write to (default tablebases)')
+    args = parser.parse_args(argv)
+    for name in args.endings:
+        if name not in ENDINGS:
+            parser.error('unknown ending: {}'.format(name))
+
+    os.makedirs(args.output, exist_ok=True)
+    tables = {}
+    for name in args.endings or list(ENDINGS):
+        promotion_name = PROMOTION_ENDINGS.get(name)
+        promotion_table = None
+        if promotion_name is not None:
+            promotion_table = tables.get(promotion_name)
+            if promotion_table is None:
+                promotion_path = table_path(args.output, promotion_name)
+                if not os.path.exists(promotion_path):
+                    parser.error('generate {} before {}'.format(promotion_name, name))
+                promotion_table = np.load(promotion_path, mmap_mode='r')
+
+        start = time.perf_counter()
+        tables[name] = table = generate_table(name, promotion_table)
+        np.save(table_path(args.output, name), table)
+        to_move = table[0][table[0] != ILLEGAL_VALUE]
+        wins = to_move[to_move != DRAW_VALUE]
+        print('{}: {} positions with the strong side to move, {} won, longest mate {} plies, in {:.1f}s'.format(
+            name, to_move.size, wins.size, int(wins.max()) - 1 if wins.size else 0, time.perf_counter() - start))
+    return 0
@@ -0,0 +1,215 @@
+"""
+Converting batches of positions to and from NumPy arrays, for statistics and machine learning. A batch of N positions
+is either an (N, 8, 8) array of piece codes, 0 for an empty square and 1-12 for a piece as in the board's serialized
+form, or an (N, 12, 8, 8) array of 0/1 planes, one per piece code. Arrays are indexed [position, row, col] like the
+board, with row 0 being White's back rank.
+
+Attack and mobility maps for a whole batch are worked out at once from one 64-bit bitboard per position and plane,
+shifted and masked across the batch, rather than by looping over each board's pieces.
+
+This module needs NumPy, which is an optional dependency.
+"""
+
+import numpy as np
+
+from chessington.engine.attacks import FULL, NOT_FILE_A, NOT_FILE_H, NOT_FILE_AB, NOT_FILE_GH, RANK_3, RANK_6
+from chessington.engine.board import Board, BOARD_SIZE, SERIALIZED_SIZE, PIECE_CODES, PLAYER_CODES
+from chessington.engine.data import Player
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+
+PLANES = 12
+SQUARE_COUNT = BOARD_SIZE * BOARD_SIZE
+NO_EN_PASSANT = 64
+
+# Plane i holds the pieces with code i + 1: White's pawns, knights, bishops, rooks, queens and king, then Black's
+PLANE_CODES = np.arange(1, PLANES + 1, dtype=np.int8)
+
+# NumPy won't mix unsigned 64-bit arrays with Python ints, so every constant used on bitboards is a np.uint64
+ALL_SQUARES = np.uint64(FULL)
+MASK_NOT_FILE_A = np.uint64(NOT_FILE_A)
+MASK_NOT_FILE_H = np.uint64(NOT_FILE_H)
+MASK_NOT_FILE_AB = np.uint64(NOT_FILE_AB & FULL)
+MASK_NOT_FILE_GH = np.uint64(NOT_FILE_GH)
+DOUBLE_STEP_RANKS = {Player.WHITE: np.uint64(RANK_3), Player.BLACK: np.uint64(RANK_6)}
+
+# Each step as (distance towards higher squares, mask of the squares it can land on without wrapping round the board)
+NORTH = (8, ALL_SQUARES)
+SOUTH = (-8, ALL_SQUARES)
+EAST = (1, MASK_NOT_FILE_A)
+WEST = (-1, MASK_NOT_FILE_H)
+NORTH_EAST = (9, MASK_NOT_FILE_A)
+NORTH_WEST = (7, MASK_NOT_FILE_H)
+SOUTH_EAST = (-7, MASK_NOT_FILE_A)
+SOUTH_WEST = (-9, MASK_NOT_FILE_H)
+KNIGHT_STEPS = [(17, MASK_NOT_FILE_A), (15, MASK_NOT_FILE_H), (10, MASK_NOT_FILE_AB), (6, MASK_NOT_FILE_GH),
+                (-17, MASK_NOT_FILE_H), (-15, MASK_NOT_FILE_A), (-10, MASK_NOT_FILE_GH), (-6, MASK_NOT_FILE_AB)]
+KING_STEPS = [NORTH, SOUTH, EAST, WEST, NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST]
+ORTHOGONAL_STEPS = [NORTH, SOUTH, EAST, WEST]
+DIAGONAL_STEPS = [NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST]
+PAWN_CAPTURE_STEPS = {Player.WHITE: [NORTH_EAST, NORTH_WEST], Player.BLACK: [SOUTH_EAST, SOUTH_WEST]}
+PAWN_PUSH_STEPS = {Player.WHITE: NORTH, Player.BLACK: SOUTH}
+SLIDING_STEPS = {Bishop: DIAGONAL_STEPS, Rook: ORTHOGONAL_STEPS, Queen: ORTHOGONAL_STEPS + DIAGONAL_STEPS}
+
+
+def _plane(player, piece_type):
+    return PIECE_CODES[player][piece_type] - 1
+
+
+def encode_boards(boards):
+    """
+    Converts an iterable of boards into an (N, 8, 8) int8 array of piece codes, an (N,) int8 array of the player to
+    move (0 for White and 1 for Black) and an (N,) int8 array of the square of the pawn which can be taken en passant
+    (64 for none).
+    """
+    data = np.frombuffer(b''.join(board.to_bytes() for board in boards), dtype=np.uint8)
+    data = data.reshape(-1, SERIALIZED_SIZE).astype(np.int8)
+    return data[:, :SQUARE_COUNT].reshape(-1, BOARD_SIZE, BOARD_SIZE), data[:, SQUARE_COUNT], data[:, SQUARE_COUNT + 1]
+
+
+def decode_boards(codes, players=None, en_passant=None, shared_pieces=False):
+    """
+    Sets up a board for each position in an (N, 8, 8) array of piece codes. The players to move and en passant
+    squares are given as by encode_boards; without them, White is to move and nothing can be taken en passant. Pieces
+    are shared between the boards as for Board.from_bytes.
+    """
+    codes = np.asarray(codes, dtype=np.uint8).reshape(-1, SQUARE_COUNT)
+    count = len(codes)
+    if players is None:
+        players = np.full(count, PLAYER_CODES[Player.WHITE], dtype=np.uint8)
+    if en_passant is None:
+        en_passant = np.full(count, NO_EN_PASSANT, dtype=np.uint8)
+    data = np.concatenate([codes, np.asarray(players, dtype=np.uint8).reshape(-1, 1),
+                           np.asarray(en_passant, dtype=np.uint8).reshape(-1, 1)], axis=1)
+    return [Board.from_bytes(row.tobytes(), shared_pieces) for row in data]
+
+
+def codes_to_planes(codes):
+    """
+    Converts an (N, 8, 8) array of piece codes into an (N, 12, 8, 8) int8 array of planes.
+    """
+    return (np.asarray(codes)[:, np.newaxis] == PLANE_CODES[:, np.newaxis, np.newaxis]).astype(np.int8)
+
+
+def planes_to_codes(planes):
+    """
+    Converts an (N, 12, 8, 8) array of planes back into an (N, 8, 8) int8 array of piece codes.
+    """
+    return np.einsum('npij,p->nij', np.asarray(planes, dtype=np.int8), PLANE_CODES).astype(np.int8)
+
+
+def boards_to_planes(boards):
+    """
+    Converts an iterable of boards into an (N, 12, 8, 8) int8 array of planes.
+    """
+    return codes_to_planes(encode_boards(boards)[0])
+
+
+def planes_to_bitboards(planes):
+    """
+    Converts an (N, 12, 8, 8) array of planes into an (N, 12) array of uint64 bitboards, with bit 8 * row + col set
+    for each occupied square.
+    """
+    squares = np.asarray(planes).reshape(-1, PLANES, SQUARE_COUNT) != 0
+    return np.packbits(squares, axis=-1, bitorder='little').view('<u8').reshape(-1, PLANES).astype(np.uint64)
+
+
+def bitboards_to_maps(bitboards):
+    """
+    Converts an array of uint64 bitboards of any shape into int8 maps with two more axes, for the rows and columns.
+    """
+    bitboards = np.asarray(bitboards, dtype='<u8')
+    squares = np.unpackbits(bitboards.reshape(-1, 1).view(np.uint8), axis=-1, bitorder='little')
+    return squares.astype(np.int8).reshape(bitboards.shape + (BOARD_SIZE, BOARD_SIZE))
+
+
+def _shift(bitboards, step):
+    distance, mask = step
+    if distance > 0:
+        return (bitboards << np.uint64(distance)) & mask
+    return (bitboards >> np.uint64(-distance)) & mask
+
+
+def _steps_attacks(bitboards, steps):
+    attacks = np.zeros_like(bitboards)
+    for step in steps:
+        attacks |= _shift(bitboards, step)
+    return attacks
+
+
+def _sliding_attacks(bitboards, empty, steps):
+    """
+    Finds the squares attacked by sliding pieces along the given steps, each ray stopping at (and including) the first
+    occupied square.
+    """
+    attacks = np.zeros_like(bitboards)
+    for step in steps:
+        ray = _shift(bitboards, step)
+        for _ in range(BOARD_SIZE - 1):
+            attacks |= ray
+            ray = _shift(ray & empty, step)
+    return attacks
+
+
+def attack_bitboards(bitboards):
+    """
+    Works out, from an (N, 12) array of piece bitboards, an (N, 12) array of the squares attacked by each plane's
+    pieces.
+    """
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    occupied = np.bitwise_or.reduce(bitboards, axis=1)
+    empty = ~occupied
+    attacks = np.zeros_like(bitboards)
+    for player in Player:
+        attacks[:, _plane(player, Pawn)] = _steps_attacks(bitboards[:, _plane(player, Pawn)],
+                                                          PAWN_CAPTURE_STEPS[player])
+        attacks[:, _plane(player, Knight)] = _steps_attacks(bitboards[:, _plane(player, Knight)], KNIGHT_STEPS)
+        attacks[:, _plane(player, King)] = _steps_attacks(bitboards[:, _plane(player, King)], KING_STEPS)
+        for piece_type, steps in SLIDING_STEPS.items():
+            attacks[:, _plane(player, piece_type)] = _sliding_attacks(bitboards[:, _plane(player, piece_type)],
+                                                                      empty, steps)
+    return attacks
+
+
+def mobility_bitboards(bitboards):
+    """
+    Works out, from an (N, 12) array of piece bitboards, an (N, 12) array of the squares each plane's pieces can move
+    to: the squares they attack which aren't their own side's, and for pawns their steps forward and captures. En
+    passant captures and whether moves leave the king in check aren't considered.
+    """
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    attacks = attack_bitboards(bitboards)
+    empty = ~np.bitwise_or.reduce(bitboards, axis=1)
+    mobility = np.zeros_like(bitboards)
+    for player in Player:
+        planes = [_plane(player, piece_type) for piece_type in [Pawn, Knight, Bishop, Rook, Queen, King]]
+        own = np.bitwise_or.reduce(bitboards[:, planes], axis=1)
+        enemy = ~(own | empty)
+        for plane in planes[1:]:
+            mobility[:, plane] = attacks[:, plane] & ~own
+        pawn = planes[0]
+        single_steps = _shift(bitboards[:, pawn], PAWN_PUSH_STEPS[player]) & empty
+        double_steps = _shift(single_steps & DOUBLE_STEP_RANKS[player], PAWN_PUSH_STEPS[player]) & empty
+        mobility[:, pawn] = (attacks[:, pawn] & enemy) | single_steps | double_steps
+    return mobility
+
+
+def attack_maps(planes):
+    """
+    Works out an (N, 12, 8, 8) int8 array of the squares attacked by each plane's pieces.
+    """
+    return bitboards_to_maps(attack_bitboards(planes_to_bitboards(planes)))
+
+
+def mobility_maps(planes):
+    """
+    Works out an (N, 12, 8, 8) int8 array of the squares each plane's pieces can move to, as mobility_bitboards does.
+    """
+    return bitboards_to_maps(mobility_bitboards(planes_to_bitboards(planes)))
+
+
+def attacked_squares(planes):
+    """
+    Works out an (N, 2, 8, 8) int8 array of the squares attacked by each side, White first.
+    """
+    maps = attack_maps(planes)
+    return np.stack([maps[:, :PLANES // 2].max(axis=1), maps[:, PLANES // 2:].max(axis=1)], axis=1)
@@ -0,0 +1,192 @@
+"""
+A transposition table: a fixed-size cache of search results keyed by the Zobrist key of a position. Entries are held
+in parallel typed arrays rather than as Python objects, so the table's memory use is fixed when it is created.
+"""
+
+from abc import ABC, abstractmethod
+from array import array
+from collections import namedtuple
+
+from chessington.engine.moves import pack_move, unpack_move
+
+EXACT = 1
+LOWER_BOUND = 2
+UPPER_BOUND = 3
+
+ALWAYS_REPLACE = 'always'
+DEPTH_PREFERRED = 'depth'
+TWO_TIER = 'two-tier'
+REPLACEMENT_SCHEMES = [ALWAYS_REPLACE, DEPTH_PREFERRED, TWO_TIER]
+
+# key (8) + score (4) + move (2) + depth (1) + bound and age (1)
+ENTRY_SIZE = 16
+MAX_SCORE = 2 ** 31 - 1
+# The bound and the age share a byte: the bound in the low two bits and the age, counting searches, in the other six
+BOUND_MASK = 0x3
+AGE_SHIFT = 2
+AGE_MASK = 0x3F
+
+TableEntry = namedtuple('TableEntry', 'depth score bound move')
+
+
+class BaseTranspositionTable(ABC):
+    """
+    What every transposition table has in common: which slots a key can be stored in, which entry the replacement
+    scheme keeps, the age counting searches, and the statistics. Subclasses decide how the entries are stored.
+    """
+
+    def __init__(self, size, replacement):
+        if replacement not in REPLACEMENT_SCHEMES:
+            raise ValueError('Unknown replacement scheme: {}'.format(replacement))
+        self.size = size
+        self.replacement = replacement
+        self._mask = (size >> 1 if replacement == TWO_TIER else size) - 1
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    @staticmethod
+    def _entries_for(memory_bytes):
+        entries = memory_bytes // ENTRY_SIZE
+        if entries < 2:
+            raise ValueError('A transposition table needs at least {} bytes'.format(2 * ENTRY_SIZE))
+        # Round down to a power of two so that a slot can be found by masking the key
+        return 1 << (entries.bit_length() - 1)
+
+    @abstractmethod
+    def _slot_contents(self, slot):
+        """
+        Returns the key, depth and age of the entry in a slot, or None if the slot is empty.
+        """
+        pass
+
+    @abstractmethod
+    def _current_age(self):
+        """
+        Returns the age of the current search, which is stored with each entry.
+        """
+        pass
+
+    @abstractmethod
+    def _set_age(self, age):
+        """
+        Sets the age of the current search.
+        """
+        pass
+
+    def _slots(self, key):
+        if self.replacement == TWO_TIER:
+            slot = (key & self._mask) << 1
+            return slot, slot + 1
+        return (key & self._mask,)
+
+    def _choose_slot(self, key, depth):
+        slots = self._slots(key)
+        if self.replacement == ALWAYS_REPLACE:
+            return slots[0]
+        preferred = slots[0]
+        contents = self._slot_contents(preferred)
+        if contents is None:
+            return preferred
+        stored_key, stored_depth, stored_age = contents
+        if stored_key == key or stored_age != self._current_age() or depth >= stored_depth:
+            return preferred
+        if self.replacement == TWO_TIER:
+            return slots[1]
+        return None
+
+    def new_search(self):
+        """
+        Marks the start of a new search, so that entries left over from earlier searches are replaced first.
+        """
+        self._set_age((self._current_age() + 1) & AGE_MASK)
+
+    @property
+    def memory_bytes(self):
+        return self.size * ENTRY_SIZE
+
+    def stats(self):
+        """
+        Reports how often probes found an entry, and how often they found another position's entry instead.
+        """
+        return {
+            'size': self.size,
+            'probes': self.probes,
+            'hits': self.hits,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'overwrites': self.overwrites,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+        }
+
+
+class TranspositionTable(BaseTranspositionTable):
+    """
+    A transposition table holding as many entries as fit in the given memory budget, in bytes. When two positions
+    compete for a slot the replacement scheme decides which to keep:
+
+    - always: the newest entry always wins.
+    - depth: the entry searched to the greater depth wins, unless it is left over from an earlier search.
+    - two-tier: each slot holds a depth-preferred entry and an always-replace entry.
+    """
+
+    def __init__(self, memory_bytes=16 * 1024 * 1024, replacement=DEPTH_PREFERRED):
+        super().__init__(self._entries_for(memory_bytes), replacement)
+        self._keys = array('Q', bytes(8 * self.size))
+        self._scores = array('i', bytes(4 * self.size))
+        self._moves = array('H', bytes(2 * self.size))
+        self._depths = array('b', bytes(self.size))
+        self._flags = array('B', bytes(self.size))
+        self._age = 0
+
+    def probe(self, key):
+        """
+        Looks up the entry stored for a position, returning None if there isn't one.
+        """
+        self.probes += 1
+        for slot in self._slots(key):
+            if self._flags[slot] and self._keys[slot] == key:
+                self.hits += 1
+                packed_move = self._moves[slot]
+                return TableEntry(self._depths[slot], self._scores[slot], self._flags[slot] & BOUND_MASK,
+                                  unpack_move(packed_move) if packed_move else None)
+        if any(self._flags[slot] for slot in self._slots(key)):
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, bound, move=None):
+        """
+        Stores the result of searching a position, if the replacement scheme allows it.
+        """
+        slot = self._choose_slot(key, depth)
+        if slot is None:
+            return
+        if self._flags[slot] and self._keys[slot] != key:
+            self.overwrites += 1
+        self.stores += 1
+        self._keys[slot] = key
+        self._scores[slot] = max(-MAX_SCORE, min(MAX_SCORE, score))
+        self._moves[slot] = pack_move(move) if move is not None else 0
+        self._depths[slot] = max(-128, min(127, depth))
+        self._flags[slot] = bound | self._age << AGE_SHIFT
+
+    def _slot_contents(self, slot):
+        flags = self._flags[slot]
+        if not flags:
+            return None
+        return self._keys[slot], self._depths[slot], flags >> AGE_SHIFT
+
+    def _current_age(self):
+        return self._age
+
+    def _set_age(self, age):
+        self._age = age
+
+    def clear(self):
+        """
+        Empties the table and resets its statistics.
+        """
+        self._flags = array('B', bytes(self.size))
+        self.probes = self.hits = self.collisions = self.stores = self.overwrites = 0
@@ -0,0 +1,35 @@
+"""
+Zobrist hashing of board positions. Every feature of a position - each piece on each square, the side to move and
+the en passant square - has a random 64-bit key, and a position's key is the XOR of the keys of its features. Making
+a move only changes a handful of features, so the board can keep its key up to date as it goes.
+
+The game has no castling yet; when it does, castling rights will need keys of their own.
+"""
+
+import random
+
+from chessington.engine.data import Player
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+
+_random = random.Random(20190301)
+
+PIECE_KEYS = {player: {piece_type: [_random.getrandbits(64) for _ in range(64)]
+                       for piece_type in [Pawn, Knight, Bishop, Rook, Queen, King]}
+              for player in Player}
+BLACK_TO_MOVE_KEY = _random.getrandbits(64)
+EN_PASSANT_KEYS = [_random.getrandbits(64) for _ in range(64)]
+
+
+def compute_key(board):
+    """
+    Computes the Zobrist key of a board from scratch.
+    """
+    key = 0
+    for player in Player:
+        for square, piece in board.get_piece_squares(player):
+            key ^= PIECE_KEYS[player][type(piece)][square.row * 8 + square.col]
+    if board.current_player == Player.BLACK:
+        key ^= BLACK_TO_MOVE_KEY
+    if board.en_passant_state is not None:
+        key ^= EN_PASSANT_KEYS[board.en_passant_state.row * 8 + board.en_passant_state.col]
+    return key
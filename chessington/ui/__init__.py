@@ -7,15 +7,20 @@ import os
 import PySimpleGUI as psg
 
 from chessington.engine.board import Board, BOARD_SIZE
+from chessington.engine.book import OpeningBook
 from chessington.engine.data import Player, Square
+from chessington.engine.moves import move_squares
 from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
 
 IMAGES_BASE_DIRECTORY = 'images'
+# Moves from this opening book, if the file exists, are highlighted as suggestions
+BOOK_FILE = 'book.bin'
 
 BLACK_SQUARE_COLOUR = '#B58863'
 WHITE_SQUARE_COLOUR = '#F0D9B5'
 FROM_SQUARE_COLOUR = '#33A1FF'
 TO_SQUARE_COLOUR = '#B633FF'
+BOOK_SQUARE_COLOUR = '#33CC66'
 
 
 def get_image_name_from_piece(piece):
@@ -70,43 +75,48 @@ def reset_square_colours(window):
             element.Update(button_color=('white', colour))
 
 
-def highlight_squares(window, from_square, to_squares):
+def highlight_squares(window, from_square, to_squares, book_squares=()):
     reset_square_colours(window)
     if from_square is not None:
         set_square_colour(window, from_square, FROM_SQUARE_COLOUR)
     for square in to_squares:
-        set_square_colour(window, square, TO_SQUARE_COLOUR)
+        set_square_colour(window, square, BOOK_SQUARE_COLOUR if square in book_squares else TO_SQUARE_COLOUR)
 
 
 def play_game():
     psg.ChangeLookAndFeel('GreenTan')
 
     board = Board.at_starting_position()
+    book = OpeningBook(BOOK_FILE) if os.path.exists(BOOK_FILE) else None
     board_layout = render_board(board)
     window = psg.Window('Chessington', default_button_element_size=(12, 1), auto_size_buttons=False).Layout(
         board_layout)
 
     from_square = None
     to_squares = []
+    book_squares = []
 
     def handle_click(row, col):
 
-        nonlocal window, board, from_square, to_squares
+        nonlocal window, board, from_square, to_squares, book_squares
         clicked_piece = board.get_piece(Square.at(row, col))
 
         # If making an allowed move, then make it
         if from_square is not None and any(s.row == row and s.col == col for s in to_squares):
-            board.get_piece(from_square).move_to(board, Square.at(row, col))
-            from_square, to_squares = None, []
+            board.move_piece(from_square, Square.at(row, col))
+            from_square, to_squares, book_squares = None, [], []
 
         # If clicking on a piece whose turn it is, get its allowed moves
         elif clicked_piece is not None and clicked_piece.player == board.current_player:
             from_square = Square.at(row, col)
-            to_squares = clicked_piece.get_available_moves(board)
+            legal_moves = map(move_squares, board.generate_legal_moves(board.current_player))
+            to_squares = [to_square for move_from, to_square in legal_moves if move_from == from_square]
+            book_moves = map(move_squares, [book_move.move for book_move in book.lookup(board)] if book else [])
+            book_squares = [to_square for move_from, to_square in book_moves if move_from == from_square]
 
         # Otherwise reset everything to default
         else:
-            from_square, to_squares = None, []
+            from_square, to_squares, book_squares = None, [], []
 
     while True:
 
@@ -116,5 +126,5 @@ def play_game():
             handle_click(*button)
 
         # Update the UI
-        highlight_squares(window, from_square, to_squares)
+        highlight_squares(window, from_square, to_squares, book_squares)
         update_pieces(window, board)
@@ -0,0 +1,72 @@
+import itertools
+import json
+
+from chessington.engine.analysis import analyze_many, main
+from chessington.engine.board import Board
+from chessington.engine.perft import STANDARD_POSITIONS
+from chessington.engine.search import MATE_SCORE
+
+BACK_RANK_MATE = '6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1'
+
+
+class TestAnalysis:
+
+    @staticmethod
+    def test_results_come_back_in_input_order():
+        # Arrange
+        positions = [BACK_RANK_MATE, Board.at_starting_position(), 'not a fen', STANDARD_POSITIONS[1].fen]
+
+        # Act
+        results = list(analyze_many(positions, depth=2, workers=2))
+
+        # Assert
+        assert [result.index for result in results] == [0, 1, 2, 3]
+        assert results[0].best_move == 'Ra8#'
+        assert results[0].score == MATE_SCORE - 1
+        assert results[1].fen == Board.at_starting_position().to_fen()
+        assert results[2].error is not None
+        assert results[3].depth == 2 and results[3].error is None
+
+    @staticmethod
+    def test_unordered_results_cover_every_position():
+        # Arrange
+        positions = [position.fen for position in STANDARD_POSITIONS] * 3
+
+        # Act
+        results = list(analyze_many(positions, depth=1, workers=2, ordered=False, max_pending=2))
+
+        # Assert
+        assert sorted(result.index for result in results) == list(range(len(positions)))
+
+    @staticmethod
+    def test_positions_are_read_only_as_fast_as_results_are_taken():
+        # Arrange
+        read = []
+
+        def endless_positions():
+            for index in itertools.count():
+                read.append(index)
+                yield BACK_RANK_MATE
+
+        # Act
+        results = list(itertools.islice(analyze_many(endless_positions(), depth=0, workers=1, max_pending=3), 5))
+
+        # Assert
+        assert len(results) == 5
+        assert len(read) <= 8
+
+    @staticmethod
+    def test_main_writes_json_lines(tmp_path):
+        # Arrange
+        input_path = tmp_path / 'positions.fen'
+        input_path.write_text('# Positions\n{}\n\n{}\n'.format(BACK_RANK_MATE, STANDARD_POSITIONS[0].fen))
+        output_path = tmp_path / 'results.jsonl'
+
+        # Act
+        main([str(input_path), '--output', str(output_path), '--depth', '2', '--workers', '1'])
+
+        # Assert
+        lines = [json.loads(line) for line in output_path.read_text().splitlines()]
+        assert [line['index'] for line in lines] == [0, 1]
+        assert lines[0]['best_move'] == 'Ra8#'
+        assert lines[0]['principal_variation'] == ['Ra8#']
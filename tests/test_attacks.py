@@ -0,0 +1,113 @@
+import random
+
+from chessington.engine.attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, KNIGHT_TARGETS, \
+    PAWN_CAPTURE_TARGETS, RAY_TARGETS, square_index, square_bit, bitboard_squares, rook_attacks, bishop_attacks
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.pieces import Pawn, Bishop, Rook, Queen
+
+
+class TestAttackTables:
+
+    @staticmethod
+    def test_knight_in_corner_attacks_two_squares():
+        # Arrange
+        index = square_index(Square.at(0, 0))
+
+        # Act
+        targets = bitboard_squares(KNIGHT_ATTACKS[index])
+
+        # Assert
+        assert sorted(targets) == [Square.at(1, 2), Square.at(2, 1)]
+
+    @staticmethod
+    def test_knight_in_centre_attacks_eight_squares():
+        # Arrange
+        index = square_index(Square.at(4, 4))
+
+        # Act
+        targets = KNIGHT_TARGETS[index]
+
+        # Assert
+        assert len(targets) == 8
+        assert Square.at(6, 5) in targets
+        assert Square.at(2, 3) in targets
+
+    @staticmethod
+    def test_king_on_edge_attacks_five_squares():
+        # Arrange
+        index = square_index(Square.at(0, 4))
+
+        # Act
+        targets = bitboard_squares(KING_ATTACKS[index])
+
+        # Assert
+        assert sorted(targets) == [Square.at(0, 3), Square.at(0, 5), Square.at(1, 3), Square.at(1, 4),
+                                   Square.at(1, 5)]
+
+    @staticmethod
+    def test_pawn_captures_do_not_wrap_around_the_board():
+        # Arrange
+        white_index = square_index(Square.at(3, 7))
+        black_index = square_index(Square.at(3, 0))
+
+        # Act
+        white_targets = bitboard_squares(PAWN_ATTACKS[Player.WHITE][white_index])
+        black_targets = PAWN_CAPTURE_TARGETS[Player.BLACK][black_index]
+
+        # Assert
+        assert white_targets == [Square.at(4, 6)]
+        assert black_targets == (Square.at(2, 1),)
+
+    @staticmethod
+    def test_rook_attacks_stop_at_first_blocker():
+        # Arrange
+        index = square_index(Square.at(3, 3))
+        occupied = square_bit(Square.at(3, 5)) | square_bit(Square.at(3, 6)) | square_bit(Square.at(1, 3))
+
+        # Act
+        targets = bitboard_squares(rook_attacks(index, occupied))
+
+        # Assert
+        assert Square.at(3, 5) in targets
+        assert Square.at(3, 6) not in targets
+        assert Square.at(1, 3) in targets
+        assert Square.at(0, 3) not in targets
+        assert Square.at(7, 3) in targets
+        assert Square.at(3, 0) in targets
+
+    @staticmethod
+    def test_bishop_attacks_match_rays_on_empty_board():
+        # Arrange
+        index = square_index(Square.at(2, 5))
+
+        # Act
+        targets = bitboard_squares(bishop_attacks(index, 0))
+
+        # Assert
+        expected = [square for direction in [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+                    for square in RAY_TARGETS[direction][index]]
+        assert sorted(targets) == sorted(expected)
+
+    @staticmethod
+    def test_sliding_moves_match_stepping_one_square_at_a_time():
+        rng = random.Random(0)
+        directions = {Bishop: [(1, 1), (1, -1), (-1, 1), (-1, -1)], Rook: [(1, 0), (-1, 0), (0, 1), (0, -1)]}
+        directions[Queen] = directions[Bishop] + directions[Rook]
+        for _ in range(50):
+            # Arrange
+            board = Board.empty()
+            for piece_type in [Pawn, Pawn, Pawn, Pawn, Bishop, Rook, Queen]:
+                square = Square.at(rng.randrange(8), rng.randrange(8))
+                board.set_piece(square, piece_type(rng.choice([Player.WHITE, Player.BLACK])))
+
+            for piece_type in directions:
+                for player in [Player.WHITE, Player.BLACK]:
+                    for piece in board.get_pieces(player, piece_type):
+                        # Act
+                        moves = piece.get_available_moves(board)
+
+                        # Assert
+                        stepped = [square for direction in directions[piece_type]
+                                   for square in piece.get_moves_in_direction(board, direction)]
+                        assert sorted(moves) == sorted(stepped)
@@ -1,5 +1,14 @@
-from chessington.engine.board import Board
+import random
+from array import array
+
+import pytest
+
+from chessington.engine.attacks import square_bit
+from chessington.engine.board import Board, PIECE_CODES
 from chessington.engine.data import Player, Square
+from chessington.engine.moves import CAPTURE, DOUBLE_PAWN_PUSH, EN_PASSANT, PROMOTION, is_capture, move_between, \
+    move_squares, pack_move, packed_move_between, unpack_move
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
 
 def test_new_board_has_white_pieces_at_bottom():
 
@@ -35,4 +44,542 @@ def test_pieces_can_be_moved_on_the_board():
     board.move_piece(from_square, to_square)
 
     assert board.get_piece(from_square) is None
-    assert board.get_piece(to_square) is piece
\ No newline at end of file
+    assert board.get_piece(to_square) is piece
+
+def test_find_piece_follows_moved_piece():
+
+    # Arrange
+    board = Board.at_starting_position()
+    from_square = Square.at(1, 4)
+    piece = board.get_piece(from_square)
+
+    # Act
+    to_square = Square.at(3, 4)
+    board.move_piece(from_square, to_square)
+
+    # Assert
+    assert board.find_piece(piece) == to_square
+
+def test_captured_piece_is_removed_from_piece_lists():
+
+    # Arrange
+    board = Board.empty()
+    rook = Rook(Player.WHITE)
+    board.set_piece(Square.at(0, 0), rook)
+    enemy = Knight(Player.BLACK)
+    board.set_piece(Square.at(5, 0), enemy)
+
+    # Act
+    board.move_piece(Square.at(0, 0), Square.at(5, 0))
+
+    # Assert
+    assert board.get_pieces(Player.BLACK) == []
+    assert board.get_piece_squares(Player.WHITE, Rook) == [(Square.at(5, 0), rook)]
+
+def test_starting_position_has_sixteen_pieces_per_player():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    white_pieces = board.get_pieces(Player.WHITE)
+    black_pawns = board.get_pieces(Player.BLACK, Pawn)
+
+    # Assert
+    assert len(white_pieces) == 16
+    assert len(black_pawns) == 8
+
+def test_generate_moves_finds_twenty_opening_moves():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    moves = board.generate_moves(Player.WHITE)
+
+    # Assert
+    assert len(moves) == 20
+    assert move_between(Square.at(0, 1), Square.at(2, 2)) in moves
+
+def test_generate_moves_flags_captures_and_promotions():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(6, 3), Pawn(Player.WHITE))
+    board.set_piece(Square.at(7, 4), Rook(Player.BLACK))
+
+    # Act
+    moves = board.generate_moves(Player.WHITE)
+
+    # Assert
+    assert move_between(Square.at(6, 3), Square.at(7, 4), CAPTURE | PROMOTION) in moves
+    assert move_between(Square.at(6, 3), Square.at(7, 3), PROMOTION) in moves
+
+def test_generate_moves_includes_en_passant():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(4, 4), Pawn(Player.WHITE))
+    board.set_piece(Square.at(6, 3), Pawn(Player.BLACK))
+    board.current_player = Player.BLACK
+    board.move_piece(Square.at(6, 3), Square.at(4, 3))
+
+    # Act
+    moves = board.generate_moves(Player.WHITE)
+
+    # Assert
+    assert move_between(Square.at(4, 4), Square.at(5, 3), EN_PASSANT) in moves
+
+def test_generate_moves_matches_piece_moves_on_random_positions():
+
+    rng = random.Random(0)
+    for _ in range(50):
+        # Arrange
+        board = Board.empty()
+        for piece_type in [Pawn, Pawn, Pawn, Pawn, Knight, Bishop, Rook, Queen, King]:
+            for player in Player:
+                square = Square.at(rng.randrange(1, 7), rng.randrange(8))
+                if board.is_square_empty(square):
+                    board.set_piece(square, piece_type(player))
+
+        for player in Player:
+            # Act
+            moves = [move_squares(move) for move in board.generate_moves(player)]
+
+            # Assert
+            expected = [(square, to_square) for square, piece in board.get_piece_squares(player)
+                        for to_square in piece.get_available_moves(board)]
+            assert sorted(moves) == sorted(expected)
+
+def snapshot(board):
+    return ([row[:] for row in board.board], board.en_passant_state, board.current_player, dict(board.occupancy),
+            sorted(board.get_piece_squares(Player.WHITE) + board.get_piece_squares(Player.BLACK), key=lambda x: x[0]))
+
+def test_unmake_move_restores_promotion():
+
+    # Arrange
+    board = Board.empty()
+    pawn = Pawn(Player.WHITE)
+    board.set_piece(Square.at(6, 0), pawn)
+    before = snapshot(board)
+
+    # Act
+    board.make_move(move_between(Square.at(6, 0), Square.at(7, 0), PROMOTION))
+    promoted = board.get_piece(Square.at(7, 0))
+    board.unmake_move()
+
+    # Assert
+    assert isinstance(promoted, Queen)
+    assert board.get_piece(Square.at(6, 0)) is pawn
+    assert snapshot(board) == before
+
+def test_unmake_move_restores_en_passant_capture():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(4, 4), Pawn(Player.WHITE))
+    black_pawn = Pawn(Player.BLACK)
+    board.set_piece(Square.at(6, 3), black_pawn)
+    board.current_player = Player.BLACK
+    board.move_piece(Square.at(6, 3), Square.at(4, 3))
+    before = snapshot(board)
+
+    # Act
+    board.make_move(move_between(Square.at(4, 4), Square.at(5, 3), EN_PASSANT))
+    captured = board.get_piece(Square.at(4, 3))
+    board.unmake_move()
+
+    # Assert
+    assert captured is None
+    assert board.get_piece(Square.at(4, 3)) is black_pawn
+    assert snapshot(board) == before
+
+def test_make_and_unmake_random_games_restore_starting_position():
+
+    rng = random.Random(0)
+    for _ in range(10):
+        # Arrange
+        board = Board.at_starting_position()
+        before = snapshot(board)
+
+        # Act
+        for _ in range(60):
+            moves = board.generate_moves(board.current_player)
+            if not moves:
+                break
+            board.make_move(rng.choice(moves))
+        while board.can_unmake_move():
+            board.unmake_move()
+
+        # Assert
+        assert snapshot(board) == before
+
+def test_king_attacked_by_bishop_is_in_check():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(0, 4), King(Player.WHITE))
+    board.set_piece(Square.at(3, 1), Bishop(Player.BLACK))
+
+    # Act
+    in_check = board.is_in_check(Player.WHITE)
+
+    # Assert
+    assert in_check
+    assert not board.is_in_check(Player.BLACK)
+
+def test_blocked_attack_does_not_give_check():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(0, 4), King(Player.WHITE))
+    board.set_piece(Square.at(1, 4), Pawn(Player.WHITE))
+    board.set_piece(Square.at(6, 4), Rook(Player.BLACK))
+
+    # Act
+    in_check = board.is_in_check(Player.WHITE)
+
+    # Assert
+    assert not in_check
+
+def test_pinned_piece_can_only_move_along_the_pin():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(0, 4), King(Player.WHITE))
+    board.set_piece(Square.at(2, 4), Rook(Player.WHITE))
+    board.set_piece(Square.at(6, 4), Rook(Player.BLACK))
+
+    # Act
+    moves = [move_squares(move) for move in board.generate_legal_moves(Player.WHITE)]
+
+    # Assert
+    rook_moves = [to_square for from_square, to_square in moves if from_square == Square.at(2, 4)]
+    assert sorted(rook_moves) == [Square.at(row, 4) for row in [1, 3, 4, 5, 6]]
+
+def test_king_cannot_step_back_along_checking_line():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(3, 4), King(Player.WHITE))
+    board.set_piece(Square.at(7, 4), Rook(Player.BLACK))
+
+    # Act
+    moves = [move_squares(move) for move in board.generate_legal_moves(Player.WHITE)]
+
+    # Assert
+    assert (Square.at(3, 4), Square.at(2, 4)) not in moves
+    assert (Square.at(3, 4), Square.at(3, 3)) in moves
+
+def test_only_blocks_captures_and_king_moves_escape_check():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(0, 4), King(Player.WHITE))
+    board.set_piece(Square.at(1, 0), Rook(Player.WHITE))
+    board.set_piece(Square.at(4, 5), Knight(Player.WHITE))
+    board.set_piece(Square.at(3, 7), Bishop(Player.BLACK))
+
+    # Act
+    moves = [move_squares(move) for move in board.generate_legal_moves(Player.WHITE)]
+
+    # Assert
+    non_king_moves = [move for move in moves if move[0] != Square.at(0, 4)]
+    assert sorted(non_king_moves) == [(Square.at(1, 0), Square.at(1, 5)), (Square.at(4, 5), Square.at(2, 6)),
+                                      (Square.at(4, 5), Square.at(3, 7))]
+
+def test_back_rank_mate_is_checkmate():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(0, 6), King(Player.WHITE))
+    for col in [5, 6, 7]:
+        board.set_piece(Square.at(1, col), Pawn(Player.WHITE))
+    board.set_piece(Square.at(0, 0), Rook(Player.BLACK))
+
+    # Act
+    checkmate = board.is_checkmate(Player.WHITE)
+
+    # Assert
+    assert checkmate
+    assert board.legal_move_count(Player.WHITE) == 0
+
+def test_cornered_king_with_no_moves_is_stalemate():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(7, 0), King(Player.BLACK))
+    board.set_piece(Square.at(5, 1), Queen(Player.WHITE))
+    board.set_piece(Square.at(0, 7), King(Player.WHITE))
+
+    # Act
+    stalemate = board.is_stalemate(Player.BLACK)
+
+    # Assert
+    assert stalemate
+    assert not board.is_checkmate(Player.BLACK)
+
+def test_legal_moves_match_making_each_move_on_random_positions():
+
+    rng = random.Random(1)
+    for _ in range(100):
+        # Arrange
+        board = Board.empty()
+        for piece_type in [King, Pawn, Pawn, Pawn, Knight, Bishop, Rook, Queen]:
+            for player in Player:
+                square = Square.at(rng.randrange(1, 7), rng.randrange(8))
+                if board.is_square_empty(square):
+                    board.set_piece(square, piece_type(player))
+
+        for player in Player:
+            # Act
+            moves = board.generate_legal_moves(player)
+
+            # Assert
+            expected = []
+            for move in board.generate_moves(player):
+                board.make_move(move)
+                if not board.is_in_check(player):
+                    expected.append(move)
+                board.unmake_move()
+            assert sorted(moves) == sorted(expected)
+
+def test_iter_moves_yields_captures_before_quiet_moves():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(3, 3), Rook(Player.WHITE))
+    board.set_piece(Square.at(6, 3), Pawn(Player.BLACK))
+    board.set_piece(Square.at(3, 0), Knight(Player.BLACK))
+
+    # Act
+    moves = list(board.iter_moves(Player.WHITE))
+
+    # Assert
+    assert sorted(moves) == sorted(board.generate_moves(Player.WHITE))
+    assert [is_capture(move) for move in moves[:2]] == [True, True]
+    assert not any(is_capture(move) for move in moves[2:])
+
+def test_iter_legal_moves_can_skip_quiet_moves():
+
+    # Arrange
+    board = Board.at_starting_position()
+    board.move_piece(Square.at(1, 4), Square.at(3, 4))
+    board.move_piece(Square.at(6, 3), Square.at(4, 3))
+
+    # Act
+    captures = list(board.iter_legal_moves(Player.WHITE, include_quiet=False))
+
+    # Assert
+    assert captures == [move_between(Square.at(3, 4), Square.at(4, 3), CAPTURE)]
+
+def test_has_legal_move_agrees_with_generated_moves():
+
+    # Arrange
+    stalemated = Board.empty()
+    stalemated.set_piece(Square.at(7, 0), King(Player.BLACK))
+    stalemated.set_piece(Square.at(5, 1), Queen(Player.WHITE))
+    stalemated.set_piece(Square.at(0, 7), King(Player.WHITE))
+    starting = Board.at_starting_position()
+
+    # Act
+    stalemated_has_move = stalemated.has_legal_move(Player.BLACK)
+    starting_has_move = starting.has_legal_move(Player.WHITE)
+
+    # Assert
+    assert not stalemated_has_move
+    assert starting_has_move
+
+def test_board_survives_a_round_trip_through_bytes():
+
+    # Arrange
+    board = Board.at_starting_position()
+    board.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+    # Act
+    data = board.to_bytes()
+    copy = Board.from_bytes(data)
+
+    # Assert
+    assert len(data) == 66
+    assert copy == board
+    assert copy.current_player == Player.BLACK
+    assert copy.en_passant_state == Square.at(3, 4)
+    assert sorted(copy.generate_legal_moves(Player.BLACK)) == sorted(board.generate_legal_moves(Player.BLACK))
+
+def test_starting_position_round_trips_through_fen():
+
+    # Arrange
+    fen = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1'
+
+    # Act
+    board = Board.from_fen(fen)
+
+    # Assert
+    assert board == Board.at_starting_position()
+    assert board.to_fen() == fen
+
+def test_fen_keeps_side_to_move_and_en_passant_square():
+
+    # Arrange
+    board = Board.at_starting_position()
+    board.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+    # Act
+    fen = board.to_fen()
+    copy = Board.from_fen(fen)
+
+    # Assert
+    assert fen == 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b - e3 0 1'
+    assert copy == board
+    assert copy.current_player == Player.BLACK
+    assert copy.en_passant_state == Square.at(3, 4)
+
+def test_fen_without_move_counters_is_accepted():
+
+    # Arrange
+    fen = '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 b KQkq -'
+
+    # Act
+    board = Board.from_fen(fen)
+
+    # Assert
+    assert isinstance(board.get_piece(Square.at(4, 0)), King)
+    assert board.current_player == Player.BLACK
+    assert board.to_fen() == '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 b - - 0 1'
+
+def test_invalid_fen_is_rejected():
+
+    for fen in ['8/8/8 w - - 0 1', 'rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1',
+                'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w - - 0 1', '8/8/8/8/8/8/8/8 x - - 0 1',
+                '8/8/8/8/8/8/8/8 w - e3 0 1', '8/8/8/8/8/8/8/8 w - - 0']:
+        with pytest.raises(ValueError):
+            Board.from_fen(fen)
+
+def test_fen_en_passant_square_needs_a_pawn_to_take():
+
+    for fen in ['4k3/8/8/3Pn3/8/8/8/4K3 w - e6 0 1', '4k3/8/8/3P4/8/8/8/4K3 w - e6 0 1',
+                '4k3/8/8/3PP3/8/8/8/4K3 w - e6 0 1']:
+        with pytest.raises(ValueError):
+            Board.from_fen(fen)
+
+def test_packed_moves_can_be_stored_in_an_array():
+
+    # Arrange
+    board = Board.from_fen('r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10')
+    moves = board.generate_legal_moves(Player.WHITE)
+
+    # Act
+    packed_moves = array('H', map(pack_move, moves))
+
+    # Assert
+    assert [unpack_move(move) for move in packed_moves] == moves
+    assert [is_capture(move) for move in packed_moves] == [is_capture(move) for move in moves]
+    assert any(is_capture(move) for move in packed_moves)
+
+def test_board_makes_packed_moves():
+
+    # Arrange
+    board = Board.at_starting_position()
+    tuple_board = Board.at_starting_position()
+    move = packed_move_between(Square.at(1, 4), Square.at(3, 4), DOUBLE_PAWN_PUSH)
+
+    # Act
+    board.make_move(move)
+    tuple_board.make_move(move_between(Square.at(1, 4), Square.at(3, 4), DOUBLE_PAWN_PUSH))
+
+    # Assert
+    assert board == tuple_board
+    assert board.en_passant_state == Square.at(3, 4)
+    assert move_squares(move) == (Square.at(1, 4), Square.at(3, 4))
+    assert board.unmake_move() == (12, 28, DOUBLE_PAWN_PUSH)
+    assert board == Board.at_starting_position()
+
+def test_mailbox_holds_a_piece_code_per_square():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    mailbox = board.to_mailbox()
+
+    # Assert
+    assert len(mailbox) == 64
+    assert mailbox == bytearray(board.to_bytes()[:64])
+    assert mailbox[4] == PIECE_CODES[Player.WHITE][King]
+    assert mailbox[32] == 0
+
+def test_piece_bitboards_match_starting_position():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    white_pawns = board.get_piece_bitboard(Player.WHITE, Pawn)
+    black_king = board.get_piece_bitboard(Player.BLACK, King)
+
+    # Assert
+    assert white_pawns == 0xFF00
+    assert black_king == square_bit(Square.at(7, 4))
+    assert board.occupied == 0xFFFF00000000FFFF
+
+def test_piece_bitboards_follow_captures_and_take_backs():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(0, 0), Rook(Player.WHITE))
+    board.set_piece(Square.at(5, 0), Knight(Player.BLACK))
+
+    # Act
+    board.move_piece(Square.at(0, 0), Square.at(5, 0))
+    captured = board.get_piece_bitboard(Player.BLACK, Knight), board.get_piece_bitboard(Player.WHITE, Rook)
+    board.unmake_move()
+
+    # Assert
+    assert captured == (0, square_bit(Square.at(5, 0)))
+    assert board.get_piece_bitboard(Player.BLACK, Knight) == square_bit(Square.at(5, 0))
+    assert board.get_piece_bitboard(Player.WHITE, Rook) == square_bit(Square.at(0, 0))
+
+def test_moves_from_a_square_match_piece_moves_on_random_positions():
+    for seed in range(50):
+
+        # Arrange
+        rng = random.Random(seed)
+        board = Board.empty()
+        for piece_type in [Pawn, Pawn, Pawn, Knight, Bishop, Rook, Queen, King]:
+            for player in Player:
+                square = Square.at(rng.randrange(8), rng.randrange(8))
+                if board.is_square_empty(square):
+                    board.set_piece(square, piece_type(player))
+
+        for player in Player:
+            for square, piece in board.get_piece_squares(player):
+
+                # Act
+                moves = board.get_moves_from(square)
+
+                # Assert
+                assert sorted(moves) == sorted(piece.get_available_moves(board))
+
+def test_moves_to_a_square_match_generated_moves_on_random_games():
+    for seed in range(20):
+
+        # Arrange
+        rng = random.Random(seed)
+        board = Board.at_starting_position()
+        for _ in range(40):
+            moves = board.generate_moves(board.current_player)
+            for piece_type in [Pawn, Knight, Bishop, Rook, Queen, King]:
+                pieces = board.get_piece_bitboard(board.current_player, piece_type)
+                for to_index in range(64):
+
+                    # Act
+                    moves_to = board.generate_moves_to(board.current_player, piece_type, to_index)
+
+                    # Assert
+                    assert sorted(moves_to) == sorted(move for move in moves
+                                                      if move[1] == to_index and pieces >> move[0] & 1)
+            legal_moves = board.generate_legal_moves(board.current_player)
+            if not legal_moves:
+                break
+            board.make_move(rng.choice(legal_moves))
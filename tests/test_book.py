@@ -0,0 +1,144 @@
+import random
+
+from chessington.engine.board import Board
+from chessington.engine.book import OpeningBook, BookEntry, encode_move, write_book
+from chessington.engine.data import Player, Square
+from chessington.engine.moves import DOUBLE_PAWN_PUSH, PROMOTION, QUIET, move_between
+from chessington.engine.pieces import Pawn, King
+from chessington.engine.search import Searcher
+
+E4 = move_between(Square.at(1, 4), Square.at(3, 4), DOUBLE_PAWN_PUSH)
+D4 = move_between(Square.at(1, 3), Square.at(3, 3), DOUBLE_PAWN_PUSH)
+NF3 = move_between(Square.at(0, 6), Square.at(2, 5), QUIET)
+
+
+def starting_book(path):
+    key = Board.at_starting_position().zobrist_key
+    write_book(path, [
+        BookEntry(key, encode_move(E4), 10, 0),
+        BookEntry(key, encode_move(D4), 5, 0),
+        BookEntry(key, encode_move(NF3), 0, 0),
+        # Not a legal move in the starting position
+        BookEntry(key, encode_move(move_between(Square.at(1, 4), Square.at(4, 4))), 100, 0),
+        BookEntry(key - 1, encode_move(E4), 1, 0),
+        BookEntry(key + 1, encode_move(D4), 1, 0),
+    ])
+    return path
+
+
+class TestOpeningBook:
+
+    @staticmethod
+    def test_lookup_finds_legal_weighted_moves(tmp_path):
+        # Arrange
+        path = starting_book(str(tmp_path / 'book.bin'))
+
+        # Act
+        with OpeningBook(path) as book:
+            book_moves = book.lookup(Board.at_starting_position())
+            entry_count = len(book)
+
+        # Assert
+        assert book_moves == [(E4, 10), (D4, 5)]
+        assert entry_count == 6
+
+    @staticmethod
+    def test_lookup_of_unknown_position_is_empty(tmp_path):
+        # Arrange
+        path = starting_book(str(tmp_path / 'book.bin'))
+        board = Board.at_starting_position()
+        board.make_move(E4)
+
+        # Act
+        with OpeningBook(path) as book:
+            book_moves = book.lookup(board)
+            best_move = book.best_move(board)
+
+        # Assert
+        assert book_moves == []
+        assert best_move is None
+
+    @staticmethod
+    def test_empty_book_has_no_moves(tmp_path):
+        # Arrange
+        path = str(tmp_path / 'empty.bin')
+        write_book(path, [])
+
+        # Act
+        with OpeningBook(path) as book:
+            book_moves = book.lookup(Board.at_starting_position())
+
+        # Assert
+        assert book_moves == []
+
+    @staticmethod
+    def test_binary_search_finds_entries_in_a_large_book(tmp_path):
+        # Arrange
+        rng = random.Random(3)
+        board = Board.at_starting_position()
+        entries = [BookEntry(rng.getrandbits(64), 0, 1, 0) for _ in range(5000)]
+        entries.append(BookEntry(board.zobrist_key, encode_move(NF3), 7, 0))
+        path = str(tmp_path / 'book.bin')
+        write_book(path, entries)
+
+        # Act
+        with OpeningBook(path) as book:
+            best_move = book.best_move(board)
+
+        # Assert
+        assert best_move == NF3
+
+    @staticmethod
+    def test_choose_move_picks_by_weight(tmp_path):
+        # Arrange
+        path = starting_book(str(tmp_path / 'book.bin'))
+        board = Board.at_starting_position()
+
+        # Act
+        with OpeningBook(path) as book:
+            choices = [book.choose_move(board, random.Random(seed)) for seed in range(50)]
+
+        # Assert
+        assert set(choices) == {E4, D4}
+        assert choices.count(E4) > choices.count(D4)
+
+    @staticmethod
+    def test_promotions_are_encoded_as_polyglot_does():
+        # Arrange
+        move = move_between(Square.at(6, 0), Square.at(7, 0), PROMOTION)
+
+        # Act
+        encoded = encode_move(move)
+
+        # Assert
+        assert encoded == 56 | 48 << 6 | 4 << 12
+
+    @staticmethod
+    def test_searcher_plays_book_move_without_searching(tmp_path):
+        # Arrange
+        path = starting_book(str(tmp_path / 'book.bin'))
+
+        # Act
+        with OpeningBook(path) as book:
+            result = Searcher(book=book).search(Board.at_starting_position(), max_depth=3)
+
+        # Assert
+        assert result.best_move == E4
+        assert result.nodes == 0
+
+    @staticmethod
+    def test_searcher_searches_positions_out_of_book(tmp_path):
+        # Arrange
+        path = starting_book(str(tmp_path / 'book.bin'))
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        board.set_piece(Square.at(6, 0), Pawn(Player.WHITE))
+        board.set_piece(Square.at(7, 7), King(Player.BLACK))
+
+        # Act
+        with OpeningBook(path) as book:
+            result = Searcher(book=book).search(board, max_depth=2)
+
+        # Assert
+        assert result.best_move == move_between(Square.at(6, 0), Square.at(7, 0), PROMOTION)
+        assert result.nodes > 0
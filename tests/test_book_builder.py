@@ -0,0 +1,136 @@
+from chessington.engine.board import Board
+from chessington.engine.book import OpeningBook
+from chessington.engine.book_builder import BookBuilder, WHITE_WIN, BLACK_WIN, DRAW, main
+from chessington.engine.data import Square
+from chessington.engine.moves import DOUBLE_PAWN_PUSH, QUIET, move_between
+
+E4 = move_between(Square.at(1, 4), Square.at(3, 4), DOUBLE_PAWN_PUSH)
+D4 = move_between(Square.at(1, 3), Square.at(3, 3), DOUBLE_PAWN_PUSH)
+E5 = move_between(Square.at(6, 4), Square.at(4, 4), DOUBLE_PAWN_PUSH)
+C5 = move_between(Square.at(6, 2), Square.at(4, 2), DOUBLE_PAWN_PUSH)
+NF3 = move_between(Square.at(0, 6), Square.at(2, 5), QUIET)
+
+GAMES = [
+    ([E4, E5, NF3], WHITE_WIN),
+    ([E4, C5, NF3], BLACK_WIN),
+    ([E4, E5, NF3], DRAW),
+    ([D4], WHITE_WIN),
+    ([D4], BLACK_WIN),
+]
+
+
+def after(*moves):
+    board = Board.at_starting_position()
+    for move in moves:
+        board.make_move(move)
+    return board
+
+
+class TestBookBuilder:
+
+    @staticmethod
+    def test_book_weights_moves_by_points_scored(tmp_path):
+        # Arrange
+        path = str(tmp_path / 'book.bin')
+        builder = BookBuilder()
+        builder.add_games(GAMES)
+
+        # Act
+        written = builder.write(path)
+
+        # Assert
+        with OpeningBook(path) as book:
+            assert book.lookup(Board.at_starting_position()) == [(E4, 3), (D4, 2)]
+            assert book.lookup(after(E4)) == [(C5, 2), (E5, 1)]
+            assert book.lookup(after(E4, E5)) == [(NF3, 3)]
+            assert len(book) == written == 5
+
+    @staticmethod
+    def test_spilling_to_disk_builds_the_same_book(tmp_path):
+        # Arrange
+        in_memory_builder = BookBuilder()
+        spilling_builder = BookBuilder(max_entries=2, temp_dir=str(tmp_path))
+        in_memory_builder.add_games(GAMES)
+        spilling_builder.add_games(GAMES)
+        runs = spilling_builder.stats().runs
+
+        # Act
+        in_memory_builder.write(str(tmp_path / 'in_memory.bin'))
+        spilling_builder.write(str(tmp_path / 'spilled.bin'))
+
+        # Assert
+        assert runs > 1
+        assert (tmp_path / 'in_memory.bin').read_bytes() == (tmp_path / 'spilled.bin').read_bytes()
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['in_memory.bin', 'spilled.bin']
+
+    @staticmethod
+    def test_only_moves_up_to_max_ply_are_counted(tmp_path):
+        # Arrange
+        path = str(tmp_path / 'book.bin')
+        builder = BookBuilder(max_ply=2)
+        builder.add_games(GAMES)
+
+        # Act
+        builder.write(path)
+
+        # Assert
+        with OpeningBook(path) as book:
+            assert book.lookup(after(E4, E5)) == []
+        assert builder.positions == 8
+
+    @staticmethod
+    def test_rarely_played_moves_are_left_out(tmp_path):
+        # Arrange
+        path = str(tmp_path / 'book.bin')
+        builder = BookBuilder()
+        builder.add_games(GAMES)
+
+        # Act
+        builder.write(path, min_games=3)
+
+        # Assert
+        with OpeningBook(path) as book:
+            assert book.lookup(Board.at_starting_position()) == [(E4, 3)]
+            assert len(book) == 1
+
+    @staticmethod
+    def test_weights_are_scaled_to_fit(tmp_path):
+        # Arrange
+        path = str(tmp_path / 'book.bin')
+        builder = BookBuilder(max_ply=1)
+        builder.add_games([([E4], WHITE_WIN)] * 40000 + [([D4], WHITE_WIN)] * 20000)
+
+        # Act
+        builder.write(path)
+
+        # Assert
+        with OpeningBook(path) as book:
+            assert book.lookup(Board.at_starting_position()) == [(E4, 0xFFFF), (D4, 0xFFFF // 2)]
+
+    @staticmethod
+    def test_progress_is_reported():
+        # Arrange
+        reports = []
+        builder = BookBuilder(progress=reports.append, progress_interval=2)
+
+        # Act
+        builder.add_games(GAMES)
+
+        # Assert
+        assert [stats.games for stats in reports] == [2, 4]
+        assert reports[-1].positions == 10
+
+    @staticmethod
+    def test_main_builds_a_book_from_pgn_files(tmp_path):
+        # Arrange
+        pgn_path = tmp_path / 'games.pgn'
+        pgn_path.write_text('1. e4 e5 2. Nf3 1-0\n\n1. e4 c5 2. Nf3 0-1\n\n1. e4 e5 2. Nf3 Nf6 3. d4 O-O 1/2-1/2\n')
+        book_path = str(tmp_path / 'book.bin')
+
+        # Act
+        main([str(pgn_path), '--output', book_path, '--quiet'])
+
+        # Assert
+        with OpeningBook(book_path) as book:
+            assert book.lookup(Board.at_starting_position()) == [(E4, 3)]
+            assert book.lookup(after(E4)) == [(C5, 2), (E5, 1)]
@@ -0,0 +1,77 @@
+import random
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.evaluation import evaluate, compute_scores, TOTAL_PHASE
+from chessington.engine.moves import move_between, PROMOTION
+from chessington.engine.pieces import Pawn, Knight, King
+
+
+class TestEvaluation:
+
+    @staticmethod
+    def test_starting_position_is_level():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        score = evaluate(board)
+
+        # Assert
+        assert score == 0
+        assert board.phase == TOTAL_PHASE
+
+    @staticmethod
+    def test_extra_knight_is_worth_about_three_pawns():
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        board.set_piece(Square.at(7, 4), King(Player.BLACK))
+        board.set_piece(Square.at(3, 3), Knight(Player.WHITE))
+
+        # Act
+        white_score = evaluate(board)
+        board.current_player = Player.BLACK
+        black_score = evaluate(board)
+
+        # Assert
+        assert 250 < white_score < 400
+        assert black_score == -white_score
+
+    @staticmethod
+    def test_promotion_to_queen_is_scored_and_unmade():
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        board.set_piece(Square.at(7, 0), King(Player.BLACK))
+        board.set_piece(Square.at(6, 7), Pawn(Player.WHITE))
+        before = evaluate(board)
+
+        # Act
+        board.make_move(move_between(Square.at(6, 7), Square.at(7, 7), PROMOTION))
+        promoted = -evaluate(board)
+        board.unmake_move()
+
+        # Assert
+        assert promoted > before + 700
+        assert evaluate(board) == before
+        assert (board.middlegame_score, board.endgame_score, board.phase) == compute_scores(board)
+
+    @staticmethod
+    def test_running_totals_match_totals_computed_from_scratch():
+        rng = random.Random(0)
+        board = Board.at_starting_position()
+
+        for _ in range(150):
+            # Act
+            moves = board.generate_legal_moves(board.current_player)
+            if not moves:
+                break
+            board.make_move(rng.choice(moves))
+
+            # Assert
+            assert (board.middlegame_score, board.endgame_score, board.phase) == compute_scores(board)
+
+        while board.can_unmake_move():
+            board.unmake_move()
+        assert (board.middlegame_score, board.endgame_score, board.phase) == (0, 0, TOTAL_PHASE)
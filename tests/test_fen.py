@@ -0,0 +1,34 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.fen import load_fens, read_fens
+from chessington.engine.perft import STANDARD_POSITIONS
+
+
+class TestFen:
+
+    @staticmethod
+    def test_load_fens_reads_every_position(tmp_path):
+        # Arrange
+        path = tmp_path / 'positions.fen'
+        path.write_text('# Perft positions\n\n' + '\n'.join(position.fen for position in STANDARD_POSITIONS) + '\n')
+
+        # Act
+        boards = load_fens(str(path))
+
+        # Assert
+        assert [board.to_fen().split()[:2] for board in boards] == \
+            [position.fen.split()[:2] for position in STANDARD_POSITIONS]
+        assert boards[0] == Board.at_starting_position()
+
+    @staticmethod
+    def test_read_fens_reports_the_bad_line():
+        # Arrange
+        lines = [STANDARD_POSITIONS[0].fen, 'not a fen']
+
+        # Act
+        with pytest.raises(ValueError) as error:
+            list(read_fens(lines))
+
+        # Assert
+        assert 'Line 2' in str(error.value)
@@ -0,0 +1,129 @@
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.moves import CAPTURE, QUIET, move_between
+from chessington.engine.ordering import MoveOrderer
+from chessington.engine.perft import STANDARD_POSITIONS
+from chessington.engine.pieces import Pawn, Knight, Rook, Queen, King
+from chessington.engine.search import Searcher, MAX_PLY
+
+
+def capture_board():
+    board = Board.empty()
+    board.set_piece(Square.at(0, 6), King(Player.WHITE))
+    board.set_piece(Square.at(3, 3), Pawn(Player.WHITE))
+    board.set_piece(Square.at(2, 2), Queen(Player.WHITE))
+    board.set_piece(Square.at(7, 4), King(Player.BLACK))
+    board.set_piece(Square.at(4, 4), Rook(Player.BLACK))
+    board.set_piece(Square.at(4, 2), Knight(Player.BLACK))
+    return board
+
+
+class TestMoveOrderer:
+
+    @staticmethod
+    def test_captures_are_ordered_by_victim_then_attacker():
+        # Arrange
+        board = capture_board()
+        orderer = MoveOrderer(MAX_PLY)
+        pawn_takes_rook = move_between(Square.at(3, 3), Square.at(4, 4), CAPTURE)
+        pawn_takes_knight = move_between(Square.at(3, 3), Square.at(4, 2), CAPTURE)
+        queen_takes_knight = move_between(Square.at(2, 2), Square.at(4, 2), CAPTURE)
+        quiet_move = move_between(Square.at(0, 6), Square.at(0, 5), QUIET)
+
+        # Act
+        ordered = orderer.order(board, [quiet_move, queen_takes_knight, pawn_takes_knight, pawn_takes_rook])
+
+        # Assert
+        assert ordered == [pawn_takes_rook, pawn_takes_knight, queen_takes_knight, quiet_move]
+
+    @staticmethod
+    def test_table_move_comes_first():
+        # Arrange
+        board = capture_board()
+        orderer = MoveOrderer(MAX_PLY)
+        moves = board.generate_legal_moves(Player.WHITE)
+        table_move = move_between(Square.at(0, 6), Square.at(0, 5), QUIET)
+
+        # Act
+        ordered = orderer.order(board, moves, table_move)
+
+        # Assert
+        assert ordered[0] == table_move
+        assert sorted(ordered) == sorted(moves)
+
+    @staticmethod
+    def test_killers_come_after_captures_and_before_other_quiet_moves():
+        # Arrange
+        board = capture_board()
+        orderer = MoveOrderer(MAX_PLY)
+        killer = move_between(Square.at(2, 2), Square.at(2, 7), QUIET)
+        orderer.record_cutoff(board, killer, 3, 2, 5)
+
+        # Act
+        at_same_ply = orderer.order(board, board.generate_legal_moves(Player.WHITE), ply=2)
+        at_other_ply = orderer.order(board, board.generate_legal_moves(Player.WHITE), ply=3)
+
+        # Assert
+        assert at_same_ply.index(killer) == 3
+        assert orderer.killers[2][0] == killer
+        assert orderer.score_move(board, killer, ply=3) == 9
+        assert at_other_ply.index(killer) == 3
+
+    @staticmethod
+    def test_history_is_kept_by_piece_and_destination():
+        # Arrange
+        board = capture_board()
+        orderer = MoveOrderer(MAX_PLY)
+        move = move_between(Square.at(0, 6), Square.at(1, 6), QUIET)
+
+        # Act
+        orderer.record_cutoff(board, move, 2, 0, 0)
+        orderer.record_cutoff(board, move, 3, 0, 0)
+
+        # Assert
+        assert orderer.history[Player.WHITE][(King, 14)] == 13
+        assert orderer.history[Player.BLACK] == {}
+
+    @staticmethod
+    def test_captures_do_not_become_killers():
+        # Arrange
+        board = capture_board()
+        orderer = MoveOrderer(MAX_PLY)
+        capture = move_between(Square.at(3, 3), Square.at(4, 4), CAPTURE)
+
+        # Act
+        orderer.record_cutoff(board, capture, 3, 0, 1)
+
+        # Assert
+        assert orderer.killers[0] == [None, None]
+        assert orderer.stats() == {'cutoffs': 1, 'first_move_cutoffs': 0, 'first_move_cutoff_rate': 0.0}
+
+    @staticmethod
+    def test_new_search_forgets_killers_and_ages_history():
+        # Arrange
+        board = capture_board()
+        orderer = MoveOrderer(MAX_PLY)
+        move = move_between(Square.at(0, 6), Square.at(1, 6), QUIET)
+        orderer.record_cutoff(board, move, 4, 1, 0)
+
+        # Act
+        orderer.new_search()
+
+        # Assert
+        assert orderer.killers[1] == [None, None]
+        assert orderer.history[Player.WHITE][(King, 14)] == 8
+        assert orderer.stats()['cutoffs'] == 0
+
+    @staticmethod
+    def test_search_mostly_cuts_off_on_the_first_move():
+        # Arrange
+        board = Board.from_fen(STANDARD_POSITIONS[0].fen)
+        searcher = Searcher()
+
+        # Act
+        searcher.search(board, max_depth=3)
+
+        # Assert
+        stats = searcher.orderer.stats()
+        assert stats['cutoffs'] > 0
+        assert stats['first_move_cutoff_rate'] > 0.7
@@ -0,0 +1,103 @@
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.moves import move_squares
+from chessington.engine.parallel import ParallelSearcher, parallel_search
+from chessington.engine.pieces import Pawn, Rook, Queen, King
+from chessington.engine.search import MATE_SCORE
+
+
+def back_rank_board():
+    board = Board.empty()
+    board.set_piece(Square.at(7, 6), King(Player.BLACK))
+    for col in [5, 6, 7]:
+        board.set_piece(Square.at(6, col), Pawn(Player.BLACK))
+    board.set_piece(Square.at(0, 0), Rook(Player.WHITE))
+    board.set_piece(Square.at(0, 6), King(Player.WHITE))
+    return board
+
+
+class TestParallelSearch:
+
+    @staticmethod
+    def test_parallel_search_finds_mate_in_one():
+        # Arrange
+        board = back_rank_board()
+
+        # Act
+        result = parallel_search(board, max_depth=3, workers=2)
+
+        # Assert
+        assert move_squares(result.best_move) == (Square.at(0, 0), Square.at(7, 0))
+        assert result.score == MATE_SCORE - 1
+        assert result.principal_variation[0] == result.best_move
+
+    @staticmethod
+    def test_parallel_search_captures_undefended_queen():
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        board.set_piece(Square.at(3, 3), Rook(Player.WHITE))
+        board.set_piece(Square.at(7, 4), King(Player.BLACK))
+        board.set_piece(Square.at(3, 6), Queen(Player.BLACK))
+
+        # Act
+        result = parallel_search(board, max_depth=2, workers=2)
+
+        # Assert
+        assert move_squares(result.best_move) == (Square.at(3, 3), Square.at(3, 6))
+        assert result.score > 0
+        assert result.depth == 2
+
+    @staticmethod
+    def test_parallel_search_is_deterministic():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        with ParallelSearcher(workers=3) as searcher:
+            first = searcher.search(board, max_depth=3)
+            second = searcher.search(board, max_depth=3)
+
+        # Assert
+        assert first.best_move == second.best_move
+        assert first.score == second.score
+        assert first.principal_variation == second.principal_variation
+        assert first.nodes == second.nodes
+
+    @staticmethod
+    def test_parallel_search_with_no_moves_reports_mate():
+        # Arrange
+        board = back_rank_board()
+        board.move_piece(Square.at(0, 0), Square.at(7, 0))
+
+        # Act
+        result = parallel_search(board, max_depth=2, workers=1)
+
+        # Assert
+        assert result.best_move is None
+        assert result.score == -MATE_SCORE
+
+    @staticmethod
+    def test_parallel_search_stopped_during_first_depth_reports_depth_zero():
+        # Arrange
+        board = Board.from_fen('k7/8/8/3q4/8/8/8/K2R4 w - - 0 1')
+
+        # Act
+        result = parallel_search(board, max_depth=3, workers=2, node_limit=1)
+
+        # Assert
+        assert result.depth == 0
+        assert move_squares(result.best_move) == (Square.at(0, 3), Square.at(4, 3))
+
+    @staticmethod
+    def test_parallel_search_time_limit_is_for_the_whole_search():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        with ParallelSearcher(workers=2) as searcher:
+            result = searcher.search(board, max_depth=20, time_limit=0.5)
+
+        # Assert
+        assert result.depth < 20
+        assert result.seconds < 2
@@ -0,0 +1,49 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.perft import STANDARD_POSITIONS, perft, divide
+
+SHALLOW_CASES = [(position, depth) for position in STANDARD_POSITIONS
+                 for depth in range(1, len(position.node_counts) + 1)
+                 if position.node_counts[depth - 1] <= 10000]
+
+
+class TestPerft:
+
+    @staticmethod
+    @pytest.mark.parametrize('position, depth', SHALLOW_CASES,
+                             ids=['{}-{}'.format(position.name, depth) for position, depth in SHALLOW_CASES])
+    def test_perft_matches_published_node_counts(position, depth):
+        # Arrange
+        board = Board.from_fen(position.fen)
+
+        # Act
+        nodes = perft(board, depth)
+
+        # Assert
+        assert nodes == position.node_counts[depth - 1]
+
+    @staticmethod
+    def test_divide_sums_to_perft():
+        # Arrange
+        board = Board.from_fen(STANDARD_POSITIONS[1].fen)
+
+        # Act
+        counts = divide(board, 2)
+
+        # Assert
+        assert len(counts) == 14
+        assert sum(counts.values()) == perft(board, 2)
+
+    @staticmethod
+    def test_perft_leaves_board_unchanged():
+        # Arrange
+        board = Board.from_fen(STANDARD_POSITIONS[0].fen)
+        key = board.zobrist_key
+
+        # Act
+        perft(board, 3)
+
+        # Assert
+        assert board.zobrist_key == key
+        assert not board.can_unmake_move()
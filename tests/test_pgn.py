@@ -0,0 +1,209 @@
+import gzip
+import random
+
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.moves import CAPTURE, DOUBLE_PAWN_PUSH, EN_PASSANT, PROMOTION, QUIET
+from chessington.engine.pgn import move_to_san, parse_san, read_games, read_pgn
+
+GAMES = """[Event "First"]
+[White "A \\"quoted\\" name"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 {a comment
+over two lines} Nc6 (2... d6 3. d4 (3. Bc4)) 3. Bb5 $1 a6 ; to the end of the line
+4. Bxc6 dxc6 1-0
+
+[Event "Second"]
+[Result "*"]
+
+1.d4 d5 2.c4 *
+"""
+
+
+class TestPgn:
+
+    @staticmethod
+    def test_read_games_skips_comments_and_variations():
+        # Act
+        games = list(read_games(GAMES.splitlines()))
+
+        # Assert
+        assert [game.headers['Event'] for game in games] == ['First', 'Second']
+        assert games[0].headers['White'] == 'A "quoted" name'
+        assert games[0].san == ['e4', 'e5', 'Nf3', 'Nc6', 'Bb5', 'a6', 'Bxc6', 'dxc6']
+        assert games[0].moves[:3] == [(12, 28, DOUBLE_PAWN_PUSH), (52, 36, DOUBLE_PAWN_PUSH), (6, 21, QUIET)]
+        assert games[0].moves[6] == (33, 42, CAPTURE)
+        assert [game.result for game in games] == ['1-0', '*']
+
+    @staticmethod
+    def test_read_games_can_skip_resolving_moves():
+        # Act
+        games = list(read_games(GAMES.splitlines(), validate=False))
+
+        # Assert
+        assert [game.moves for game in games] == [None, None]
+        assert games[1].san == ['d4', 'd5', 'c4']
+
+    @staticmethod
+    def test_read_pgn_reads_gzipped_files(tmp_path):
+        # Arrange
+        path = tmp_path / 'games.pgn.gz'
+        with gzip.open(str(path), 'wt') as file:
+            file.write(GAMES)
+
+        # Act
+        games = list(read_pgn(str(path)))
+
+        # Assert
+        assert len(games) == 2
+        assert games[1].moves == [(11, 27, DOUBLE_PAWN_PUSH), (51, 35, DOUBLE_PAWN_PUSH), (10, 26, DOUBLE_PAWN_PUSH)]
+
+    @staticmethod
+    def test_castling_is_reported_with_the_line_the_game_starts_on():
+        # Arrange
+        lines = GAMES.splitlines() + ['', '[Event "Third"]', '', '1. Nf3 Nf6 2. g3 g6 3. Bg2 Bg7 4. O-O O-O *']
+
+        # Act
+        with pytest.raises(ValueError) as error:
+            list(read_games(lines))
+
+        # Assert
+        assert 'line 14' in str(error.value)
+        assert 'Castling' in str(error.value)
+
+    @staticmethod
+    def test_games_which_fail_are_cut_short_when_not_strict():
+        # Arrange
+        lines = ['1. Nf3 Nf6 2. g3 g6 3. Bg2 Bg7 4. O-O O-O 0-1']
+
+        # Act
+        game = next(read_games(lines, strict=False))
+
+        # Assert
+        assert len(game.moves) == 6
+        assert game.error.startswith('Move 7')
+        assert game.result == '0-1'
+
+    @staticmethod
+    def test_max_plies_limits_the_moves_resolved():
+        # Act
+        game = next(read_games(GAMES.splitlines(), max_plies=3))
+
+        # Assert
+        assert len(game.moves) == 3
+        assert len(game.san) == 8
+
+    @staticmethod
+    def test_parse_san_finds_special_moves():
+        # Arrange
+        board = Board.from_fen('4k3/P7/8/3pP3/8/8/8/R3K2R w - d6 0 1')
+
+        # Act
+        en_passant = parse_san(board, 'exd6')
+        promotion = parse_san(board, 'a8=Q+')
+        rook_move = parse_san(board, 'Rhf1')
+
+        # Assert
+        assert en_passant == (36, 43, EN_PASSANT)
+        assert promotion == (48, 56, PROMOTION)
+        assert rook_move == (7, 5, QUIET)
+
+    @staticmethod
+    def test_parse_san_rejects_ambiguous_and_illegal_moves():
+        # Arrange
+        board = Board.from_fen('3rk3/8/8/8/8/8/4K3/R6R w - - 0 1')
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            parse_san(board, 'Rd1')
+        with pytest.raises(ValueError):
+            parse_san(board, 'Kd3')
+        with pytest.raises(ValueError):
+            parse_san(board, 'e8=N')
+
+    @staticmethod
+    def test_parse_san_rejects_captures_not_marked_with_x():
+        # Arrange
+        board = Board.from_fen('4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1')
+        en_passant_board = Board.from_fen('4k3/8/8/3Pp3/8/8/8/4K3 w - e6 0 1')
+
+        # Act / Assert
+        with pytest.raises(ValueError, match='not marked'):
+            parse_san(board, 'd5')
+        with pytest.raises(ValueError, match='not marked'):
+            parse_san(en_passant_board, 'e6')
+        with pytest.raises(ValueError, match='not marked'):
+            parse_san(Board.from_fen('4k3/8/8/r7/8/8/8/R3K3 w - - 0 1'), 'Ra5')
+
+    @staticmethod
+    def test_parse_san_rejects_x_on_moves_which_are_not_captures():
+        # Arrange
+        board = Board.from_fen('4k3/8/8/8/3p4/8/4P3/R3K3 w - - 0 1')
+
+        # Act / Assert
+        with pytest.raises(ValueError, match='Not a capture'):
+            parse_san(board, 'Rxa5')
+        with pytest.raises(ValueError, match='Not a capture'):
+            parse_san(board, 'exe3')
+
+    @staticmethod
+    def test_parse_san_rejects_pawn_moves_giving_the_wrong_origin():
+        # Arrange
+        board = Board.from_fen('4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1')
+
+        # Act / Assert
+        for san in ['xd5', 'ed5', 'e4xd5', 'e4e5', 'de5']:
+            with pytest.raises(ValueError, match='Invalid SAN'):
+                parse_san(board, san)
+
+    @staticmethod
+    def test_parse_san_rejects_promotions_given_wrongly():
+        # Arrange
+        board = Board.from_fen('4k3/P7/8/8/8/8/4P3/4K3 w - - 0 1')
+
+        # Act / Assert
+        with pytest.raises(ValueError, match='Promotion piece not given'):
+            parse_san(board, 'a8')
+        with pytest.raises(ValueError, match='Not a promotion'):
+            parse_san(board, 'e4=Q')
+
+    @staticmethod
+    def test_san_written_for_random_games_reads_back_as_the_same_moves():
+        # Arrange
+        rng = random.Random(0)
+        lines = []
+        expected_moves = []
+        for _ in range(10):
+            board = Board.at_starting_position()
+            moves = []
+            san_moves = []
+            for _ in range(60):
+                legal_moves = board.generate_legal_moves(board.current_player)
+                if not legal_moves:
+                    break
+                move = rng.choice(legal_moves)
+                san_moves.append(move_to_san(board, move))
+                moves.append(move)
+                board.make_move(move)
+            lines += ['[Event "Random"]', '', ' '.join(san_moves) + ' *', '']
+            expected_moves.append(moves)
+
+        # Act
+        games = list(read_games(lines))
+
+        # Assert
+        assert [game.moves for game in games] == expected_moves
+
+    @staticmethod
+    def test_replay_yields_each_position_before_its_move():
+        # Arrange
+        game = next(read_games(GAMES.splitlines()))
+
+        # Act
+        keys = [board.zobrist_key for board, _ in game.replay()]
+
+        # Assert
+        assert keys[0] == Board.at_starting_position().zobrist_key
+        assert len(keys) == len(game.moves)
@@ -1,3 +1,7 @@
+import pickle
+
+import pytest
+
 from chessington.engine.board import Board
 from chessington.engine.data import Player, Square
 from chessington.engine.pieces import Pawn, Rook, Bishop, Queen, King, Knight
@@ -1014,3 +1018,90 @@ class TestKnights:
         assert Square.at(4, 9) not in moves
         assert Square.at(5, 8) not in moves
         assert Square.at(1, 8) not in moves
+
+
+class TestSharedPieces:
+
+    @staticmethod
+    def test_shared_pieces_are_one_instance_per_type_and_player():
+        # Act
+        white_pawn = Pawn.shared(Player.WHITE)
+
+        # Assert
+        assert Pawn.shared(Player.WHITE) is white_pawn
+        assert Pawn.shared(Player.BLACK) is not white_pawn
+        assert white_pawn.is_shared()
+        assert not Pawn(Player.WHITE).is_shared()
+        assert white_pawn.player == Player.WHITE
+
+    @staticmethod
+    def test_pieces_are_immutable_and_slotted():
+        # Arrange
+        queen = Queen.shared(Player.BLACK)
+
+        # Act / Assert
+        with pytest.raises(AttributeError):
+            queen.player = Player.WHITE
+        assert not hasattr(queen, '__dict__')
+        assert queen.player == Player.BLACK
+
+    @staticmethod
+    def test_pickled_pieces_come_back_shared_only_if_they_were_shared():
+        # Act
+        knight = pickle.loads(pickle.dumps(Knight(Player.BLACK)))
+        shared_knight = pickle.loads(pickle.dumps(Knight.shared(Player.BLACK)))
+
+        # Assert
+        assert type(knight) is Knight
+        assert knight.player == Player.BLACK
+        assert not knight.is_shared()
+        assert shared_knight is Knight.shared(Player.BLACK)
+
+    @staticmethod
+    def test_boards_hold_their_own_pieces_by_default():
+        # Arrange
+        board = Board.at_starting_position()
+        knight = board.get_piece(Square.at(0, 1))
+
+        # Act
+        moves = knight.get_available_moves(board)
+        knight.move_to(board, Square.at(2, 2))
+
+        # Assert
+        assert sorted(moves) == [Square.at(2, 0), Square.at(2, 2)]
+        assert not knight.is_shared()
+        assert board.find_piece(knight) == Square.at(2, 2)
+        assert len(set(map(id, board.get_pieces(Player.WHITE, Pawn)))) == 8
+
+    @staticmethod
+    def test_boards_can_share_pieces():
+        # Arrange
+        board = Board.at_starting_position(shared_pieces=True)
+        pawn = board.get_piece(Square.at(1, 4))
+
+        # Act
+        moves = pawn.get_available_moves(board, Square.at(1, 4))
+
+        # Assert
+        assert pawn is Pawn.shared(Player.WHITE)
+        assert board.get_piece(Square.at(1, 0)) is pawn
+        assert sorted(moves) == [Square.at(2, 4), Square.at(3, 4)]
+        assert board.find_piece(King.shared(Player.WHITE)) == Square.at(0, 4)
+        with pytest.raises(Exception):
+            pawn.get_available_moves(board)
+
+    @staticmethod
+    def test_promotions_keep_to_the_board_pieces():
+        # Arrange
+        fen = '4k3/P7/8/8/8/8/8/4K3 w - - 0 1'
+        board = Board.from_fen(fen)
+        shared_board = Board.from_fen(fen, shared_pieces=True)
+
+        # Act
+        board.move_piece(Square.at(6, 0), Square.at(7, 0))
+        shared_board.move_piece(Square.at(6, 0), Square.at(7, 0))
+
+        # Assert
+        assert isinstance(board.get_piece(Square.at(7, 0)), Queen)
+        assert not board.get_piece(Square.at(7, 0)).is_shared()
+        assert shared_board.get_piece(Square.at(7, 0)) is Queen.shared(Player.WHITE)
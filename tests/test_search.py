@@ -0,0 +1,112 @@
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.moves import move_squares
+from chessington.engine.pieces import Pawn, Rook, Queen, King
+from chessington.engine.search import Searcher, MATE_SCORE, search
+
+
+def back_rank_board():
+    board = Board.empty()
+    board.set_piece(Square.at(7, 6), King(Player.BLACK))
+    for col in [5, 6, 7]:
+        board.set_piece(Square.at(6, col), Pawn(Player.BLACK))
+    board.set_piece(Square.at(0, 0), Rook(Player.WHITE))
+    board.set_piece(Square.at(0, 6), King(Player.WHITE))
+    return board
+
+
+class TestSearch:
+
+    @staticmethod
+    def test_search_finds_mate_in_one():
+        # Arrange
+        board = back_rank_board()
+
+        # Act
+        result = search(board, max_depth=3)
+
+        # Assert
+        assert move_squares(result.best_move) == (Square.at(0, 0), Square.at(7, 0))
+        assert result.score == MATE_SCORE - 1
+        assert result.principal_variation[0] == result.best_move
+
+    @staticmethod
+    def test_search_captures_undefended_queen():
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        board.set_piece(Square.at(3, 3), Rook(Player.WHITE))
+        board.set_piece(Square.at(7, 4), King(Player.BLACK))
+        board.set_piece(Square.at(3, 6), Queen(Player.BLACK))
+
+        # Act
+        result = search(board, max_depth=2)
+
+        # Assert
+        assert move_squares(result.best_move) == (Square.at(3, 3), Square.at(3, 6))
+        assert result.score > 0
+
+    @staticmethod
+    def test_search_leaves_board_unchanged():
+        # Arrange
+        board = Board.at_starting_position()
+        key = board.zobrist_key
+
+        # Act
+        search(board, max_depth=3)
+
+        # Assert
+        assert board.zobrist_key == key
+        assert not board.can_unmake_move()
+
+    @staticmethod
+    def test_node_limit_stops_search_early():
+        # Arrange
+        board = Board.at_starting_position()
+        searcher = Searcher()
+
+        # Act
+        result = searcher.search(board, max_depth=20, node_limit=2000)
+
+        # Assert
+        assert result.nodes <= 2001
+        assert result.depth < 20
+        assert result.best_move in board.generate_legal_moves(Player.WHITE)
+
+    @staticmethod
+    def test_time_limit_stops_search_early():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        result = search(board, max_depth=20, time_limit=0.2)
+
+        # Assert
+        assert result.seconds < 2
+        assert result.best_move is not None
+
+    @staticmethod
+    def test_checkmated_position_has_no_best_move():
+        # Arrange
+        board = back_rank_board()
+        board.move_piece(Square.at(0, 0), Square.at(7, 0))
+
+        # Act
+        result = search(board, max_depth=2)
+
+        # Assert
+        assert result.best_move is None
+        assert result.score == -MATE_SCORE
+
+    @staticmethod
+    def test_principal_variation_is_playable():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        result = search(board, max_depth=3)
+
+        # Assert
+        for move in result.principal_variation:
+            assert move in board.generate_legal_moves(board.current_player)
+            board.make_move(move)
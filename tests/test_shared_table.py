@@ -0,0 +1,150 @@
+import pickle
+
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.moves import CAPTURE, move_between, move_squares
+from chessington.engine.parallel import parallel_search
+from chessington.engine.pieces import Pawn, Rook, King
+from chessington.engine.search import Searcher, MATE_SCORE
+from chessington.engine.shared_table import SharedTranspositionTable
+from chessington.engine.transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TWO_TIER
+
+
+class TestSharedTranspositionTable:
+
+    @staticmethod
+    def test_stored_entry_can_be_probed():
+        # Arrange
+        move = (12, 28, CAPTURE)
+        with SharedTranspositionTable(memory_bytes=1024) as table:
+
+            # Act
+            table.store(0x1234, 5, -37, EXACT, move)
+            entry = table.probe(0x1234)
+
+            # Assert
+            assert entry.depth == 5
+            assert entry.score == -37
+            assert entry.bound == EXACT
+            assert entry.move == move
+            assert table.size == 64
+
+    @staticmethod
+    def test_extreme_values_survive_packing():
+        # Arrange
+        with SharedTranspositionTable(memory_bytes=1024) as table:
+
+            # Act
+            table.store(0xFFFFFFFFFFFFFFFF, -3, -MATE_SCORE, UPPER_BOUND)
+            entry = table.probe(0xFFFFFFFFFFFFFFFF)
+
+            # Assert
+            assert entry == (-3, -MATE_SCORE, UPPER_BOUND, None)
+
+    @staticmethod
+    def test_entry_with_mismatched_words_is_ignored():
+        # Arrange
+        with SharedTranspositionTable(memory_bytes=1024) as table:
+            table.store(0x1234, 5, 10, EXACT)
+            slot = 0x1234 & table._mask
+
+            # Act
+            # As if another process had written only the first word of its entry
+            table._words[2 * slot] ^= 1 << 40
+            entry = table.probe(0x1234)
+
+            # Assert
+            assert entry is None
+            assert table.stats()['collisions'] == 1
+
+    @staticmethod
+    def test_tables_attached_by_name_or_pickling_share_entries():
+        # Arrange
+        with SharedTranspositionTable(memory_bytes=1024, replacement=TWO_TIER) as table:
+            attached = SharedTranspositionTable(replacement=TWO_TIER, name=table.name)
+            unpickled = pickle.loads(pickle.dumps(table))
+
+            # Act
+            table.store(0x1234, 5, 10, LOWER_BOUND)
+            attached_entry = attached.probe(0x1234)
+            unpickled_entry = unpickled.probe(0x1234)
+            attached.close()
+            unpickled.close()
+
+            # Assert
+            assert attached_entry == (5, 10, LOWER_BOUND, None)
+            assert unpickled_entry == (5, 10, LOWER_BOUND, None)
+
+    @staticmethod
+    def test_search_age_is_shared_between_attached_tables():
+        # Arrange
+        with SharedTranspositionTable(memory_bytes=1024) as table:
+            attached = pickle.loads(pickle.dumps(table))
+            table.new_search()
+            table.store(0x1234, 10, 10, EXACT)
+
+            # Act
+            # A shallower result for a position in the same slot, from another process in the same search
+            attached.store(0x1234 + table.size, 1, 20, EXACT)
+            entry = attached.probe(0x1234)
+            attached.close()
+
+            # Assert
+            assert entry == (10, 10, EXACT, None)
+
+    @staticmethod
+    def test_file_backed_table_can_be_resumed(tmp_path):
+        # Arrange
+        path = str(tmp_path / 'table.bin')
+        with SharedTranspositionTable(memory_bytes=1000, path=path) as table:
+            table.store(0x1234, 5, 10, EXACT)
+
+        # Act
+        with SharedTranspositionTable(path=path) as resumed:
+            entry = resumed.probe(0x1234)
+            size = resumed.size
+
+        # Assert
+        assert entry == (5, 10, EXACT, None)
+        assert size == 32
+
+    @staticmethod
+    def test_clear_empties_the_table():
+        # Arrange
+        with SharedTranspositionTable(memory_bytes=1024) as table:
+            table.store(0x1234, 5, 10, EXACT)
+
+            # Act
+            table.clear()
+
+            # Assert
+            assert table.probe(0x1234) is None
+
+    @staticmethod
+    def test_table_is_too_small():
+        with pytest.raises(ValueError):
+            SharedTranspositionTable(memory_bytes=16)
+
+    @staticmethod
+    def test_search_with_shared_table_finds_mate():
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(7, 6), King(Player.BLACK))
+        for col in [5, 6, 7]:
+            board.set_piece(Square.at(6, col), Pawn(Player.BLACK))
+        board.set_piece(Square.at(0, 0), Rook(Player.WHITE))
+        board.set_piece(Square.at(0, 6), King(Player.WHITE))
+
+        with SharedTranspositionTable(memory_bytes=1 << 16) as table:
+            # Act
+            serial = Searcher(table=table).search(board, max_depth=3)
+            parallel = parallel_search(board, max_depth=3, workers=2, table=table)
+
+            # Assert
+            assert move_squares(serial.best_move) == (Square.at(0, 0), Square.at(7, 0))
+            assert parallel.best_move == serial.best_move
+            assert parallel.score == MATE_SCORE - 1
+            board.make_move(move_between(Square.at(0, 0), Square.at(1, 0)))
+            assert table.probe(board.zobrist_key) is not None
@@ -0,0 +1,166 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.pieces import Pawn, Rook, Queen, King
+from chessington.engine.search import Searcher, MATE_SCORE
+
+tablebase = pytest.importorskip('chessington.engine.tablebase')
+
+
+@pytest.fixture(scope='module')
+def tables(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('tablebases'))
+    assert tablebase.main(['KQK', 'KPK', '--output', directory]) == 0
+    return tablebase.Tablebase(directory)
+
+
+def board_with(pieces, player=Player.WHITE):
+    board = Board.empty()
+    for (row, col), piece in pieces.items():
+        board.set_piece(Square.at(row, col), piece)
+    board.current_player = player
+    return board
+
+
+class TestTablebase:
+
+    @staticmethod
+    def test_every_queen_ending_with_the_queen_to_move_is_won(tables):
+        # Arrange
+        table = tables._table('KQK')
+
+        # Act
+        to_move = table[0][table[0] != tablebase.ILLEGAL_VALUE]
+
+        # Assert
+        assert (to_move != tablebase.DRAW_VALUE).all()
+        assert to_move.max() - 1 == 19
+
+    @staticmethod
+    def test_probe_finds_mate_in_one(tables):
+        # Arrange
+        board = board_with({(7, 0): King(Player.BLACK), (5, 1): King(Player.WHITE), (0, 2): Queen(Player.WHITE)})
+
+        # Act
+        result = tables.probe(board)
+
+        # Assert
+        assert result == (tablebase.WIN, 1)
+
+    @staticmethod
+    def test_probe_flips_the_board_when_black_is_strong(tables):
+        # Arrange
+        board = board_with({(0, 0): King(Player.WHITE), (2, 1): King(Player.BLACK), (7, 2): Queen(Player.BLACK)},
+                           Player.BLACK)
+
+        # Act
+        to_move = tables.probe(board)
+        board.current_player = Player.WHITE
+        lone_king_to_move = tables.probe(board)
+
+        # Assert
+        assert to_move == (tablebase.WIN, 1)
+        assert lone_king_to_move.wdl == tablebase.LOSS
+
+    @staticmethod
+    def test_probe_of_mated_position_is_a_loss_in_no_plies(tables):
+        # Arrange
+        board = board_with({(7, 0): King(Player.BLACK), (5, 1): King(Player.WHITE), (7, 2): Queen(Player.WHITE)},
+                           Player.BLACK)
+
+        # Act
+        result = tables.probe(board)
+
+        # Assert
+        assert result == (tablebase.LOSS, 0)
+
+    @staticmethod
+    def test_lone_king_capturing_the_queen_draws(tables):
+        # Arrange
+        board = board_with({(7, 0): King(Player.BLACK), (3, 3): King(Player.WHITE), (6, 1): Queen(Player.WHITE)},
+                           Player.BLACK)
+
+        # Act
+        result = tables.probe(board)
+
+        # Assert
+        assert result == (tablebase.DRAW, None)
+
+    @staticmethod
+    def test_rook_pawn_against_king_in_the_corner_is_drawn(tables):
+        # Arrange
+        board = board_with({(7, 0): King(Player.BLACK), (0, 1): King(Player.WHITE), (3, 0): Pawn(Player.WHITE)})
+
+        # Act
+        result = tables.probe(board)
+
+        # Assert
+        assert result == (tablebase.DRAW, None)
+
+    @staticmethod
+    def test_king_ahead_of_pawn_on_sixth_rank_wins(tables):
+        # Arrange
+        board = board_with({(7, 4): King(Player.BLACK), (5, 4): King(Player.WHITE), (4, 4): Pawn(Player.WHITE)},
+                           Player.BLACK)
+
+        # Act
+        result = tables.probe(board)
+
+        # Assert
+        assert result.wdl == tablebase.LOSS
+
+    @staticmethod
+    def test_probe_ignores_endings_it_does_not_have(tables):
+        # Arrange
+        rook_ending = board_with({(7, 0): King(Player.BLACK), (5, 1): King(Player.WHITE), (0, 2): Rook(Player.WHITE)})
+
+        # Act
+        starting_result = tables.probe(Board.at_starting_position())
+        rook_result = tables.probe(rook_ending)
+
+        # Assert
+        assert starting_result is None
+        assert rook_result is None
+
+    @staticmethod
+    def test_probe_ignores_positions_without_both_kings(tables):
+        # Arrange
+        no_strong_king = Board.from_fen('k7/8/8/8/8/8/8/2Q5 w - - 0 1')
+        no_weak_king = board_with({(7, 0): Queen(Player.BLACK), (5, 1): King(Player.WHITE), (0, 2): Queen(Player.WHITE)})
+
+        # Act
+        no_strong_king_result = tables.probe(no_strong_king)
+        no_weak_king_result = tables.probe(no_weak_king)
+        searched = Searcher(tablebase=tables).search(no_strong_king, max_depth=2)
+
+        # Assert
+        assert no_strong_king_result is None
+        assert no_weak_king_result is None
+        assert searched.depth == 2
+
+    @staticmethod
+    def test_tablebase_agrees_with_search(tables):
+        # Arrange
+        board = board_with({(7, 7): King(Player.BLACK), (5, 4): King(Player.WHITE), (4, 0): Queen(Player.WHITE)})
+
+        # Act
+        result = tables.probe(board)
+        searched = Searcher().search(board, max_depth=result.plies + 1)
+
+        # Assert
+        assert result.wdl == tablebase.WIN
+        assert searched.score == MATE_SCORE - result.plies
+
+    @staticmethod
+    def test_search_scores_tablebase_positions_without_searching_them(tables):
+        # Arrange
+        board = board_with({(7, 7): King(Player.BLACK), (3, 4): King(Player.WHITE), (4, 0): Queen(Player.WHITE)})
+        plies = tables.probe(board).plies
+
+        # Act
+        with_tables = Searcher(tablebase=tables).search(board, max_depth=2)
+
+        # Assert
+        assert with_tables.score == MATE_SCORE - plies
+        assert with_tables.depth == 2
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from chessington.engine.attacks import SQUARES
+from chessington.engine.board import Board, PIECE_CODES
+from chessington.engine.data import Player, Square
+from chessington.engine.moves import EN_PASSANT
+from chessington.engine.pieces import Pawn, Knight, King
+
+np = pytest.importorskip('numpy')
+tensors = pytest.importorskip('chessington.engine.tensors')
+
+
+def random_boards(count, seed=0):
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        board = Board.at_starting_position()
+        for _ in range(rng.randrange(60)):
+            moves = board.generate_legal_moves(board.current_player)
+            if not moves:
+                break
+            board.make_move(rng.choice(moves))
+        boards.append(board)
+    return boards
+
+
+class TestTensors:
+
+    @staticmethod
+    def test_planes_hold_each_piece_type_by_row_and_col():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        planes = tensors.boards_to_planes([board])
+
+        # Assert
+        assert planes.shape == (1, 12, 8, 8)
+        assert planes.dtype == np.int8
+        assert planes[0, PIECE_CODES[Player.WHITE][Pawn] - 1, 1].tolist() == [1] * 8
+        assert planes[0, PIECE_CODES[Player.BLACK][King] - 1, 7, 4] == 1
+        assert planes.sum() == 32
+
+    @staticmethod
+    def test_boards_survive_a_round_trip():
+        # Arrange
+        boards = random_boards(20)
+
+        # Act
+        codes, players, en_passant = tensors.encode_boards(boards)
+        planes = tensors.codes_to_planes(codes)
+        decoded = tensors.decode_boards(tensors.planes_to_codes(planes), players, en_passant)
+
+        # Assert
+        assert codes.shape == (20, 8, 8)
+        assert [board.to_bytes() for board in decoded] == [board.to_bytes() for board in boards]
+
+    @staticmethod
+    def test_attacked_squares_match_the_board():
+        # Arrange
+        boards = random_boards(20, seed=1)
+
+        # Act
+        attacked = tensors.attacked_squares(tensors.boards_to_planes(boards))
+
+        # Assert
+        for board, board_attacked in zip(boards, attacked):
+            for side, player in enumerate(Player):
+                expected = [[int(board.is_square_attacked(Square.at(row, col), player)) for col in range(8)]
+                            for row in range(8)]
+                assert board_attacked[side].tolist() == expected
+
+    @staticmethod
+    def test_mobility_matches_the_pseudo_legal_moves():
+        # Arrange
+        boards = random_boards(20, seed=2)
+
+        # Act
+        mobility = tensors.mobility_maps(tensors.boards_to_planes(boards))
+
+        # Assert
+        for board, board_mobility in zip(boards, mobility):
+            expected = np.zeros((12, 8, 8), dtype=np.int8)
+            for player in Player:
+                for from_index, to_index, flags in board.generate_moves(player):
+                    if not flags & EN_PASSANT:
+                        piece = board.get_piece(SQUARES[from_index])
+                        expected[PIECE_CODES[player][type(piece)] - 1, to_index // 8, to_index % 8] = 1
+            assert (board_mobility == expected).all()
+
+    @staticmethod
+    def test_mobility_at_the_starting_position():
+        # Act
+        mobility = tensors.mobility_maps(tensors.boards_to_planes([Board.at_starting_position()]))
+
+        # Assert
+        assert mobility[0, PIECE_CODES[Player.WHITE][Pawn] - 1].sum() == 16
+        assert mobility[0, PIECE_CODES[Player.BLACK][Knight] - 1].sum() == 4
+        assert mobility[0, PIECE_CODES[Player.WHITE][King] - 1].sum() == 0
@@ -0,0 +1,100 @@
+from array import array
+
+import pytest
+
+from chessington.engine.moves import CAPTURE
+from chessington.engine.transposition import TranspositionTable, EXACT, LOWER_BOUND, ALWAYS_REPLACE, \
+    DEPTH_PREFERRED, TWO_TIER, ENTRY_SIZE
+
+
+class TestTranspositionTable:
+
+    @staticmethod
+    def test_stored_entry_can_be_probed():
+        # Arrange
+        table = TranspositionTable(memory_bytes=1024)
+        move = (12, 28, CAPTURE)
+
+        # Act
+        table.store(0x1234, 5, -37, EXACT, move)
+        entry = table.probe(0x1234)
+
+        # Assert
+        assert entry.depth == 5
+        assert entry.score == -37
+        assert entry.bound == EXACT
+        assert entry.move == move
+        assert table.stats()['hits'] == 1
+
+    @staticmethod
+    def test_table_stays_within_memory_budget():
+        # Arrange
+        budget = 1000 * ENTRY_SIZE
+
+        # Act
+        table = TranspositionTable(memory_bytes=budget)
+
+        # Assert
+        allocated = sum(len(value) * value.itemsize for value in vars(table).values() if isinstance(value, array))
+        assert table.size == 512
+        assert table.memory_bytes <= budget
+        assert allocated == table.memory_bytes
+
+    @staticmethod
+    def test_probe_of_other_position_in_same_slot_is_a_collision():
+        # Arrange
+        table = TranspositionTable(memory_bytes=4 * ENTRY_SIZE, replacement=ALWAYS_REPLACE)
+        table.store(1, 3, 10, EXACT)
+
+        # Act
+        entry = table.probe(1 + table.size)
+
+        # Assert
+        assert entry is None
+        assert table.stats()['collisions'] == 1
+
+    @staticmethod
+    def test_depth_preferred_keeps_deeper_entry():
+        # Arrange
+        table = TranspositionTable(memory_bytes=4 * ENTRY_SIZE, replacement=DEPTH_PREFERRED)
+        table.store(1, 6, 10, EXACT)
+
+        # Act
+        table.store(1 + table.size, 2, 20, LOWER_BOUND)
+
+        # Assert
+        assert table.probe(1).depth == 6
+        assert table.probe(1 + table.size) is None
+
+    @staticmethod
+    def test_depth_preferred_replaces_entries_from_earlier_searches():
+        # Arrange
+        table = TranspositionTable(memory_bytes=4 * ENTRY_SIZE, replacement=DEPTH_PREFERRED)
+        table.store(1, 6, 10, EXACT)
+        table.new_search()
+
+        # Act
+        table.store(1 + table.size, 2, 20, LOWER_BOUND)
+
+        # Assert
+        assert table.probe(1) is None
+        assert table.probe(1 + table.size).score == 20
+
+    @staticmethod
+    def test_two_tier_keeps_both_entries():
+        # Arrange
+        table = TranspositionTable(memory_bytes=4 * ENTRY_SIZE, replacement=TWO_TIER)
+        buckets = table.size // 2
+        table.store(1, 6, 10, EXACT)
+
+        # Act
+        table.store(1 + buckets, 2, 20, LOWER_BOUND)
+
+        # Assert
+        assert table.probe(1).depth == 6
+        assert table.probe(1 + buckets).depth == 2
+
+    @staticmethod
+    def test_unknown_replacement_scheme_is_rejected():
+        with pytest.raises(ValueError):
+            TranspositionTable(replacement='random')
@@ -0,0 +1,72 @@
+import random
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.zobrist import compute_key
+
+
+class TestZobristKeys:
+
+    @staticmethod
+    def test_transposed_moves_reach_the_same_key():
+        # Arrange
+        board = Board.at_starting_position()
+        other_board = Board.at_starting_position()
+
+        # Act
+        for from_square, to_square in [((0, 1), (2, 2)), ((7, 6), (5, 5)), ((0, 6), (2, 5)), ((7, 1), (5, 2))]:
+            board.move_piece(Square.at(*from_square), Square.at(*to_square))
+        for from_square, to_square in [((0, 6), (2, 5)), ((7, 1), (5, 2)), ((0, 1), (2, 2)), ((7, 6), (5, 5))]:
+            other_board.move_piece(Square.at(*from_square), Square.at(*to_square))
+
+        # Assert
+        assert board.zobrist_key == other_board.zobrist_key
+        assert board == other_board
+        assert len({board, other_board}) == 1
+
+    @staticmethod
+    def test_side_to_move_changes_the_key():
+        # Arrange
+        board = Board.at_starting_position()
+        key = board.zobrist_key
+
+        # Act
+        board.current_player = Player.BLACK
+
+        # Assert
+        assert board.zobrist_key != key
+        assert board != Board.at_starting_position()
+
+    @staticmethod
+    def test_en_passant_square_changes_the_key():
+        # Arrange
+        board = Board.at_starting_position()
+        other_board = Board.at_starting_position()
+
+        # Act
+        board.move_piece(Square.at(1, 4), Square.at(3, 4))
+        other_board.move_piece(Square.at(1, 4), Square.at(2, 4))
+        other_board.current_player = Player.WHITE
+        other_board.move_piece(Square.at(2, 4), Square.at(3, 4))
+
+        # Assert
+        assert board.get_piece(Square.at(3, 4)) is not None
+        assert other_board.en_passant_state is None
+        assert board.zobrist_key != other_board.zobrist_key
+
+    @staticmethod
+    def test_incremental_key_matches_key_computed_from_scratch():
+        rng = random.Random(0)
+        board = Board.at_starting_position()
+        start_key = board.zobrist_key
+
+        for _ in range(100):
+            # Act
+            board.make_move(rng.choice(board.generate_moves(board.current_player)))
+
+            # Assert
+            assert board.zobrist_key == compute_key(board)
+
+        while board.can_unmake_move():
+            board.unmake_move()
+        assert board.zobrist_key == start_key